@@ -1,118 +1,89 @@
 """Конфигурация"""
 
-import os
 import sys
 from pathlib import Path
-
-import pytz
-from dotenv import load_dotenv
-
-load_dotenv()
+from types import MappingProxyType
+from zoneinfo import ZoneInfo
+
+from config_core import (  # noqa: F401 - реэкспорт для `from config import ...`
+    _ENV,
+    BACKUP_DIR,
+    BACKUP_ENABLED,
+    BACKUP_INTERVAL_HOURS,
+    BACKUP_RETENTION_DAYS,
+    DATABASE_PATH,
+    DB_MAX_RETRIES,
+    DB_RETRY_BACKOFF,
+    DB_RETRY_DELAY,
+)
 
 # === BOT ===
-BOT_TOKEN = os.getenv("BOT_TOKEN")
+BOT_TOKEN = _ENV.get("BOT_TOKEN")
 if not BOT_TOKEN:
     sys.exit("❌ BOT_TOKEN not found in .env")
 
 # === ADMIN ===
-ADMIN_IDS_STR = os.getenv("ADMIN_IDS", "")
-ADMIN_IDS = [int(x.strip()) for x in ADMIN_IDS_STR.split(",") if x.strip()]
+ADMIN_IDS_STR = _ENV.get("ADMIN_IDS", "")
+# Порядок из .env (без повторов) — для списков и рассылок
+ADMIN_IDS_ORDERED = tuple(
+    dict.fromkeys(int(x.strip()) for x in ADMIN_IDS_STR.split(",") if x.strip())
+)
+# Множество для проверок `user_id in ADMIN_IDS` на каждом апдейте
+ADMIN_IDS = frozenset(ADMIN_IDS_ORDERED)
 
 if not ADMIN_IDS:
     sys.exit("❌ ADMIN_IDS not found in .env")
 
-MAX_ADMIN_ADDITIONS_PER_HOUR = int(os.getenv("MAX_ADMIN_ADDITIONS_PER_HOUR", "3"))
+MAX_ADMIN_ADDITIONS_PER_HOUR = int(_ENV.get("MAX_ADMIN_ADDITIONS_PER_HOUR", "3"))
 
 # === BOOKINGS ===
-MAX_BOOKINGS_PER_USER = int(os.getenv("MAX_BOOKINGS_PER_USER", "3"))
-CANCELLATION_HOURS = int(os.getenv("CANCELLATION_HOURS", "24"))
+MAX_BOOKINGS_PER_USER = int(_ENV.get("MAX_BOOKINGS_PER_USER", "3"))
+CANCELLATION_HOURS = int(_ENV.get("CANCELLATION_HOURS", "24"))
 
 # === REMINDERS ===
-REMINDER_HOURS_BEFORE_1H = int(os.getenv("REMINDER_HOURS_BEFORE_1H", "1"))
-REMINDER_HOURS_BEFORE_2H = int(os.getenv("REMINDER_HOURS_BEFORE_2H", "2"))
-REMINDER_HOURS_BEFORE_24H = int(os.getenv("REMINDER_HOURS_BEFORE_24H", "24"))
+REMINDER_HOURS_BEFORE_1H = int(_ENV.get("REMINDER_HOURS_BEFORE_1H", "1"))
+REMINDER_HOURS_BEFORE_2H = int(_ENV.get("REMINDER_HOURS_BEFORE_2H", "2"))
+REMINDER_HOURS_BEFORE_24H = int(_ENV.get("REMINDER_HOURS_BEFORE_24H", "24"))
 
 # === FEEDBACK ===
-FEEDBACK_HOURS_AFTER = int(os.getenv("FEEDBACK_HOURS_AFTER", "2"))
+FEEDBACK_HOURS_AFTER = int(_ENV.get("FEEDBACK_HOURS_AFTER", "2"))
 
 # === SERVICE INFO ===
-SERVICE_LOCATION = os.getenv("SERVICE_LOCATION", "Москва, ул. Примерная, 1")
+SERVICE_LOCATION = _ENV.get("SERVICE_LOCATION", "Москва, ул. Примерная, 1")
 
 # === ONBOARDING ===
-ONBOARDING_DELAY_SHORT = float(os.getenv("ONBOARDING_DELAY_SHORT", "1.5"))
-ONBOARDING_DELAY_LONG = float(os.getenv("ONBOARDING_DELAY_LONG", "3.0"))
+ONBOARDING_DELAY_SHORT = float(_ENV.get("ONBOARDING_DELAY_SHORT", "1.5"))
+ONBOARDING_DELAY_LONG = float(_ENV.get("ONBOARDING_DELAY_LONG", "3.0"))
 
 # === WORK SCHEDULE ===
-WORK_HOURS_START = int(os.getenv("WORK_HOURS_START", "9"))
-WORK_HOURS_END = int(os.getenv("WORK_HOURS_END", "18"))
-
-# === DATABASE ===
-DATABASE_PATH = os.getenv("DATABASE_PATH", "bookings.db")
-
-# === DATABASE RETRY LOGIC ===
-DB_MAX_RETRIES = int(os.getenv("DB_MAX_RETRIES", "3"))
-DB_RETRY_DELAY = float(os.getenv("DB_RETRY_DELAY", "0.5"))
-DB_RETRY_BACKOFF = float(os.getenv("DB_RETRY_BACKOFF", "2.0"))
+WORK_HOURS_START = int(_ENV.get("WORK_HOURS_START", "9"))
+WORK_HOURS_END = int(_ENV.get("WORK_HOURS_END", "18"))
 
 # === REDIS (FSM Storage) ===
-REDIS_ENABLED = os.getenv("REDIS_ENABLED", "False").lower() in ("true", "1", "yes")
-REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
-REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
-REDIS_DB = int(os.getenv("REDIS_DB", "0"))
-REDIS_PASSWORD = os.getenv("REDIS_PASSWORD", None)
+REDIS_ENABLED = _ENV.get("REDIS_ENABLED", "False").lower() in ("true", "1", "yes")
+REDIS_HOST = _ENV.get("REDIS_HOST", "localhost")
+REDIS_PORT = int(_ENV.get("REDIS_PORT", "6379"))
+REDIS_DB = int(_ENV.get("REDIS_DB", "0"))
+REDIS_PASSWORD = _ENV.get("REDIS_PASSWORD", None)
 
 # === SENTRY (Error Monitoring) ===
-SENTRY_ENABLED = os.getenv("SENTRY_ENABLED", "False").lower() in ("true", "1", "yes")
-SENTRY_DSN = os.getenv("SENTRY_DSN", "")
-SENTRY_ENVIRONMENT = os.getenv("SENTRY_ENVIRONMENT", "production")
-SENTRY_TRACES_SAMPLE_RATE = float(os.getenv("SENTRY_TRACES_SAMPLE_RATE", "0.1"))
-
-# === BACKUP ===
-BACKUP_ENABLED = os.getenv("BACKUP_ENABLED", "True").lower() in ("true", "1", "yes")
-BACKUP_DIR = os.getenv("BACKUP_DIR", "backups")
-BACKUP_INTERVAL_HOURS = int(os.getenv("BACKUP_INTERVAL_HOURS", "24"))
-BACKUP_RETENTION_DAYS = int(os.getenv("BACKUP_RETENTION_DAYS", "30"))
+SENTRY_ENABLED = _ENV.get("SENTRY_ENABLED", "False").lower() in ("true", "1", "yes")
+SENTRY_DSN = _ENV.get("SENTRY_DSN", "")
+SENTRY_ENVIRONMENT = _ENV.get("SENTRY_ENVIRONMENT", "production")
+SENTRY_TRACES_SAMPLE_RATE = float(_ENV.get("SENTRY_TRACES_SAMPLE_RATE", "0.1"))
 
 # === BROADCAST ===
-BROADCAST_DELAY = float(os.getenv("BROADCAST_DELAY", "0.05"))
+BROADCAST_DELAY = float(_ENV.get("BROADCAST_DELAY", "0.05"))
 
 # === RATE LIMITING ===
-RATE_LIMIT_MESSAGE = float(os.getenv("RATE_LIMIT_MESSAGE", "0.5"))
-RATE_LIMIT_CALLBACK = float(os.getenv("RATE_LIMIT_CALLBACK", "0.3"))
+RATE_LIMIT_MESSAGE = float(_ENV.get("RATE_LIMIT_MESSAGE", "0.5"))
+RATE_LIMIT_CALLBACK = float(_ENV.get("RATE_LIMIT_CALLBACK", "0.3"))
 
 # === CALENDAR ===
-CALENDAR_MAX_MONTHS_AHEAD = int(os.getenv("CALENDAR_MAX_MONTHS_AHEAD", "3"))
+CALENDAR_MAX_MONTHS_AHEAD = int(_ENV.get("CALENDAR_MAX_MONTHS_AHEAD", "3"))
 
 # === TIMEZONE ===
-TIMEZONE = pytz.timezone("Europe/Moscow")
-
-# === DAY NAMES ===
-DAY_NAMES = [
-    "Пн",
-    "Вт",
-    "Ср",
-    "Чт",
-    "Пт",
-    "Сб",
-    "Вс",
-]
-
-DAY_NAMES_SHORT = ["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс"]
-
-MONTH_NAMES = [
-    "Январь",
-    "Февраль",
-    "Март",
-    "Апрель",
-    "Май",
-    "Июнь",
-    "Июль",
-    "Август",
-    "Сентябрь",
-    "Октябрь",
-    "Ноябрь",
-    "Декабрь",
-]
+TIMEZONE = ZoneInfo("Europe/Moscow")
 
 # === CALLBACK VALIDATION ===
 CALLBACK_VERSION = "v3"
@@ -130,23 +101,26 @@ ROLE_MODERATOR = "moderator"
 
 ADMIN_ROLES = [ROLE_SUPER_ADMIN, ROLE_MODERATOR]
 
-ROLE_PERMISSIONS = {
-    ROLE_SUPER_ADMIN: {
-        "manage_admins": True,
-        "view_audit_log": True,
-        "manage_bookings": True,
-        "manage_slots": True,
-        "edit_services": True,
-        "export_data": True,
-        "manage_settings": True,  # ✅ NEW: System settings
-    },
-    ROLE_MODERATOR: {
-        "manage_admins": False,
-        "view_audit_log": False,
-        "manage_bookings": True,
-        "manage_slots": True,
-        "edit_services": True,
-        "export_data": False,
-        "manage_settings": False,  # ✅ NEW: Only Super Admin
-    },
-}
+# Роль -> множество разрешённых действий (только для чтения)
+ROLE_PERMISSIONS = MappingProxyType(
+    {
+        ROLE_SUPER_ADMIN: frozenset(
+            {
+                "manage_admins",
+                "view_audit_log",
+                "manage_bookings",
+                "manage_slots",
+                "edit_services",
+                "export_data",
+                "manage_settings",  # ✅ NEW: System settings (only Super Admin)
+            }
+        ),
+        ROLE_MODERATOR: frozenset(
+            {
+                "manage_bookings",
+                "manage_slots",
+                "edit_services",
+            }
+        ),
+    }
+)
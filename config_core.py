@@ -0,0 +1,34 @@
+"""Базовая конфигурация: окружение и пути к данным.
+
+Не требует BOT_TOKEN/ADMIN_IDS и не загружает часовые пояса, поэтому
+подходит для отдельно запускаемых скриптов (миграции, бэкапы).
+"""
+
+import os
+from pathlib import Path
+
+from dotenv import dotenv_values
+
+# .env лежит рядом с модулем: путь известен, find_dotenv не нужен
+ENV_FILE = Path(__file__).resolve().parent / ".env"
+
+# .env читается один раз за процесс (при первом импорте модуля);
+# переменные окружения имеют приоритет над файлом
+_ENV = {
+    **{key: value for key, value in dotenv_values(ENV_FILE).items() if value is not None},
+    **os.environ,
+}
+
+# === DATABASE ===
+DATABASE_PATH = _ENV.get("DATABASE_PATH", "bookings.db")
+
+# === DATABASE RETRY LOGIC ===
+DB_MAX_RETRIES = int(_ENV.get("DB_MAX_RETRIES", "3"))
+DB_RETRY_DELAY = float(_ENV.get("DB_RETRY_DELAY", "0.5"))
+DB_RETRY_BACKOFF = float(_ENV.get("DB_RETRY_BACKOFF", "2.0"))
+
+# === BACKUP ===
+BACKUP_ENABLED = _ENV.get("BACKUP_ENABLED", "True").lower() in ("true", "1", "yes")
+BACKUP_DIR = _ENV.get("BACKUP_DIR", "backups")
+BACKUP_INTERVAL_HOURS = int(_ENV.get("BACKUP_INTERVAL_HOURS", "24"))
+BACKUP_RETENTION_DAYS = int(_ENV.get("BACKUP_RETENTION_DAYS", "30"))
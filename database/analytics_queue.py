@@ -0,0 +1,21 @@
+"""Фоновая пакетная запись событий аналитики"""
+
+from typing import Tuple
+
+from database.batch_queue import BatchWriteQueue
+
+INSERT_EVENT_SQL = "INSERT INTO analytics (user_id, event, data, timestamp) VALUES (?, ?, ?, ?)"
+
+# (user_id, event, data, timestamp)
+EventRow = Tuple[int, str, str, str]
+
+
+class AnalyticsQueue(BatchWriteQueue):
+    """
+    Очередь событий analytics (см. BatchWriteQueue).
+
+    log_event кладёт строку в очередь и не ждёт БД.
+    """
+
+    INSERT_SQL = INSERT_EVENT_SQL
+    NAME = "Analytics"
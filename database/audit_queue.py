@@ -0,0 +1,23 @@
+"""Фоновая пакетная запись audit log"""
+
+from database.batch_queue import BatchWriteQueue
+
+INSERT_AUDIT_SQL = (
+    "INSERT INTO audit_log (admin_id, action, target_id, details, timestamp) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+
+
+class AuditQueue(BatchWriteQueue):
+    """
+    Очередь записей audit_log (см. BatchWriteQueue).
+
+    AuditRepository.log_action кладёт строку в очередь, и ответ
+    администратору не ждёт записи в БД. Записей мало, поэтому пакет
+    добирается недолго.
+    """
+
+    INSERT_SQL = INSERT_AUDIT_SQL
+    NAME = "Audit"
+    BATCH_SIZE = 256
+    FLUSH_INTERVAL = 0.1
@@ -1,15 +1,106 @@
 """Базовый класс для всех репозиториев"""
 
 import logging
-from typing import Any, Optional
+from copy import copy
+from functools import lru_cache, wraps
+from typing import Any, Callable, Optional
 
 import aiosqlite
 
-from config import DATABASE_PATH
+from database.connection import DB
+from database.db_retry import db_retry
+
+
+@lru_cache(maxsize=256)
+def _build_count_sql(table: str, where: str) -> str:
+    """SQL для _count: одинаковый текст для одинаковых аргументов,
+    чтобы срабатывал кэш подготовленных выражений sqlite3"""
+    if where:
+        return f"SELECT COUNT(*) FROM {table} WHERE {where}"
+    return f"SELECT COUNT(*) FROM {table}"
+
+
+@lru_cache(maxsize=256)
+def _build_exists_sql(table: str, where: str) -> str:
+    """SQL для _exists (см. _build_count_sql)"""
+    return f"SELECT 1 FROM {table} WHERE {where} LIMIT 1"
+
+
+def db_call(default: Any = None):
+    """
+    Декоратор метода репозитория: ошибка БД логируется и вместо неё
+    возвращается default (копия — для [] и {}).
+
+    Заменяет одинаковые try/except + logging.error в каждом методе.
+    Повтор временных ошибок остаётся за @db_retry в помощниках
+    BaseRepository, до этого декоратора доходят уже окончательные.
+
+    Args:
+        default: Значение при ошибке
+    """
+
+    def decorator(func: Callable):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                logging.error("%s%s failed: %s", func.__qualname__, args, e)
+                return copy(default)
+
+        return wrapper
+
+    return decorator
 
 
 class BaseRepository:
-    """Базовый класс репозитория с общими методами"""
+    """
+    Базовый класс репозитория с общими методами.
+
+    Ошибки БД не перехватываются: временные (database is locked)
+    повторяет @db_retry, остальные обрабатывают методы репозиториев.
+    """
+
+    @staticmethod
+    @db_retry()
+    async def _execute_fetchone(query: str, params: tuple = ()) -> Optional[Any]:
+        """
+        Выполнить SELECT и вернуть первую строку
+
+        Returns:
+            Строка или None, если строк нет
+        """
+        db = await DB.get()
+        # Курсор без async with: закрывать нечего, sqlite3 сбросит выражение сам
+        cursor = await db.execute(query, params)
+        return await cursor.fetchone()
+
+    @staticmethod
+    @db_retry()
+    async def _execute_fetchall(query: str, params: tuple = ()) -> Optional[list]:
+        """
+        Выполнить SELECT и вернуть все строки
+
+        Returns:
+            Список строк
+        """
+        db = await DB.get()
+        # execute + fetchall за один переход в поток подключения
+        return await db.execute_fetchall(query, params)
+
+    @staticmethod
+    @db_retry()
+    async def _execute_commit(query: str, params: tuple = ()) -> Optional[aiosqlite.Cursor]:
+        """
+        Выполнить изменяющий запрос (INSERT/UPDATE/DELETE)
+
+        Returns:
+            Курсор (rowcount, lastrowid)
+        """
+        db = await DB.get()
+        # Записи сериализуются: SQLite допускает одного писателя
+        async with DB.write_lock:
+            return await db.execute(query, params)
 
     @staticmethod
     async def _execute_query(
@@ -20,7 +111,10 @@ class BaseRepository:
         commit: bool = False,
     ) -> Optional[Any]:
         """
-        Универсальный метод выполнения запросов
+        Универсальный метод выполнения запросов.
+
+        Оставлен для совместимости: новые вызовы используют
+        _execute_fetchone / _execute_fetchall / _execute_commit.
 
         Args:
             query: SQL запрос
@@ -30,48 +124,42 @@ class BaseRepository:
             commit: Сделать commit
 
         Returns:
-            Результат запроса или None
+            Результат запроса
         """
-        try:
-            async with aiosqlite.connect(DATABASE_PATH) as db:
-                async with db.execute(query, params) as cursor:
-                    if fetch_one:
-                        result = await cursor.fetchone()
-                    elif fetch_all:
-                        result = await cursor.fetchall()
-                    else:
-                        result = cursor
-
-                if commit:
-                    await db.commit()
-
-                return result
-        except Exception as e:
-            logging.error(f"Database error in query '{query[:50]}...': {e}")
-            return None
+        if fetch_one:
+            return await BaseRepository._execute_fetchone(query, params)
+        if fetch_all:
+            return await BaseRepository._execute_fetchall(query, params)
+        return await BaseRepository._execute_commit(query, params)
 
     @staticmethod
+    @db_retry()
     async def _execute_many(query: str, params_list: list, commit: bool = True) -> bool:
         """
-        Выполнить множественные INSERT/UPDATE
+        Выполнить множественные INSERT/UPDATE одной транзакцией
+
+        Общее подключение работает в autocommit, поэтому без явного BEGIN
+        каждая строка executemany фиксировалась бы отдельно.
 
         Args:
             query: SQL запрос
             params_list: Список параметров
-            commit: Сделать commit
+            commit: Не используется: пакет всегда фиксируется целиком
+                (оставлен для совместимости)
 
         Returns:
-            True если успешно
+            True (ошибки пробрасываются вызывающему коду)
         """
-        try:
-            async with aiosqlite.connect(DATABASE_PATH) as db:
+        db = await DB.get()
+        async with DB.write_lock:
+            await db.execute("BEGIN IMMEDIATE")
+            try:
                 await db.executemany(query, params_list)
-                if commit:
-                    await db.commit()
-                return True
-        except Exception as e:
-            logging.error(f"Database error in executemany: {e}")
-            return False
+                await db.execute("COMMIT")
+            except Exception:
+                await db.execute("ROLLBACK")
+                raise
+        return True
 
     @staticmethod
     async def _count(table: str, where: str = "", params: tuple = ()) -> int:
@@ -86,10 +174,8 @@ class BaseRepository:
         Returns:
             Количество записей
         """
-        where_clause = f"WHERE {where}" if where else ""
-        query = f"SELECT COUNT(*) FROM {table} {where_clause}"
-
-        result = await BaseRepository._execute_query(query, params, fetch_one=True)
+        query = _build_count_sql(table, where)
+        result = await BaseRepository._execute_fetchone(query, params)
         return result[0] if result else 0
 
     @staticmethod
@@ -105,6 +191,6 @@ class BaseRepository:
         Returns:
             True если запись существует
         """
-        query = f"SELECT 1 FROM {table} WHERE {where} LIMIT 1"
-        result = await BaseRepository._execute_query(query, params, fetch_one=True)
+        query = _build_exists_sql(table, where)
+        result = await BaseRepository._execute_fetchone(query, params)
         return result is not None
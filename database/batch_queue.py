@@ -0,0 +1,114 @@
+"""Фоновая пакетная запись строк одним писателем"""
+
+import asyncio
+import logging
+from typing import List, Optional
+
+from database.base_repository import BaseRepository
+
+
+class BatchWriteQueue:
+    """
+    Очередь строк для одного INSERT с одним фоновым писателем.
+
+    put() кладёт строку в очередь и не ждёт БД. Писатель собирает до
+    BATCH_SIZE строк (или сколько набралось за FLUSH_INTERVAL) и
+    вставляет их одной транзакцией через executemany — один COMMIT
+    на пакет вместо COMMIT на каждую строку.
+
+    Пока очередь не запущена (скрипты, тесты), put() возвращает False
+    и вызывающий код пишет строку сам.
+
+    Подкласс задаёт INSERT_SQL и NAME; состояние у каждого подкласса своё.
+    """
+
+    INSERT_SQL: str = ""
+    NAME: str = ""
+    # Не больше строк в одной транзакции
+    BATCH_SIZE = 500
+    # Сколько ждать добора пакета после первой строки (секунды)
+    FLUSH_INTERVAL = 1.0
+    # При переполнении строки пишутся напрямую, а не теряются
+    QUEUE_MAX_SIZE = 10000
+
+    _queue: Optional[asyncio.Queue] = None
+    _task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def is_running(cls) -> bool:
+        return cls._task is not None and not cls._task.done()
+
+    @classmethod
+    def start(cls):
+        """Запустить писателя (при старте бота)"""
+        if cls.is_running():
+            return
+
+        cls._queue = asyncio.Queue(maxsize=cls.QUEUE_MAX_SIZE)
+        cls._task = asyncio.create_task(cls._run(cls._queue))
+        logging.info("%s queue started", cls.NAME)
+
+    @classmethod
+    async def stop(cls):
+        """Дописать накопленные строки и остановить писателя"""
+        if cls._task is None:
+            return
+
+        # Сначала закрываем приём: новые строки пойдут напрямую в БД
+        task, cls._task = cls._task, None
+        await cls._queue.put(None)
+        await task
+        logging.info("%s queue stopped", cls.NAME)
+
+    @classmethod
+    def put(cls, row: tuple) -> bool:
+        """
+        Поставить строку в очередь.
+
+        Returns:
+            False, если очередь не запущена или переполнена
+        """
+        if not cls.is_running():
+            return False
+
+        try:
+            cls._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    @classmethod
+    async def _run(cls, queue: asyncio.Queue):
+        """Цикл писателя; None в очереди — сигнал остановки"""
+        loop = asyncio.get_running_loop()
+        stopping = False
+
+        while not stopping:
+            row = await queue.get()
+            if row is None:
+                break
+
+            rows = [row]
+            deadline = loop.time() + cls.FLUSH_INTERVAL
+            while len(rows) < cls.BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    row = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if row is None:
+                    stopping = True
+                    break
+                rows.append(row)
+
+            await cls._write(rows)
+
+    @classmethod
+    async def _write(cls, rows: List[tuple]):
+        try:
+            await BaseRepository._execute_many(cls.INSERT_SQL, rows)
+        except Exception as e:
+            # Не падаем: писатель должен пережить временную ошибку БД
+            logging.error("Failed to write %s %s rows: %s", len(rows), cls.NAME, e)
@@ -0,0 +1,127 @@
+"""Общее долгоживущее подключение к SQLite для репозиториев"""
+
+import asyncio
+import logging
+import sqlite3
+from typing import Optional
+
+import aiosqlite
+
+from config_core import DATABASE_PATH
+
+# Размер кэша подготовленных выражений sqlite3 на подключение.
+# Кэш (LRU) ключуется текстом SQL: повторный execute того же запроса
+# берёт уже подготовленное выражение без разбора и планирования. Поэтому
+# в горячих запросах SQL — константа, а значения идут параметрами.
+STATEMENT_CACHE_SIZE = 256
+
+# DELETE/UPDATE ... RETURNING появился в SQLite 3.35
+SQLITE_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# Применяются один раз при открытии подключения.
+# WAL + synchronous=NORMAL: COMMIT не ждёт fsync, но БД не повреждается
+# при сбое — теряются лишь последние транзакции до checkpoint, что по
+# документации SQLite достаточно надёжно для режима WAL.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-64000",  # ~64 МБ
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    # Ждать освобождения блокировки писателя, а не сразу падать с
+    # "database is locked" (то же, что timeout=5.0 в connect, но явно
+    # для всех подключений, включая миграции)
+    "PRAGMA busy_timeout=5000",
+)
+
+
+async def configure_connection(db: aiosqlite.Connection, foreign_keys: bool = False):
+    """
+    Применить PRAGMA производительности к подключению.
+
+    Args:
+        db: Открытое подключение
+        foreign_keys: Включить проверку FOREIGN KEY (для миграций)
+    """
+    for pragma in CONNECTION_PRAGMAS:
+        await db.execute(pragma)
+    if foreign_keys:
+        await db.execute("PRAGMA foreign_keys=ON")
+
+
+class DB:
+    """
+    Единое подключение aiosqlite, открываемое лениво при первом запросе.
+
+    SQLite допускает только одного писателя, поэтому все записи
+    выполняются под write_lock.
+    """
+
+    _conn: Optional[aiosqlite.Connection] = None
+    # Путь фиксируется при открытии подключения; сменить — через reset()
+    _path: str = DATABASE_PATH
+    _connect_lock = asyncio.Lock()
+    write_lock = asyncio.Lock()
+
+    @classmethod
+    async def get(cls) -> aiosqlite.Connection:
+        """Получить (при необходимости открыть) общее подключение"""
+        if cls._conn is not None:
+            return cls._conn
+
+        async with cls._connect_lock:
+            if cls._conn is None:
+                conn = aiosqlite.connect(
+                    cls._path,
+                    isolation_level=None,
+                    cached_statements=STATEMENT_CACHE_SIZE,
+                )
+                # Поток подключения не должен удерживать процесс при выходе
+                conn.daemon = True
+                await conn
+                await configure_connection(conn)
+                cls._conn = conn
+                logging.info("Shared database connection opened: %s", cls._path)
+
+        return cls._conn
+
+    @classmethod
+    async def optimize(cls):
+        """
+        PRAGMA optimize: обновить статистику планировщика там, где она
+        устарела. Почти бесплатно, если обновлять нечего.
+        """
+        db = await cls.get()
+        await db.execute("PRAGMA optimize")
+
+    @classmethod
+    async def close(cls):
+        """Закрыть общее подключение (при остановке бота)"""
+        if cls._conn is None:
+            return
+
+        try:
+            await cls.optimize()
+        except Exception as e:
+            logging.warning("PRAGMA optimize on close failed: %s", e)
+
+        conn, cls._conn = cls._conn, None
+        await conn.close()
+        logging.info("Shared database connection closed")
+
+    @classmethod
+    async def reset(cls, path: Optional[str] = None):
+        """
+        Закрыть подключение; следующий get() откроет его на path.
+
+        Блокировки создаются заново: asyncio.Lock привязывается к циклу
+        событий, а после reset подключение может использоваться в другом
+        (тесты запускают каждый случай в своём цикле).
+
+        Args:
+            path: Путь к БД (по умолчанию DATABASE_PATH из конфига)
+        """
+        await cls.close()
+        cls._path = path or DATABASE_PATH
+        cls._connect_lock = asyncio.Lock()
+        cls.write_lock = asyncio.Lock()
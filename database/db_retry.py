@@ -8,23 +8,28 @@ Provides automatic retry logic for database operations to handle:
 Usage:
     @db_retry(max_retries=3)
     async def my_db_operation():
-        async with aiosqlite.connect(DATABASE_PATH) as db:
-            ...
+        db = await DB.get()
+        ...
 """
 
 import asyncio
 import logging
+import random
 from functools import wraps
-from typing import Any, Callable, TypeVar
+from typing import Any, Callable, Optional, TypeVar
 
 import aiosqlite
 
-from config import DB_MAX_RETRIES, DB_RETRY_BACKOFF, DB_RETRY_DELAY
+from config_core import DB_MAX_RETRIES, DB_RETRY_BACKOFF, DB_RETRY_DELAY
+from database.connection import DB
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar("T")
 
+# Upper bound for a single backoff sleep (seconds)
+MAX_DELAY = 10.0
+
 # Exceptions that should trigger retry
 RETRYABLE_ERRORS = (
     aiosqlite.OperationalError,  # Database locked, unable to open
@@ -33,6 +38,29 @@ RETRYABLE_ERRORS = (
     TimeoutError,  # Operation timeout
 )
 
+# DatabaseError subclasses that are deterministic: retrying cannot help
+NON_RETRYABLE_ERRORS = (
+    aiosqlite.IntegrityError,  # UNIQUE / FOREIGN KEY / NOT NULL violations
+    aiosqlite.ProgrammingError,  # Bad SQL or bindings
+)
+
+# OperationalError messages caused by the schema or the SQL itself, not by
+# contention: the same statement fails the same way on every attempt
+NON_RETRYABLE_MESSAGES = (
+    "no such table",
+    "no such column",
+    "has no column named",
+    "syntax error",
+)
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether a retryable-typed error is worth another attempt"""
+    if isinstance(error, NON_RETRYABLE_ERRORS):
+        return False
+    message = str(error).lower()
+    return not any(text in message for text in NON_RETRYABLE_MESSAGES)
+
 
 def db_retry(
     max_retries: int = DB_MAX_RETRIES,
@@ -45,7 +73,8 @@ def db_retry(
     Args:
         max_retries: Maximum number of retry attempts
         base_delay: Initial delay between retries (seconds)
-        backoff: Multiplier for delay after each retry
+        backoff: Multiplier for delay after each retry (every sleep is
+            randomized by ±50% and capped at MAX_DELAY)
         retryable_errors: Tuple of exception types to retry on
 
     Returns:
@@ -63,23 +92,34 @@ def db_retry(
                     return await func(*args, **kwargs)
 
                 except retryable_errors as e:
+                    if not is_retryable(e):
+                        raise
+
                     last_exception = e
 
                     if attempt >= max_retries:
-                        logger.error(f"❌ {func.__name__} failed after {max_retries} retries: {e}")
+                        logger.error(
+                            "❌ %s failed after %d retries: %s", func.__name__, max_retries, e
+                        )
                         raise
 
+                    # Jitter spreads out retries of coroutines that hit the same lock
+                    sleep_for = min(delay * (0.5 + random.random()), MAX_DELAY)
                     logger.warning(
-                        f"⚠️ {func.__name__} attempt {attempt + 1}/{max_retries + 1} "
-                        f"failed: {e}. Retrying in {delay:.2f}s..."
+                        "⚠️ %s attempt %d/%d failed: %s. Retrying in %.2fs...",
+                        func.__name__,
+                        attempt + 1,
+                        max_retries + 1,
+                        e,
+                        sleep_for,
                     )
 
-                    await asyncio.sleep(delay)
-                    delay *= backoff
+                    await asyncio.sleep(sleep_for)
+                    delay = min(delay * backoff, MAX_DELAY)
 
                 except Exception as e:
                     # Non-retryable error, raise immediately
-                    logger.error(f"❌ {func.__name__} failed with non-retryable error: {e}")
+                    logger.error("❌ %s failed with non-retryable error: %s", func.__name__, e)
                     raise
 
             # Should never reach here, but for type safety
@@ -93,22 +133,21 @@ def db_retry(
 
 # Convenience wrapper for common database operations
 class DBRetry:
-    """Context manager for database operations with retry logic"""
+    """Context manager handing out the shared database connection
 
-    def __init__(self, db_path: str, **retry_kwargs):
+    The connection is owned by DB and stays open on exit; wrap the
+    actual queries with @db_retry to retry transient errors.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        # db_path is kept for backward compatibility: the shared
+        # connection always points at DATABASE_PATH
         self.db_path = db_path
-        self.retry_kwargs = retry_kwargs
         self.connection = None
 
     async def __aenter__(self) -> aiosqlite.Connection:
-        @db_retry(**self.retry_kwargs)
-        async def connect():
-            return await aiosqlite.connect(self.db_path)
-
-        self.connection = await connect()
+        self.connection = await DB.get()
         return self.connection
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.connection:
-            await self.connection.close()
         return False
@@ -0,0 +1,27 @@
+"""Фоновая пакетная запись истории бронирований"""
+
+from database.batch_queue import BatchWriteQueue
+
+# Все колонки: record_create / record_cancel / record_reschedule заполняют
+# свои, остальные NULL — один текст SQL на все действия и на executemany
+INSERT_HISTORY_SQL = """
+INSERT INTO booking_history (
+    booking_id, action, changed_by, changed_by_type,
+    old_date, old_time, new_date, new_time,
+    old_service_id, new_service_id, reason, changed_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+class BookingHistoryQueue(BatchWriteQueue):
+    """
+    Очередь записей booking_history (см. BatchWriteQueue).
+
+    Используется только для записей вне транзакции изменения брони:
+    внутри неё строка истории пишется в ту же транзакцию.
+    """
+
+    INSERT_SQL = INSERT_HISTORY_SQL
+    NAME = "Booking history"
+    BATCH_SIZE = 256
+    FLUSH_INTERVAL = 0.25
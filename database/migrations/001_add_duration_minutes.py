@@ -17,38 +17,37 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 import aiosqlite
 
-from config import DATABASE_PATH
+from config_core import DATABASE_PATH
+from database.connection import configure_connection
 
 logger = logging.getLogger(__name__)
 
 
-async def check_column_exists(db: aiosqlite.Connection, table: str, column: str) -> bool:
-    """Check if column exists in table"""
-    cursor = await db.execute(f"PRAGMA table_info({table})")
-    columns = await cursor.fetchall()
-    await cursor.close()
-    return any(col[1] == column for col in columns)
-
-
 async def migrate_up():
     """Add duration_minutes column to bookings table"""
     logger.info("Starting migration 001: add duration_minutes")
 
     async with aiosqlite.connect(DATABASE_PATH) as db:
-        # Check if column already exists
-        if await check_column_exists(db, "bookings", "duration_minutes"):
-            logger.info("✅ Column 'duration_minutes' already exists, skipping migration")
-            return True
+        await configure_connection(db, foreign_keys=True)
 
         try:
-            # Add column with default value
+            # Add column with default value; an existing column is reported by
+            # SQLite as "duplicate column name", no need to probe table_info first
             await db.execute("ALTER TABLE bookings ADD COLUMN duration_minutes INTEGER DEFAULT 60")
             await db.commit()
             logger.info("✅ Migration 001 completed: duration_minutes column added")
             return True
 
+        except aiosqlite.OperationalError as e:
+            if "duplicate column" not in str(e):
+                logger.error("❌ Migration 001 failed: %s", e)
+                await db.rollback()
+                return False
+            logger.info("✅ Column 'duration_minutes' already exists, skipping migration")
+            return True
+
         except Exception as e:
-            logger.error(f"❌ Migration 001 failed: {e}")
+            logger.error("❌ Migration 001 failed: %s", e)
             await db.rollback()
             return False
 
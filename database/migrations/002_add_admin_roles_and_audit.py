@@ -5,21 +5,26 @@ import logging
 
 import aiosqlite
 
-from config import DATABASE_PATH
+from config_core import DATABASE_PATH
+from database.connection import configure_connection
 
 
 async def migrate():
     """Добавляем роли админов и audit log"""
     async with aiosqlite.connect(DATABASE_PATH) as db:
+        await configure_connection(db, foreign_keys=True)
+
         # 1. Добавляем роль в таблицу admins
         try:
             await db.execute("ALTER TABLE admins ADD COLUMN role TEXT DEFAULT 'moderator'")
             logging.info("✅ Added 'role' column to admins table")
         except Exception as e:
-            logging.warning(f"⚠️ Column 'role' already exists: {e}")
+            logging.warning("⚠️ Column 'role' already exists: %s", e)
 
-        # 2. Создаем таблицу audit_log
-        await db.execute(
+        # 2-3. Таблица audit_log и индексы одним пакетом
+        # (ALTER выше выполняется отдельно: executescript не умеет
+        # пропускать ошибку "duplicate column" посреди скрипта)
+        await db.executescript(
             """CREATE TABLE IF NOT EXISTS audit_log (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 admin_id INTEGER NOT NULL,
@@ -27,15 +32,12 @@ async def migrate():
                 target_id TEXT,
                 details TEXT,
                 timestamp TEXT NOT NULL
-            )"""
+            );
+            CREATE INDEX IF NOT EXISTS idx_audit_admin ON audit_log(admin_id);
+            CREATE INDEX IF NOT EXISTS idx_audit_action ON audit_log(action);
+            CREATE INDEX IF NOT EXISTS idx_audit_timestamp ON audit_log(timestamp);"""
         )
-        logging.info("✅ Created audit_log table")
-
-        # 3. Индексы для audit_log
-        await db.execute("CREATE INDEX IF NOT EXISTS idx_audit_admin ON audit_log(admin_id)")
-        await db.execute("CREATE INDEX IF NOT EXISTS idx_audit_action ON audit_log(action)")
-        await db.execute("CREATE INDEX IF NOT EXISTS idx_audit_timestamp ON audit_log(timestamp)")
-        logging.info("✅ Created audit_log indexes")
+        logging.info("✅ Created audit_log table and indexes")
 
         await db.commit()
         logging.info("✅✅✅ Migration 002 completed successfully!")
@@ -17,7 +17,8 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 import aiosqlite
 
-from config import DATABASE_PATH
+from config_core import DATABASE_PATH
+from database.connection import configure_connection
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 
@@ -26,6 +27,8 @@ async def migrate():
     """Добавить service_id в bookings"""
 
     async with aiosqlite.connect(DATABASE_PATH) as db:
+        await configure_connection(db, foreign_keys=True)
+
         # Проверяем, существует ли уже колонка
         async with db.execute("PRAGMA table_info(bookings)") as cursor:
             columns = await cursor.fetchall()
@@ -56,14 +59,14 @@ async def migrate():
             # Проверяем результат
             async with db.execute("PRAGMA table_info(bookings)") as cursor:
                 columns = await cursor.fetchall()
-                logging.info(f"\n📋 Текущая схема таблицы bookings:")
+                logging.info("\n📋 Текущая схема таблицы bookings:")
                 for col in columns:
-                    logging.info(f"   {col[1]} ({col[2]})")
+                    logging.info("   %s (%s)", col[1], col[2])
 
             return True
 
         except Exception as e:
-            logging.error(f"❌ Ошибка миграции: {e}")
+            logging.error("❌ Ошибка миграции: %s", e)
             await db.rollback()
             return False
 
@@ -80,6 +83,7 @@ async def rollback():
         return False
 
     async with aiosqlite.connect(DATABASE_PATH) as db:
+        await configure_connection(db, foreign_keys=True)
         try:
             # SQLite не поддерживает DROP COLUMN напрямую
             # Нужно пересоздать таблицу
@@ -114,7 +118,7 @@ async def rollback():
             return True
 
         except Exception as e:
-            logging.error(f"❌ Ошибка отката: {e}")
+            logging.error("❌ Ошибка отката: %s", e)
             await db.rollback()
             return False
 
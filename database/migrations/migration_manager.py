@@ -6,6 +6,8 @@ from typing import List, Type
 
 import aiosqlite
 
+from database.connection import configure_connection
+
 
 class Migration(ABC):
     """Базовый класс для миграций"""
@@ -63,14 +65,15 @@ class MigrationManager:
         )
 
         if current >= target:
-            logging.info(f"Database already at version {current}")
+            logging.info("Database already at version %s", current)
             return
 
         async with aiosqlite.connect(self.db_path) as db:
+            await configure_connection(db, foreign_keys=True)
             for migration_class in self.migrations:
                 if current < migration_class.version <= target:
                     migration = migration_class()
-                    logging.info(f"Applying migration {migration.version}: {migration.description}")
+                    logging.info("Applying migration %s: %s", migration.version, migration.description)
 
                     try:
                         await db.execute("BEGIN")
@@ -80,10 +83,10 @@ class MigrationManager:
                             (migration.version, migration.description),
                         )
                         await db.commit()
-                        logging.info(f"✅ Migration {migration.version} applied successfully")
+                        logging.info("✅ Migration %s applied successfully", migration.version)
                     except Exception as e:
                         await db.rollback()
-                        logging.error(f"❌ Migration {migration.version} failed: {e}")
+                        logging.error("❌ Migration %s failed: %s", migration.version, e)
                         raise
 
     async def rollback(self, target_version: int):
@@ -91,14 +94,15 @@ class MigrationManager:
         current = await self.get_current_version()
 
         if current <= target_version:
-            logging.info(f"Nothing to rollback")
+            logging.info("Nothing to rollback")
             return
 
         async with aiosqlite.connect(self.db_path) as db:
+            await configure_connection(db)
             for migration_class in reversed(self.migrations):
                 if target_version < migration_class.version <= current:
                     migration = migration_class()
-                    logging.info(f"Rolling back migration {migration.version}")
+                    logging.info("Rolling back migration %s", migration.version)
 
                     try:
                         await db.execute("BEGIN")
@@ -107,8 +111,8 @@ class MigrationManager:
                             "DELETE FROM schema_migrations WHERE version=?", (migration.version,)
                         )
                         await db.commit()
-                        logging.info(f"✅ Migration {migration.version} rolled back")
+                        logging.info("✅ Migration %s rolled back", migration.version)
                     except Exception as e:
                         await db.rollback()
-                        logging.error(f"❌ Rollback {migration.version} failed: {e}")
+                        logging.error("❌ Rollback %s failed: %s", migration.version, e)
                         raise
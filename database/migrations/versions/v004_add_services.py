@@ -66,7 +66,7 @@ class AddServicesBackwardCompatible(Migration):
                 logging.info("service_id column added successfully")
             except Exception as e:
                 # Колонка может уже существовать
-                logging.warning(f"Could not add service_id column (might already exist): {e}")
+                logging.warning("Could not add service_id column (might already exist): %s", e)
         else:
             logging.info("service_id column already exists")
 
@@ -78,7 +78,7 @@ class AddServicesBackwardCompatible(Migration):
                 )
                 logging.info("duration_minutes column added successfully")
             except Exception as e:
-                logging.warning(f"Could not add duration_minutes column (might already exist): {e}")
+                logging.warning("Could not add duration_minutes column (might already exist): %s", e)
         else:
             logging.info("duration_minutes column already exists")
 
@@ -102,7 +102,7 @@ class AddServicesBackwardCompatible(Migration):
             WHERE service_id IS NULL"""
         ) as cursor:
             updated_rows = cursor.rowcount
-            logging.info(f"Updated {updated_rows} existing bookings")
+            logging.info("Updated %s existing bookings", updated_rows)
 
         logging.info("Migration v004 completed successfully")
 
@@ -130,5 +130,5 @@ class AddServicesBackwardCompatible(Migration):
             await db.execute("CREATE UNIQUE INDEX idx_bookings_date_time ON bookings(date, time)")
             logging.info("Migration v004 rolled back successfully")
         except Exception as e:
-            logging.error(f"Error during rollback: {e}")
+            logging.error("Error during rollback: %s", e)
             raise
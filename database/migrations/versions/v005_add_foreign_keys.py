@@ -13,7 +13,8 @@ from typing import Optional
 
 import aiosqlite
 
-from config import DATABASE_PATH
+from config_core import DATABASE_PATH
+from database.connection import configure_connection
 
 logger = logging.getLogger(__name__)
 
@@ -35,8 +36,8 @@ class AddForeignKeys:
         """
         try:
             async with aiosqlite.connect(DATABASE_PATH) as db:
-                # Включаем foreign keys
-                await db.execute("PRAGMA foreign_keys = ON")
+                # Включаем foreign keys и PRAGMA производительности
+                await configure_connection(db, foreign_keys=True)
 
                 # Проверяем есть ли уже FK constraints
                 async with db.execute("PRAGMA foreign_key_list(bookings)") as cursor:
@@ -49,9 +50,17 @@ class AddForeignKeys:
                 logger.info("🔄 Adding FOREIGN KEY constraints to bookings table...")
 
                 # SQLite не поддерживает ALTER TABLE ADD CONSTRAINT
-                # Нужно пересоздать таблицу
+                # Нужно пересоздать таблицу (одной явной транзакцией)
+                await db.execute("BEGIN IMMEDIATE")
 
-                # 1. Создаем новую таблицу с FK
+                # 0. Проставляем значения по умолчанию на месте: обычно NULL
+                # почти нет, и копирование ниже идёт без COALESCE на строку
+                await db.execute("UPDATE bookings SET service_id = 1 WHERE service_id IS NULL")
+                await db.execute(
+                    "UPDATE bookings SET duration_minutes = 60 WHERE duration_minutes IS NULL"
+                )
+
+                # 1. Создаем новую таблицу с FK (без вторичных индексов)
                 await db.execute(
                     """CREATE TABLE IF NOT EXISTS bookings_new (
                         id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -69,12 +78,15 @@ class AddForeignKeys:
                     )"""
                 )
 
-                # 2. Копируем данные
+                # 2. Копируем данные. Проверку FK откладываем до конца
+                # транзакции: одна проверка ниже вместо поиска в services
+                # на каждую вставленную строку (сбрасывается на COMMIT)
+                await db.execute("PRAGMA defer_foreign_keys=ON")
                 await db.execute(
                     """INSERT INTO bookings_new 
                        (id, date, time, user_id, username, created_at, service_id, duration_minutes)
-                       SELECT id, date, time, user_id, username, created_at, 
-                              COALESCE(service_id, 1), COALESCE(duration_minutes, 60)
+                       SELECT id, date, time, user_id, username, created_at,
+                              service_id, duration_minutes
                        FROM bookings"""
                 )
 
@@ -84,13 +96,26 @@ class AddForeignKeys:
                 # 4. Переименовываем новую
                 await db.execute("ALTER TABLE bookings_new RENAME TO bookings")
 
-                # 5. Восстанавливаем индексы
+                async with db.execute("PRAGMA foreign_key_check(bookings)") as cursor:
+                    violations = await cursor.fetchall()
+
+                if violations:
+                    await db.rollback()
+                    logger.error(
+                        "❌ %s booking(s) reference missing services, migration rolled back",
+                        len(violations),
+                    )
+                    return False
+
+                await db.commit()
+
+                # 5. Восстанавливаем индексы по уже заполненной таблице:
+                # одна сортировка на индекс вместо вставки в пять B-деревьев
+                # на каждую скопированную строку
+                await db.execute("BEGIN IMMEDIATE")
                 await db.execute(
                     "CREATE INDEX IF NOT EXISTS idx_bookings_date ON bookings(date, time)"
                 )
-                await db.execute(
-                    "CREATE INDEX IF NOT EXISTS idx_bookings_user ON bookings(user_id)"
-                )
                 await db.execute(
                     "CREATE INDEX IF NOT EXISTS idx_bookings_service ON bookings(service_id)"
                 )
@@ -98,9 +123,6 @@ class AddForeignKeys:
                     """CREATE UNIQUE INDEX IF NOT EXISTS idx_user_active_bookings 
                        ON bookings(user_id, date, time)"""
                 )
-                await db.execute(
-                    "CREATE INDEX IF NOT EXISTS idx_bookings_date_time ON bookings(date, time)"
-                )
 
                 await db.commit()
 
@@ -109,14 +131,14 @@ class AddForeignKeys:
                     fks = await cursor.fetchall()
 
                 if fks:
-                    logger.info(f"✅ Successfully added {len(fks)} FOREIGN KEY constraint(s)")
+                    logger.info("✅ Successfully added %s FOREIGN KEY constraint(s)", len(fks))
                     return True
                 else:
                     logger.error("❌ Failed to add FOREIGN KEY constraints")
                     return False
 
         except Exception as e:
-            logger.error(f"❌ Migration v005 failed: {e}", exc_info=True)
+            logger.error("❌ Migration v005 failed: %s", e, exc_info=True)
             return False
 
     @staticmethod
@@ -128,8 +150,11 @@ class AddForeignKeys:
         """
         try:
             async with aiosqlite.connect(DATABASE_PATH) as db:
+                await configure_connection(db)
                 logger.info("🔄 Removing FOREIGN KEY constraints...")
 
+                await db.execute("BEGIN IMMEDIATE")
+
                 # Создаем таблицу без FK
                 await db.execute(
                     """CREATE TABLE IF NOT EXISTS bookings_old (
@@ -145,19 +170,28 @@ class AddForeignKeys:
                     )"""
                 )
 
+                # Явный список колонок: не зависит от их порядка в таблице
                 await db.execute(
-                    """INSERT INTO bookings_old SELECT * FROM bookings"""
+                    """INSERT INTO bookings_old
+                       (id, date, time, user_id, username, created_at, service_id, duration_minutes)
+                       SELECT id, date, time, user_id, username, created_at,
+                              service_id, duration_minutes
+                       FROM bookings"""
                 )
 
                 await db.execute("DROP TABLE bookings")
                 await db.execute("ALTER TABLE bookings_old RENAME TO bookings")
 
-                # Восстанавливаем индексы
+                await db.commit()
+
+                # Восстанавливаем индексы по уже заполненной таблице
+                await db.execute("BEGIN IMMEDIATE")
                 await db.execute(
                     "CREATE INDEX IF NOT EXISTS idx_bookings_date ON bookings(date, time)"
                 )
                 await db.execute(
-                    "CREATE INDEX IF NOT EXISTS idx_bookings_user ON bookings(user_id)"
+                    """CREATE UNIQUE INDEX IF NOT EXISTS idx_user_active_bookings
+                       ON bookings(user_id, date, time)"""
                 )
 
                 await db.commit()
@@ -166,7 +200,7 @@ class AddForeignKeys:
                 return True
 
         except Exception as e:
-            logger.error(f"❌ Migration v005 rollback failed: {e}", exc_info=True)
+            logger.error("❌ Migration v005 rollback failed: %s", e, exc_info=True)
             return False
 
 
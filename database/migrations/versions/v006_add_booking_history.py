@@ -26,7 +26,7 @@ class AddBookingHistory(Migration):
 
     async def upgrade(self, db: aiosqlite.Connection) -> None:
         """Применить миграцию"""
-        logging.info(f"[v{self.version}] Creating booking_history table...")
+        logging.info("[v%s] Creating booking_history table...", self.version)
 
         # Создаем таблицу истории
         await db.execute(
@@ -79,11 +79,11 @@ class AddBookingHistory(Migration):
             """
         )
 
-        logging.info(f"[v{self.version}] ✅ booking_history table created with indexes")
+        logging.info("[v%s] ✅ booking_history table created with indexes", self.version)
 
     async def downgrade(self, db: aiosqlite.Connection) -> None:
         """Откат миграции"""
-        logging.info(f"[v{self.version}] Dropping booking_history table...")
+        logging.info("[v%s] Dropping booking_history table...", self.version)
 
         # Удаляем индексы
         await db.execute("DROP INDEX IF EXISTS idx_booking_history_booking")
@@ -94,7 +94,7 @@ class AddBookingHistory(Migration):
         # Удаляем таблицу
         await db.execute("DROP TABLE IF EXISTS booking_history")
 
-        logging.info(f"[v{self.version}] ✅ booking_history table dropped")
+        logging.info("[v%s] ✅ booking_history table dropped", self.version)
 
     async def validate(self, db: aiosqlite.Connection) -> bool:
         """Проверить применение миграции"""
@@ -103,7 +103,7 @@ class AddBookingHistory(Migration):
         ) as cursor:
             result = await cursor.fetchone()
             if not result:
-                logging.error(f"[v{self.version}] ❌ Validation failed: table not found")
+                logging.error("[v%s] ❌ Validation failed: table not found", self.version)
                 return False
 
         # Проверяем структуру
@@ -130,7 +130,7 @@ class AddBookingHistory(Migration):
             if not required_columns.issubset(column_names):
                 missing = required_columns - column_names
                 logging.error(
-                    f"[v{self.version}] ❌ Validation failed: missing columns {missing}"
+                    "[v%s] ❌ Validation failed: missing columns %s", self.version, missing
                 )
                 return False
 
@@ -151,8 +151,8 @@ class AddBookingHistory(Migration):
             if not required_indexes.issubset(index_names):
                 missing = required_indexes - index_names
                 logging.warning(
-                    f"[v{self.version}] ⚠️ Some indexes missing: {missing} (non-critical)"
+                    "[v%s] ⚠️ Some indexes missing: %s (non-critical)", self.version, missing
                 )
 
-        logging.info(f"[v{self.version}] ✅ Validation passed")
+        logging.info("[v%s] ✅ Validation passed", self.version)
         return True
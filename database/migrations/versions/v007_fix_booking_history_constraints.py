@@ -25,7 +25,7 @@ class FixBookingHistoryConstraints(Migration):
 
     async def upgrade(self, db: aiosqlite.Connection) -> None:
         """Применить миграцию"""
-        logging.info(f"[v{self.version}] Fixing booking_history constraints...")
+        logging.info("[v%s] Fixing booking_history constraints...", self.version)
 
         # 1. Проверяем есть ли таблица
         async with db.execute(
@@ -34,11 +34,11 @@ class FixBookingHistoryConstraints(Migration):
             table_exists = await cursor.fetchone()
 
         if not table_exists:
-            logging.info(f"[v{self.version}] Table doesn't exist, skipping")
+            logging.info("[v%s] Table doesn't exist, skipping", self.version)
             return
 
         # 2. Сохраняем данные
-        logging.info(f"[v{self.version}] Backing up data...")
+        logging.info("[v%s] Backing up data...", self.version)
         await db.execute(
             """
             CREATE TABLE IF NOT EXISTS booking_history_backup AS
@@ -56,7 +56,7 @@ class FixBookingHistoryConstraints(Migration):
         await db.execute("DROP TABLE IF EXISTS booking_history")
 
         # 5. Создаем новую таблицу БЕЗ CHECK constraint
-        logging.info(f"[v{self.version}] Creating new table without constraints...")
+        logging.info("[v%s] Creating new table without constraints...", self.version)
         await db.execute(
             """
             CREATE TABLE booking_history (
@@ -78,7 +78,7 @@ class FixBookingHistoryConstraints(Migration):
         )
 
         # 6. Восстанавливаем данные
-        logging.info(f"[v{self.version}] Restoring data...")
+        logging.info("[v%s] Restoring data...", self.version)
         await db.execute(
             """
             INSERT INTO booking_history
@@ -90,7 +90,7 @@ class FixBookingHistoryConstraints(Migration):
         await db.execute("DROP TABLE booking_history_backup")
 
         # 8. Восстанавливаем индексы
-        logging.info(f"[v{self.version}] Recreating indexes...")
+        logging.info("[v%s] Recreating indexes...", self.version)
         await db.execute(
             "CREATE INDEX idx_booking_history_booking ON booking_history(booking_id)"
         )
@@ -104,8 +104,8 @@ class FixBookingHistoryConstraints(Migration):
             "CREATE INDEX idx_booking_history_changed_at ON booking_history(changed_at)"
         )
 
-        logging.info(f"[v{self.version}] ✅ Constraints fixed successfully")
+        logging.info("[v%s] ✅ Constraints fixed successfully", self.version)
 
     async def downgrade(self, db: aiosqlite.Connection) -> None:
         """Откат миграции"""
-        logging.info(f"[v{self.version}] Rollback not needed (constraint removal)")
+        logging.info("[v%s] Rollback not needed (constraint removal)", self.version)
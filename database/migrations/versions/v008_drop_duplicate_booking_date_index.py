@@ -0,0 +1,36 @@
+"""Миграция v008: Удаление дублирующего индекса bookings(date, time)
+
+Проблема:
+- idx_bookings_date и idx_bookings_date_time построены по одним и тем же
+  колонкам (date, time)
+- Каждая вставка/изменение записи обновляет оба B-дерева
+
+Решение:
+- Удалить idx_bookings_date_time, поиск по (date, time) идёт через
+  idx_bookings_date
+"""
+
+import logging
+
+import aiosqlite
+
+from database.migrations.migration_manager import Migration
+
+
+class DropDuplicateBookingDateIndex(Migration):
+    """Миграция: Удаление idx_bookings_date_time"""
+
+    version = 8
+    description = "Drop idx_bookings_date_time (duplicate of idx_bookings_date)"
+
+    async def upgrade(self, db: aiosqlite.Connection) -> None:
+        """Применить миграцию"""
+        await db.execute("DROP INDEX IF EXISTS idx_bookings_date_time")
+        logging.info("[v%s] ✅ idx_bookings_date_time dropped", self.version)
+
+    async def downgrade(self, db: aiosqlite.Connection) -> None:
+        """Откат миграции"""
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_bookings_date_time ON bookings(date, time)"
+        )
+        logging.info("[v%s] idx_bookings_date_time restored", self.version)
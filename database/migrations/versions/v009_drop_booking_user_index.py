@@ -0,0 +1,34 @@
+"""Миграция v009: Удаление индекса bookings(user_id)
+
+Проблема:
+- idx_bookings_user(user_id) повторяет префикс составного
+  idx_user_active_bookings(user_id, date, time)
+- Каждая вставка/удаление записи обновляет лишнее B-дерево
+
+Решение:
+- Удалить idx_bookings_user, запросы по user_id используют префикс
+  idx_user_active_bookings
+"""
+
+import logging
+
+import aiosqlite
+
+from database.migrations.migration_manager import Migration
+
+
+class DropBookingUserIndex(Migration):
+    """Миграция: Удаление idx_bookings_user"""
+
+    version = 9
+    description = "Drop idx_bookings_user (prefix of idx_user_active_bookings)"
+
+    async def upgrade(self, db: aiosqlite.Connection) -> None:
+        """Применить миграцию"""
+        await db.execute("DROP INDEX IF EXISTS idx_bookings_user")
+        logging.info("[v%s] ✅ idx_bookings_user dropped", self.version)
+
+    async def downgrade(self, db: aiosqlite.Connection) -> None:
+        """Откат миграции"""
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_bookings_user ON bookings(user_id)")
+        logging.info("[v%s] idx_bookings_user restored", self.version)
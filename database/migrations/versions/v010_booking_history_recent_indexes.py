@@ -0,0 +1,51 @@
+"""Миграция v010: Составные индексы booking_history для выборки последних изменений
+
+Проблема:
+- get_booking_history (WHERE booking_id=? ORDER BY changed_at DESC) и
+  get_user_history (WHERE changed_by=? ORDER BY changed_at DESC LIMIT ?)
+  находили строки по одноколоночному индексу и затем сортировали их
+
+Решение:
+- Заменить idx_booking_history_booking и idx_booking_history_changed_by
+  на индексы (booking_id, changed_at DESC) и (changed_by, changed_at DESC):
+  строки читаются сразу в нужном порядке
+"""
+
+import logging
+
+import aiosqlite
+
+from database.migrations.migration_manager import Migration
+
+
+class BookingHistoryRecentIndexes(Migration):
+    """Миграция: Индексы (booking_id|changed_by, changed_at DESC)"""
+
+    version = 10
+    description = "Index booking_history by booking/author with changed_at DESC"
+
+    async def upgrade(self, db: aiosqlite.Connection) -> None:
+        """Применить миграцию"""
+        await db.execute("DROP INDEX IF EXISTS idx_booking_history_booking")
+        await db.execute("DROP INDEX IF EXISTS idx_booking_history_changed_by")
+        await db.execute(
+            """CREATE INDEX IF NOT EXISTS idx_booking_history_booking_recent
+            ON booking_history(booking_id, changed_at DESC)"""
+        )
+        await db.execute(
+            """CREATE INDEX IF NOT EXISTS idx_booking_history_changed_by_recent
+            ON booking_history(changed_by, changed_at DESC)"""
+        )
+        logging.info("[v%s] ✅ booking_history recent indexes created", self.version)
+
+    async def downgrade(self, db: aiosqlite.Connection) -> None:
+        """Откат миграции"""
+        await db.execute("DROP INDEX IF EXISTS idx_booking_history_booking_recent")
+        await db.execute("DROP INDEX IF EXISTS idx_booking_history_changed_by_recent")
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_booking_history_booking ON booking_history(booking_id)"
+        )
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_booking_history_changed_by ON booking_history(changed_by)"
+        )
+        logging.info("[v%s] booking_history single-column indexes restored", self.version)
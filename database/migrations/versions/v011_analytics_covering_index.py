@@ -0,0 +1,41 @@
+"""Миграция v011: Покрывающий индекс analytics по времени
+
+Проблема:
+- idx_analytics_timestamp(timestamp) находит строки за период, но за
+  event/user_id каждый раз идёт в саму таблицу
+
+Решение:
+- idx_analytics_ts_user_event(timestamp, user_id, event): отчёты за период
+  читаются только из индекса
+- idx_analytics_timestamp становится его префиксом и удаляется
+"""
+
+import logging
+
+import aiosqlite
+
+from database.migrations.migration_manager import Migration
+
+
+class AnalyticsCoveringIndex(Migration):
+    """Миграция: idx_analytics_timestamp -> idx_analytics_ts_user_event"""
+
+    version = 11
+    description = "Replace idx_analytics_timestamp with covering (timestamp, user_id, event)"
+
+    async def upgrade(self, db: aiosqlite.Connection) -> None:
+        """Применить миграцию"""
+        await db.execute(
+            """CREATE INDEX IF NOT EXISTS idx_analytics_ts_user_event
+            ON analytics(timestamp, user_id, event)"""
+        )
+        await db.execute("DROP INDEX IF EXISTS idx_analytics_timestamp")
+        logging.info("[v%s] ✅ idx_analytics_ts_user_event created", self.version)
+
+    async def downgrade(self, db: aiosqlite.Connection) -> None:
+        """Откат миграции"""
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_analytics_timestamp ON analytics(timestamp)"
+        )
+        await db.execute("DROP INDEX IF EXISTS idx_analytics_ts_user_event")
+        logging.info("[v%s] idx_analytics_timestamp restored", self.version)
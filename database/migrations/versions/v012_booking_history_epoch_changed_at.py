@@ -0,0 +1,104 @@
+"""Миграция v012: booking_history.changed_at как INTEGER (unix time)
+
+Проблема:
+- changed_at хранится ISO-строкой (~26 байт): сравнения в диапазонных
+  запросах — строковые, а записи индексов по changed_at крупнее нужного
+
+Решение:
+- Пересоздать таблицу с changed_at INTEGER NOT NULL
+  DEFAULT (strftime('%s','now'))
+- Перевести существующие значения в секунды unix time. Их писали
+  datetime.now().isoformat(), то есть локальным временем сервера,
+  поэтому используется модификатор 'utc' (локальное -> UTC)
+- Восстановить те же индексы, что были на таблице
+"""
+
+import logging
+
+import aiosqlite
+
+from database.migrations.migration_manager import Migration
+
+COLUMNS = (
+    "id, booking_id, action, changed_by, changed_by_type, old_date, old_time, "
+    "new_date, new_time, old_service_id, new_service_id, reason"
+)
+
+
+class BookingHistoryEpochChangedAt(Migration):
+    """Миграция: changed_at TIMESTAMP TEXT -> INTEGER"""
+
+    version = 12
+    description = "Store booking_history.changed_at as INTEGER unix time"
+
+    async def upgrade(self, db: aiosqlite.Connection) -> None:
+        """Применить миграцию"""
+        async with db.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name='booking_history'"
+        ) as cursor:
+            if not await cursor.fetchone():
+                logging.info("[v%s] Table doesn't exist, skipping", self.version)
+                return
+
+        # Индексы пропадут вместе со старой таблицей — запоминаем их DDL
+        async with db.execute(
+            "SELECT sql FROM sqlite_master "
+            "WHERE type='index' AND tbl_name='booking_history' AND sql IS NOT NULL"
+        ) as cursor:
+            index_sql = [row[0] for row in await cursor.fetchall()]
+
+        await db.execute(
+            """
+            CREATE TABLE booking_history_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                booking_id INTEGER NOT NULL,
+                action TEXT NOT NULL,
+                changed_by INTEGER NOT NULL,
+                changed_by_type TEXT NOT NULL,
+                old_date TEXT,
+                old_time TEXT,
+                new_date TEXT,
+                new_time TEXT,
+                old_service_id INTEGER,
+                new_service_id INTEGER,
+                reason TEXT,
+                changed_at INTEGER NOT NULL DEFAULT (strftime('%s', 'now'))
+            )
+            """
+        )
+
+        await db.execute(
+            f"""
+            INSERT INTO booking_history_new ({COLUMNS}, changed_at)
+            SELECT {COLUMNS},
+                CASE typeof(changed_at)
+                    WHEN 'integer' THEN changed_at
+                    ELSE COALESCE(
+                        CAST(strftime('%s', changed_at, 'utc') AS INTEGER),
+                        CAST(strftime('%s', 'now') AS INTEGER)
+                    )
+                END
+            FROM booking_history
+            """
+        )
+
+        await db.execute("DROP TABLE booking_history")
+        await db.execute("ALTER TABLE booking_history_new RENAME TO booking_history")
+
+        for sql in index_sql:
+            await db.execute(sql)
+
+        logging.info(
+            "[v%s] ✅ changed_at converted, %s index(es) restored", self.version, len(index_sql)
+        )
+
+    async def downgrade(self, db: aiosqlite.Connection) -> None:
+        """Откат миграции: значения обратно в ISO-строки локального времени"""
+        await db.execute(
+            """
+            UPDATE booking_history
+            SET changed_at = strftime('%Y-%m-%dT%H:%M:%S', changed_at, 'unixepoch', 'localtime')
+            WHERE typeof(changed_at) = 'integer'
+            """
+        )
+        logging.info("[v%s] changed_at converted back to ISO text", self.version)
@@ -0,0 +1,83 @@
+"""Миграция v013: Удаление индексов, дублирующих UNIQUE-ограничения
+
+Проблема:
+- idx_bookings_date(date, time) повторяет автоиндекс UNIQUE(date, time)
+  таблицы bookings, idx_blocked_date(date, time) — такой же автоиндекс
+  blocked_slots. Планировщик использует один из них, а обновляются при
+  каждой записи оба
+- idx_booking_history_timestamp(changed_at) повторяет
+  idx_booking_history_changed_at из v006
+
+Решение:
+- Удалить дубликат, если у таблицы есть UNIQUE-индекс ровно по тем же
+  колонкам (старые БД, пересозданные без UNIQUE, свой индекс сохраняют)
+"""
+
+import logging
+
+import aiosqlite
+
+from database.migrations.migration_manager import Migration
+
+# (индекс-дубликат, таблица, колонки, DDL для отката)
+DUPLICATES = (
+    (
+        "idx_bookings_date",
+        "bookings",
+        ("date", "time"),
+        "CREATE INDEX IF NOT EXISTS idx_bookings_date ON bookings(date, time)",
+    ),
+    (
+        "idx_blocked_date",
+        "blocked_slots",
+        ("date", "time"),
+        "CREATE INDEX IF NOT EXISTS idx_blocked_date ON blocked_slots(date, time)",
+    ),
+    (
+        "idx_booking_history_timestamp",
+        "booking_history",
+        ("changed_at",),
+        "CREATE INDEX IF NOT EXISTS idx_booking_history_timestamp "
+        "ON booking_history(changed_at)",
+    ),
+)
+
+
+async def _has_twin_index(
+    db: aiosqlite.Connection, table: str, name: str, columns: tuple
+) -> bool:
+    """Есть ли у таблицы другой индекс с теми же колонками в том же порядке"""
+    async with db.execute(
+        "SELECT il.name, ii.name FROM pragma_index_list(?) AS il "
+        "JOIN pragma_index_info(il.name) AS ii "
+        "WHERE il.name != ? ORDER BY il.name, ii.seqno",
+        (table, name),
+    ) as cursor:
+        rows = await cursor.fetchall()
+
+    indexes = {}
+    for index_name, column in rows:
+        indexes.setdefault(index_name, []).append(column)
+    return any(tuple(cols) == columns for cols in indexes.values())
+
+
+class DropUniqueDuplicateIndexes(Migration):
+    """Миграция: удалить индексы, повторяющие UNIQUE-автоиндексы"""
+
+    version = 13
+    description = "Drop indexes duplicating UNIQUE(date, time) and changed_at indexes"
+
+    async def upgrade(self, db: aiosqlite.Connection) -> None:
+        """Применить миграцию"""
+        for name, table, columns, _ in DUPLICATES:
+            if not await _has_twin_index(db, table, name, columns):
+                logging.info("[v%s] %s has no twin, keeping", self.version, name)
+                continue
+            await db.execute(f"DROP INDEX IF EXISTS {name}")
+            logging.info("[v%s] ✅ %s dropped", self.version, name)
+
+    async def downgrade(self, db: aiosqlite.Connection) -> None:
+        """Откат миграции"""
+        for _, _, _, create_sql in DUPLICATES:
+            await db.execute(create_sql)
+        logging.info("[v%s] Duplicate indexes restored", self.version)
@@ -0,0 +1,103 @@
+"""Миграция v014: audit_log.timestamp как INTEGER (unix time)
+
+Проблема:
+- timestamp хранится ISO-строкой с часовым поясом (~32 байта): диапазонные
+  запросы (лимит добавлений админов, листинг) сравнивают строки, а
+  idx_audit_timestamp и idx_audit_add_admin_rate держат крупные ключи
+
+Решение:
+- Пересоздать таблицу с timestamp INTEGER NOT NULL (секунды, как
+  booking_history.changed_at после v012)
+- Перевести существующие значения: строки писались now_local().isoformat()
+  со смещением (+03:00), которое strftime('%s', ...) учитывает сам
+- Восстановить те же индексы, что были на таблице
+"""
+
+import logging
+
+import aiosqlite
+
+from database.migrations.migration_manager import Migration
+
+COLUMNS = "id, admin_id, action, target_id, details"
+
+
+class AuditLogEpochTimestamp(Migration):
+    """Миграция: audit_log.timestamp TEXT -> INTEGER"""
+
+    version = 14
+    description = "Store audit_log.timestamp as INTEGER unix time"
+
+    async def upgrade(self, db: aiosqlite.Connection) -> None:
+        """Применить миграцию"""
+        async with db.execute("PRAGMA table_info(audit_log)") as cursor:
+            column_types = {col[1]: col[2].upper() for col in await cursor.fetchall()}
+
+        if not column_types:
+            logging.info("[v%s] Table doesn't exist, skipping", self.version)
+            return
+
+        # Свежая БД: init_db уже создал timestamp INTEGER
+        if column_types.get("timestamp") == "INTEGER":
+            logging.info("[v%s] timestamp is already INTEGER, skipping", self.version)
+            return
+
+        # Индексы пропадут вместе со старой таблицей — запоминаем их DDL
+        async with db.execute(
+            "SELECT sql FROM sqlite_master "
+            "WHERE type='index' AND tbl_name='audit_log' AND sql IS NOT NULL"
+        ) as cursor:
+            index_sql = [row[0] for row in await cursor.fetchall()]
+
+        await db.execute(
+            """
+            CREATE TABLE audit_log_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                admin_id INTEGER NOT NULL,
+                action TEXT NOT NULL,
+                target_id TEXT,
+                details TEXT,
+                timestamp INTEGER NOT NULL
+            )
+            """
+        )
+
+        await db.execute(
+            f"""
+            INSERT INTO audit_log_new ({COLUMNS}, timestamp)
+            SELECT {COLUMNS},
+                CASE
+                    WHEN typeof(timestamp) = 'integer' THEN timestamp
+                    -- Колонка TEXT хранит целое строкой цифр; strftime принял
+                    -- бы её за номер юлианского дня
+                    WHEN timestamp <> '' AND timestamp NOT GLOB '*[^0-9]*'
+                        THEN CAST(timestamp AS INTEGER)
+                    ELSE COALESCE(
+                        CAST(strftime('%s', timestamp) AS INTEGER),
+                        CAST(strftime('%s', 'now') AS INTEGER)
+                    )
+                END
+            FROM audit_log
+            """
+        )
+
+        await db.execute("DROP TABLE audit_log")
+        await db.execute("ALTER TABLE audit_log_new RENAME TO audit_log")
+
+        for sql in index_sql:
+            await db.execute(sql)
+
+        logging.info(
+            "[v%s] ✅ timestamp converted, %s index(es) restored", self.version, len(index_sql)
+        )
+
+    async def downgrade(self, db: aiosqlite.Connection) -> None:
+        """Откат миграции: значения обратно в ISO-строки (UTC)"""
+        await db.execute(
+            """
+            UPDATE audit_log
+            SET timestamp = strftime('%Y-%m-%dT%H:%M:%S+00:00', timestamp, 'unixepoch')
+            WHERE typeof(timestamp) = 'integer'
+            """
+        )
+        logging.info("[v%s] timestamp converted back to ISO text", self.version)
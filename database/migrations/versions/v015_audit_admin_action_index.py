@@ -0,0 +1,39 @@
+"""Миграция v015: Составной индекс audit_log(admin_id, action)
+
+Проблема:
+- get_logs / get_logs_count с фильтром admin_id + action находят строки
+  по idx_audit_admin(admin_id), а action проверяют в самой таблице
+
+Решение:
+- idx_audit_admin_action(admin_id, action): оба фильтра — поиск по индексу,
+  COUNT(*) читает только индекс
+- idx_audit_admin становится его префиксом и удаляется
+"""
+
+import logging
+
+import aiosqlite
+
+from database.migrations.migration_manager import Migration
+
+
+class AuditAdminActionIndex(Migration):
+    """Миграция: idx_audit_admin -> idx_audit_admin_action"""
+
+    version = 15
+    description = "Replace idx_audit_admin with composite (admin_id, action)"
+
+    async def upgrade(self, db: aiosqlite.Connection) -> None:
+        """Применить миграцию"""
+        await db.execute(
+            """CREATE INDEX IF NOT EXISTS idx_audit_admin_action
+            ON audit_log(admin_id, action)"""
+        )
+        await db.execute("DROP INDEX IF EXISTS idx_audit_admin")
+        logging.info("[v%s] ✅ idx_audit_admin_action created", self.version)
+
+    async def downgrade(self, db: aiosqlite.Connection) -> None:
+        """Откат миграции"""
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_audit_admin ON audit_log(admin_id)")
+        await db.execute("DROP INDEX IF EXISTS idx_audit_admin_action")
+        logging.info("[v%s] idx_audit_admin restored", self.version)
@@ -0,0 +1,48 @@
+"""Миграция v016: Индексы audit_log под фильтр + сортировку по времени
+
+Проблема:
+- get_logs фильтрует по admin_id и/или action и сортирует по timestamp
+  DESC: idx_audit_admin_action / idx_audit_action находят строки, но
+  сортировку SQLite делает отдельно (USE TEMP B-TREE FOR ORDER BY)
+
+Решение:
+- idx_audit_admin_ts(admin_id, timestamp) и
+  idx_audit_action_ts(action, timestamp): страница читается по индексу
+  в обратном порядке, без сортировки. Колонки по возрастанию: rowid (id)
+  в индексе тоже по возрастанию, и порядок timestamp DESC, id DESC
+  keyset-пагинации совпадает с обратным обходом индекса
+- idx_audit_action становится префиксом idx_audit_action_ts и удаляется
+"""
+
+import logging
+
+import aiosqlite
+
+from database.migrations.migration_manager import Migration
+
+
+class AuditTimestampCompositeIndexes(Migration):
+    """Миграция: (admin_id, timestamp) и (action, timestamp) для audit_log"""
+
+    version = 16
+    description = "Add audit_log (admin_id, timestamp) and (action, timestamp) indexes"
+
+    async def upgrade(self, db: aiosqlite.Connection) -> None:
+        """Применить миграцию"""
+        await db.execute(
+            """CREATE INDEX IF NOT EXISTS idx_audit_admin_ts
+            ON audit_log(admin_id, timestamp)"""
+        )
+        await db.execute(
+            """CREATE INDEX IF NOT EXISTS idx_audit_action_ts
+            ON audit_log(action, timestamp)"""
+        )
+        await db.execute("DROP INDEX IF EXISTS idx_audit_action")
+        logging.info("[v%s] ✅ audit_log timestamp composite indexes created", self.version)
+
+    async def downgrade(self, db: aiosqlite.Connection) -> None:
+        """Откат миграции"""
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_audit_action ON audit_log(action)")
+        await db.execute("DROP INDEX IF EXISTS idx_audit_action_ts")
+        await db.execute("DROP INDEX IF EXISTS idx_audit_admin_ts")
+        logging.info("[v%s] idx_audit_action restored", self.version)
@@ -0,0 +1,44 @@
+"""Миграция v017: Покрывающий индекс для статистики booking_history
+
+Проблема:
+- get_statistics (WHERE changed_at >= ? GROUP BY action,
+  COUNT(DISTINCT changed_by)) по idx_booking_history_changed_at находит
+  диапазон, но за action и changed_by читает каждую строку таблицы
+
+Решение:
+- idx_booking_history_changed_at_action(changed_at, action, changed_by):
+  запрос выполняется только по индексу (COVERING INDEX)
+- idx_booking_history_changed_at становится его префиксом и удаляется;
+  cleanup_old_history (changed_at < ?) использует новый индекс
+"""
+
+import logging
+
+import aiosqlite
+
+from database.migrations.migration_manager import Migration
+
+
+class BookingHistoryStatsIndex(Migration):
+    """Миграция: (changed_at, action, changed_by) для booking_history"""
+
+    version = 17
+    description = "Add covering booking_history (changed_at, action, changed_by) index"
+
+    async def upgrade(self, db: aiosqlite.Connection) -> None:
+        """Применить миграцию"""
+        await db.execute(
+            """CREATE INDEX IF NOT EXISTS idx_booking_history_changed_at_action
+            ON booking_history(changed_at, action, changed_by)"""
+        )
+        await db.execute("DROP INDEX IF EXISTS idx_booking_history_changed_at")
+        logging.info("[v%s] ✅ booking_history statistics index created", self.version)
+
+    async def downgrade(self, db: aiosqlite.Connection) -> None:
+        """Откат миграции"""
+        await db.execute(
+            """CREATE INDEX IF NOT EXISTS idx_booking_history_changed_at
+            ON booking_history(changed_at)"""
+        )
+        await db.execute("DROP INDEX IF EXISTS idx_booking_history_changed_at_action")
+        logging.info("[v%s] idx_booking_history_changed_at restored", self.version)
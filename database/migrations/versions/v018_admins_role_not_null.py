@@ -0,0 +1,81 @@
+"""Миграция v018: admins.role NOT NULL DEFAULT 'moderator'
+
+Проблема:
+- role допускает NULL, поэтому каждое чтение ролей оборачивает колонку
+  в COALESCE(role, 'moderator')
+
+Решение:
+- Пересоздать таблицу с role TEXT NOT NULL DEFAULT 'moderator', заменив
+  существующие NULL на 'moderator'
+- Восстановить те же индексы, что были на таблице
+"""
+
+import logging
+
+import aiosqlite
+
+from database.migrations.migration_manager import Migration
+
+COLUMNS = "user_id, username, added_by, added_at"
+
+
+class AdminsRoleNotNull(Migration):
+    """Миграция: admins.role -> NOT NULL DEFAULT 'moderator'"""
+
+    version = 18
+    description = "Make admins.role NOT NULL DEFAULT 'moderator'"
+
+    async def upgrade(self, db: aiosqlite.Connection) -> None:
+        """Применить миграцию"""
+        async with db.execute("PRAGMA table_info(admins)") as cursor:
+            notnull = {col[1]: col[3] for col in await cursor.fetchall()}
+
+        if not notnull:
+            logging.info("[v%s] Table doesn't exist, skipping", self.version)
+            return
+
+        # Свежая БД: init_db уже создал role NOT NULL
+        if notnull.get("role"):
+            logging.info("[v%s] role is already NOT NULL, skipping", self.version)
+            return
+
+        # Индексы пропадут вместе со старой таблицей — запоминаем их DDL
+        async with db.execute(
+            "SELECT sql FROM sqlite_master "
+            "WHERE type='index' AND tbl_name='admins' AND sql IS NOT NULL"
+        ) as cursor:
+            index_sql = [row[0] for row in await cursor.fetchall()]
+
+        await db.execute(
+            """
+            CREATE TABLE admins_new (
+                user_id INTEGER PRIMARY KEY,
+                username TEXT,
+                added_by INTEGER,
+                added_at TEXT NOT NULL,
+                role TEXT NOT NULL DEFAULT 'moderator'
+            )
+            """
+        )
+
+        await db.execute(
+            f"""
+            INSERT INTO admins_new ({COLUMNS}, role)
+            SELECT {COLUMNS}, COALESCE(role, 'moderator')
+            FROM admins
+            """
+        )
+
+        await db.execute("DROP TABLE admins")
+        await db.execute("ALTER TABLE admins_new RENAME TO admins")
+
+        for sql in index_sql:
+            await db.execute(sql)
+
+        logging.info(
+            "[v%s] ✅ role is NOT NULL, %s index(es) restored", self.version, len(index_sql)
+        )
+
+    async def downgrade(self, db: aiosqlite.Connection) -> None:
+        """Откат миграции: NOT NULL безвреден для старого кода, схема не меняется"""
+        logging.info("[v%s] Nothing to downgrade", self.version)
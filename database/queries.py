@@ -3,9 +3,7 @@
 import logging
 from typing import Dict, List, Optional, Tuple
 
-import aiosqlite
-
-from config import DATABASE_PATH
+from database.connection import DB
 from database.repositories import (
     AdminRepository,
     AnalyticsRepository,
@@ -15,10 +13,118 @@ from database.repositories import (
 )
 from database.repositories.calendar_repository import CalendarRepository
 from database.repositories.settings_repository import SettingsRepository
+from utils.cache import async_ttl_cache
 
 # Реэкспортируем ClientStats для обратной совместимости
 __all__ = ["Database", "ClientStats"]
 
+# Список/число пользователей для рассылки и статистики (секунды)
+USERS_CACHE_TTL = 60
+
+# Схема выполняется одним executescript: один разбор пакета в SQLite
+# вместо отдельного execute (и курсора) на каждую таблицу
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS bookings
+(id INTEGER PRIMARY KEY AUTOINCREMENT,
+date TEXT, time TEXT, user_id INTEGER, username TEXT,
+created_at TEXT, service_id INTEGER DEFAULT 1,
+duration_minutes INTEGER DEFAULT 60,
+UNIQUE(date, time));
+
+CREATE TABLE IF NOT EXISTS users
+(user_id INTEGER PRIMARY KEY, first_seen TEXT);
+
+CREATE TABLE IF NOT EXISTS analytics
+(user_id INTEGER, event TEXT, data TEXT, timestamp TEXT);
+
+CREATE TABLE IF NOT EXISTS feedback
+(user_id INTEGER, booking_id INTEGER, rating INTEGER, timestamp TEXT);
+
+CREATE TABLE IF NOT EXISTS blocked_slots
+(id INTEGER PRIMARY KEY AUTOINCREMENT,
+date TEXT NOT NULL,
+time TEXT NOT NULL,
+reason TEXT,
+blocked_by INTEGER NOT NULL,
+blocked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+UNIQUE(date, time));
+
+CREATE TABLE IF NOT EXISTS admin_sessions
+(user_id INTEGER PRIMARY KEY, message_id INTEGER, updated_at TEXT);
+
+-- Sprint 3: Таблица администраторов
+CREATE TABLE IF NOT EXISTS admins
+(user_id INTEGER PRIMARY KEY,
+username TEXT,
+added_by INTEGER,
+added_at TEXT NOT NULL,
+role TEXT NOT NULL DEFAULT 'moderator');
+
+-- Low Priority: Audit log
+CREATE TABLE IF NOT EXISTS audit_log (
+id INTEGER PRIMARY KEY AUTOINCREMENT,
+admin_id INTEGER NOT NULL,
+action TEXT NOT NULL,
+target_id TEXT,
+details TEXT,
+timestamp INTEGER NOT NULL
+);
+
+-- P0: История изменений записей
+-- ✅ ИСПРАВЛЕНО: Убраны CHECK constraints для совместимости
+CREATE TABLE IF NOT EXISTS booking_history (
+id INTEGER PRIMARY KEY AUTOINCREMENT,
+booking_id INTEGER NOT NULL,
+changed_by INTEGER NOT NULL,
+changed_by_type TEXT NOT NULL,
+action TEXT NOT NULL,
+old_date TEXT,
+old_time TEXT,
+new_date TEXT,
+new_time TEXT,
+old_service_id INTEGER,
+new_service_id INTEGER,
+reason TEXT,
+changed_at INTEGER NOT NULL DEFAULT (strftime('%s', 'now'))
+);
+"""
+
+# Версия схемы init_db, записывается в PRAGMA user_version
+# (schema_migrations ведёт MigrationManager). До неё БД доводится один раз:
+# недостающие колонки старых БД + индексы INDEXES_SQL. Увеличить при
+# изменении INDEXES_SQL, иначе на уже инициализированных БД блок не выполнится.
+INIT_SCHEMA_VERSION = 2
+
+INDEXES_SQL = """
+-- (date, time) обеих таблиц покрыт автоиндексами UNIQUE(date, time)
+CREATE INDEX IF NOT EXISTS idx_bookings_service ON bookings(service_id);
+CREATE INDEX IF NOT EXISTS idx_analytics_user ON analytics(user_id, event);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_user_active_bookings ON bookings(user_id, date, time);
+CREATE INDEX IF NOT EXISTS idx_analytics_ts_user_event ON analytics(timestamp, user_id, event);
+CREATE INDEX IF NOT EXISTS idx_feedback_timestamp ON feedback(timestamp);
+CREATE INDEX IF NOT EXISTS idx_feedback_user ON feedback(user_id);
+CREATE INDEX IF NOT EXISTS idx_admins_added ON admins(added_at);
+CREATE INDEX IF NOT EXISTS idx_audit_admin_action ON audit_log(admin_id, action);
+-- Фильтр get_logs + ORDER BY timestamp DESC без отдельной сортировки
+CREATE INDEX IF NOT EXISTS idx_audit_admin_ts ON audit_log(admin_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_audit_action_ts ON audit_log(action, timestamp);
+CREATE INDEX IF NOT EXISTS idx_audit_timestamp ON audit_log(timestamp);
+-- Лимит добавлений админов: только строки add_admin, поиск по диапазону
+-- (в запросе action='add_admin' должен быть литералом, не параметром)
+CREATE INDEX IF NOT EXISTS idx_audit_add_admin_rate
+ON audit_log(admin_id, timestamp) WHERE action = 'add_admin';
+
+-- P0: Индексы для booking_history
+-- Последние изменения по записи / по автору без сортировки
+CREATE INDEX IF NOT EXISTS idx_booking_history_booking_recent
+ON booking_history(booking_id, changed_at DESC);
+CREATE INDEX IF NOT EXISTS idx_booking_history_changed_by_recent
+ON booking_history(changed_by, changed_at DESC);
+-- get_statistics: диапазон по changed_at, группировка без чтения таблицы
+CREATE INDEX IF NOT EXISTS idx_booking_history_changed_at_action
+ON booking_history(changed_at, action, changed_by);
+"""
+
 
 class Database:
     """
@@ -31,213 +137,91 @@ class Database:
     @staticmethod
     async def init_db():
         """Инициализация БД с таблицами и индексами"""
-        async with aiosqlite.connect(DATABASE_PATH) as db:
-            # Таблицы
-            await db.execute(
-                """CREATE TABLE IF NOT EXISTS bookings
-                (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                date TEXT, time TEXT, user_id INTEGER, username TEXT,
-                created_at TEXT, service_id INTEGER DEFAULT 1,
-                duration_minutes INTEGER DEFAULT 60,
-                UNIQUE(date, time))"""
-            )
-
-            await db.execute(
-                """CREATE TABLE IF NOT EXISTS users
-                (user_id INTEGER PRIMARY KEY, first_seen TEXT)"""
-            )
+        # PRAGMA производительности (WAL, synchronous=NORMAL, mmap, кэш)
+        # применяются при открытии общего подключения, до создания таблиц
+        db = await DB.get()
 
-            await db.execute(
-                """CREATE TABLE IF NOT EXISTS analytics
-                (user_id INTEGER, event TEXT, data TEXT, timestamp TEXT)"""
-            )
+        # journal_mode=WAL сохраняется в файле БД, но на некоторых ФС
+        # (сетевые тома) SQLite молча остаётся в режиме rollback journal
+        cursor = await db.execute("PRAGMA journal_mode")
+        journal_mode = (await cursor.fetchone())[0]
+        if journal_mode.lower() != "wal":
+            logging.warning("⚠️ SQLite journal_mode=%s, WAL недоступен", journal_mode)
 
-            await db.execute(
-                """CREATE TABLE IF NOT EXISTS feedback
-                (user_id INTEGER, booking_id INTEGER, rating INTEGER, timestamp TEXT)"""
-            )
+        async with DB.write_lock:
+            # Вся DDL — одним скриптом в одной транзакции
+            script = ["BEGIN;", SCHEMA_SQL]
 
-            await db.execute(
-                """CREATE TABLE IF NOT EXISTS blocked_slots
-                (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                date TEXT NOT NULL,
-                time TEXT NOT NULL,
-                reason TEXT,
-                blocked_by INTEGER NOT NULL,
-                blocked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(date, time))"""
-            )
+            cursor = await db.execute("PRAGMA user_version")
+            schema_version = (await cursor.fetchone())[0]
+            if schema_version < INIT_SCHEMA_VERSION:
+                script.extend(await Database._upgrade_statements(db))
+                script.append(f"PRAGMA user_version = {INIT_SCHEMA_VERSION};")
 
-            await db.execute(
-                """CREATE TABLE IF NOT EXISTS admin_sessions
-                (user_id INTEGER PRIMARY KEY, message_id INTEGER, updated_at TEXT)"""
-            )
-
-            # Sprint 3: Таблица администраторов
-            await db.execute(
-                """CREATE TABLE IF NOT EXISTS admins
-                (user_id INTEGER PRIMARY KEY,
-                username TEXT,
-                added_by INTEGER,
-                added_at TEXT NOT NULL,
-                role TEXT DEFAULT 'moderator')"""
-            )
-
-            # Low Priority: Audit log
-            await db.execute(
-                """CREATE TABLE IF NOT EXISTS audit_log (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                admin_id INTEGER NOT NULL,
-                action TEXT NOT NULL,
-                target_id TEXT,
-                details TEXT,
-                timestamp TEXT NOT NULL
-            )"""
-            )
-
-            # P0: История изменений записей
-            # ✅ ИСПРАВЛЕНО: Убраны CHECK constraints для совместимости
-            await db.execute(
-                """CREATE TABLE IF NOT EXISTS booking_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                booking_id INTEGER NOT NULL,
-                changed_by INTEGER NOT NULL,
-                changed_by_type TEXT NOT NULL,
-                action TEXT NOT NULL,
-                old_date TEXT,
-                old_time TEXT,
-                new_date TEXT,
-                new_time TEXT,
-                old_service_id INTEGER,
-                new_service_id INTEGER,
-                reason TEXT,
-                changed_at TIMESTAMP NOT NULL
-            )"""
-            )
+            script.append("COMMIT;")
 
-            # P2: Миграция - добавляем service_id если его еще нет
             try:
-                async with db.execute("PRAGMA table_info(bookings)") as cursor:
-                    columns = await cursor.fetchall()
-                    column_names = [col[1] for col in columns]
-
-                    if "service_id" not in column_names:
-                        logging.info("🔄 Добавляем service_id в существующую таблицу bookings...")
-                        await db.execute(
-                            "ALTER TABLE bookings ADD COLUMN service_id INTEGER DEFAULT 1"
-                        )
-                        logging.info("✅ service_id добавлен")
-
-                    if "duration_minutes" not in column_names:
-                        logging.info(
-                            "🔄 Добавляем duration_minutes в существующую таблицу bookings..."
-                        )
-                        await db.execute(
-                            "ALTER TABLE bookings ADD COLUMN duration_minutes INTEGER DEFAULT 60"
-                        )
-                        logging.info("✅ duration_minutes добавлен")
-            except Exception as e:
-                logging.warning(f"⚠️ Не удалось добавить колонки: {e}")
-
-            # Low Priority: Добавляем role если его нет
-            try:
-                async with db.execute("PRAGMA table_info(admins)") as cursor:
-                    columns = await cursor.fetchall()
-                    column_names = [col[1] for col in columns]
-
-                    if "role" not in column_names:
-                        logging.info("🔄 Добавляем role в существующую таблицу admins...")
-                        await db.execute(
-                            "ALTER TABLE admins ADD COLUMN role TEXT DEFAULT 'moderator'"
-                        )
-                        logging.info("✅ role добавлен")
-            except Exception as e:
-                logging.warning(f"⚠️ Не удалось добавить role: {e}")
-
-            # Индексы для производительности
-            await db.execute(
-                """CREATE INDEX IF NOT EXISTS idx_bookings_date
-                ON bookings(date, time)"""
-            )
-            await db.execute(
-                """CREATE INDEX IF NOT EXISTS idx_bookings_user
-                ON bookings(user_id)"""
-            )
-            await db.execute(
-                """CREATE INDEX IF NOT EXISTS idx_bookings_service
-                ON bookings(service_id)"""
-            )
-            await db.execute(
-                """CREATE INDEX IF NOT EXISTS idx_analytics_user
-                ON analytics(user_id, event)"""
-            )
-            await db.execute(
-                """CREATE INDEX IF NOT EXISTS idx_blocked_date
-                ON blocked_slots(date, time)"""
-            )
-            await db.execute(
-                """CREATE UNIQUE INDEX IF NOT EXISTS idx_user_active_bookings
-                ON bookings(user_id, date, time)"""
-            )
-            await db.execute(
-                """CREATE INDEX IF NOT EXISTS idx_analytics_timestamp
-                ON analytics(timestamp)"""
-            )
-            await db.execute(
-                """CREATE INDEX IF NOT EXISTS idx_feedback_timestamp
-                ON feedback(timestamp)"""
-            )
-            await db.execute(
-                """CREATE INDEX IF NOT EXISTS idx_feedback_user
-                ON feedback(user_id)"""
-            )
-            await db.execute(
-                """CREATE INDEX IF NOT EXISTS idx_bookings_date_time
-                ON bookings(date, time)"""
-            )
-            await db.execute(
-                """CREATE INDEX IF NOT EXISTS idx_admins_added
-                ON admins(added_at)"""
-            )
-            await db.execute("CREATE INDEX IF NOT EXISTS idx_audit_admin ON audit_log(admin_id)")
-            await db.execute("CREATE INDEX IF NOT EXISTS idx_audit_action ON audit_log(action)")
-            await db.execute(
-                "CREATE INDEX IF NOT EXISTS idx_audit_timestamp ON audit_log(timestamp)"
-            )
-
-            # P0: Индексы для booking_history
-            await db.execute(
-                "CREATE INDEX IF NOT EXISTS idx_booking_history_booking ON booking_history(booking_id)"
-            )
-            await db.execute(
-                "CREATE INDEX IF NOT EXISTS idx_booking_history_changed_by ON booking_history(changed_by)"
-            )
-            await db.execute(
-                "CREATE INDEX IF NOT EXISTS idx_booking_history_timestamp ON booking_history(changed_at)"
-            )
+                await db.executescript("\n".join(script))
+            except Exception:
+                if db.in_transaction:
+                    await db.execute("ROLLBACK")
+                raise
 
-            await db.commit()
             logging.info("Database initialized with indexes and race condition protection")
 
         # Инициализация дополнительных таблиц
         await SettingsRepository.init_settings_table()
         await CalendarRepository.init_calendar_tables()
-        logging.info("✅ All database tables initialized")
 
-    # === БРОНИРОВАНИЯ (делегирование в BookingRepository) ===
+        # Кэш ролей админов: is_admin на горячем пути не ходит в БД
+        await AdminRepository.preload()
 
-    @staticmethod
-    async def is_slot_free(date_str: str, time_str: str) -> bool:
-        return await BookingRepository.is_slot_free(date_str, time_str)
+        # Статистика для планировщика по только что созданным индексам
+        await DB.optimize()
+        logging.info("✅ All database tables initialized")
 
     @staticmethod
-    async def get_occupied_slots_for_day(date_str: str) -> List[Tuple[str, int]]:
-        """Получить занятые слоты с длительностью
+    async def _upgrade_statements(db) -> List[str]:
+        """DDL для перехода на INIT_SCHEMA_VERSION (выполняется один раз)"""
+        statements = []
 
-        Returns:
-            List[Tuple[time_str, duration_minutes]]
-        """
-        return await BookingRepository.get_occupied_slots_for_day(date_str)
+        # P2: Недостающие колонки старых БД. Проверяем до CREATE TABLE:
+        # у несуществующей таблицы table_info пуст, а новая таблица
+        # создаётся уже с этими колонками
+        async with db.execute("PRAGMA table_info(bookings)") as cursor:
+            column_names = [col[1] for col in await cursor.fetchall()]
+
+        if column_names and "service_id" not in column_names:
+            logging.info("🔄 Добавляем service_id в существующую таблицу bookings...")
+            statements.append("ALTER TABLE bookings ADD COLUMN service_id INTEGER DEFAULT 1;")
+
+        if column_names and "duration_minutes" not in column_names:
+            logging.info("🔄 Добавляем duration_minutes в существующую таблицу bookings...")
+            statements.append(
+                "ALTER TABLE bookings ADD COLUMN duration_minutes INTEGER DEFAULT 60;"
+            )
+
+        # Low Priority: Добавляем role если его нет
+        async with db.execute("PRAGMA table_info(admins)") as cursor:
+            column_names = [col[1] for col in await cursor.fetchall()]
+
+        if column_names and "role" not in column_names:
+            logging.info("🔄 Добавляем role в существующую таблицу admins...")
+            statements.append(
+                "ALTER TABLE admins ADD COLUMN role TEXT NOT NULL DEFAULT 'moderator';"
+            )
+
+        # Индексы — после добавления колонок (idx_bookings_service)
+        statements.append(INDEXES_SQL)
+        return statements
+
+    # === БРОНИРОВАНИЯ (делегирование в BookingRepository) ===
+
+    # Горячие пути — не обёртки, а сами методы репозитория (без лишнего
+    # кадра на вызов). Новый код вызывает BookingRepository напрямую.
+    is_slot_free = staticmethod(BookingRepository.is_slot_free)
+    get_slot_state = staticmethod(BookingRepository.get_slot_state)
+    get_occupied_slots_for_day = staticmethod(BookingRepository.get_occupied_slots_for_day)
 
     @staticmethod
     async def get_month_statuses(year: int, month: int) -> Dict[str, str]:
@@ -261,24 +245,8 @@ class Database:
 
     @staticmethod
     async def get_booking_service_id(booking_id: int) -> Optional[int]:
-        """Получить service_id из бронирования
-
-        Args:
-            booking_id: ID бронирования
-
-        Returns:
-            service_id или None если не найдено
-        """
-        try:
-            async with aiosqlite.connect(DATABASE_PATH) as db:
-                async with db.execute(
-                    "SELECT service_id FROM bookings WHERE id=?", (booking_id,)
-                ) as cursor:
-                    result = await cursor.fetchone()
-                    return result[0] if result else None
-        except Exception as e:
-            logging.error(f"Error getting booking service_id: {e}")
-            return None
+        """Получить service_id из бронирования"""
+        return await BookingRepository.get_booking_service_id(booking_id)
 
     @staticmethod
     async def delete_booking(booking_id: int, user_id: int) -> bool:
@@ -329,12 +297,6 @@ class Database:
     async def unblock_slot(date_str: str, time_str: str) -> bool:
         return await BookingRepository.unblock_slot(date_str, time_str)
 
-    @staticmethod
-    async def is_slot_blocked(date_str: str, time_str: str) -> bool:
-        """ДЕПРЕСИРОВАНО: Используйте is_slot_free() вместо этого"""
-        result = await BookingRepository.is_slot_free(date_str, time_str)
-        return not result
-
     @staticmethod
     async def get_blocked_slots(date_str: str = None) -> List[Tuple]:
         return await BookingRepository.get_blocked_slots(date_str)
@@ -342,30 +304,26 @@ class Database:
     @staticmethod
     async def get_day_status(date_str: str) -> str:
         """Статус загрузки дня (🟢🟡🔴)"""
-        occupied = await BookingRepository.get_occupied_slots_for_day(date_str)
-        from config import WORK_HOURS_END, WORK_HOURS_START
-
-        total_slots = WORK_HOURS_END - WORK_HOURS_START
-        total_occupied = len(occupied)
-
-        if total_occupied == 0:
-            return "🟢"
-        elif total_occupied < total_slots:
-            return "🟡"
-        else:
-            return "🔴"
+        return await BookingRepository.get_day_status(date_str)
 
     # === ПОЛЬЗОВАТЕЛИ (делегирование в UserRepository) ===
 
     @staticmethod
     async def is_new_user(user_id: int) -> bool:
-        return await UserRepository.is_new_user(user_id)
+        is_new = await UserRepository.is_new_user(user_id)
+        if is_new:
+            # Новый пользователь добавлен — сбрасываем кэш списка и счётчика
+            Database.get_all_users.invalidate()
+            Database.get_total_users_count.invalidate()
+        return is_new
 
     @staticmethod
+    @async_ttl_cache(USERS_CACHE_TTL)
     async def get_all_users() -> List[int]:
         return await UserRepository.get_all_users()
 
     @staticmethod
+    @async_ttl_cache(USERS_CACHE_TTL)
     async def get_total_users_count() -> int:
         return await UserRepository.get_total_users_count()
 
@@ -375,9 +333,7 @@ class Database:
 
     # === АНАЛИТИКА И ОТЗЫВЫ (делегирование в AnalyticsRepository) ===
 
-    @staticmethod
-    async def log_event(user_id: int, event: str, data: str = ""):
-        await AnalyticsRepository.log_event(user_id, event, data)
+    log_event = staticmethod(AnalyticsRepository.log_event)
 
     @staticmethod
     async def get_client_stats(user_id: int) -> ClientStats:
@@ -413,14 +369,15 @@ class Database:
         username: Optional[str] = None,
         added_by: Optional[int] = None,
         role: str = "moderator",
+        audit_details: Optional[str] = None,
     ) -> bool:
-        """Добавить администратора"""
-        return await AdminRepository.add_admin(user_id, username, added_by, role)
+        """Добавить администратора (и запись audit_log, если заданы детали)"""
+        return await AdminRepository.add_admin(user_id, username, added_by, role, audit_details)
 
     @staticmethod
-    async def remove_admin(user_id: int) -> bool:
+    async def remove_admin(user_id: int, removed_by: Optional[int] = None) -> bool:
         """Удалить администратора"""
-        return await AdminRepository.remove_admin(user_id)
+        return await AdminRepository.remove_admin(user_id, removed_by)
 
     @staticmethod
     async def get_admin_count() -> int:
@@ -433,6 +390,11 @@ class Database:
         return await AdminRepository.get_admin_role(user_id)
 
     @staticmethod
-    async def update_admin_role(user_id: int, role: str) -> bool:
+    async def update_admin_role(
+        user_id: int,
+        role: str,
+        changed_by: Optional[int] = None,
+        audit_details: Optional[str] = None,
+    ) -> bool:
         """Обновить роль админа"""
-        return await AdminRepository.update_admin_role(user_id, role)
+        return await AdminRepository.update_admin_role(user_id, role, changed_by, audit_details)
@@ -1,19 +1,129 @@
 """Репозиторий для управления администраторами"""
 
 import logging
-from typing import List, Optional, Tuple
+import time
+from typing import Dict, List, Optional, Tuple
 
-import aiosqlite
-
-from config import DATABASE_PATH, ROLE_MODERATOR
-from database.base_repository import BaseRepository
+from config import ROLE_MODERATOR
+from database.audit_queue import INSERT_AUDIT_SQL
+from database.base_repository import BaseRepository, db_call
+from database.connection import DB
+from database.db_retry import db_retry
+from database.repositories.audit_repository import AuditRepository
+from utils.cache import async_ttl_cache
 from utils.helpers import now_local
 
+# Список админов для меню (секунды); за ADMINS_REFRESH_AHEAD до истечения
+# обновляется в фоне
+ADMINS_CACHE_TTL = 30
+ADMINS_REFRESH_AHEAD = 5
+# Как часто (секунды) сверять кэш ролей с PRAGMA data_version. Между
+# сверками is_admin не обращается к БД вовсе
+ROLES_RECHECK_INTERVAL = 5
+
 
 class AdminRepository(BaseRepository):
-    """Репозиторий для управления администраторами"""
+    """Репозиторий для управления администраторами
+
+    is_admin / get_admin_role / get_admin_count читают кэш user_id -> role.
+    Таблица admins мала и меняется редко; кэш перечитывается целиком,
+    когда меняется PRAGMA data_version (запись в БД с другого
+    подключения, сверяется не чаще раза в ROLES_RECHECK_INTERVAL), а
+    изменения через этот репозиторий (их data_version не отражает)
+    вносятся в него на месте.
+
+    Кэш загружается при старте (preload), чтобы первые проверки не
+    ждали чтения таблицы.
+    """
+
+    _roles: Optional[Dict[int, str]] = None
+    _data_version: Optional[int] = None
+    _checked_at: float = 0.0
+
+    @staticmethod
+    async def _get_roles() -> Dict[int, str]:
+        """Кэш user_id -> role, перечитывается только при изменениях"""
+        now = time.monotonic()
+        if (
+            AdminRepository._roles is not None
+            and now - AdminRepository._checked_at < ROLES_RECHECK_INTERVAL
+        ):
+            return AdminRepository._roles
+
+        row = await AdminRepository._execute_fetchone("PRAGMA data_version")
+        data_version = row[0]
+        AdminRepository._checked_at = now
+
+        if AdminRepository._roles is None or data_version != AdminRepository._data_version:
+            rows = await AdminRepository._execute_fetchall("SELECT user_id, role FROM admins")
+            AdminRepository._roles = dict(rows)
+            AdminRepository._data_version = data_version
+
+        return AdminRepository._roles
 
     @staticmethod
+    @db_retry()
+    async def _write_with_audit(query: str, params: tuple, audit: Optional[tuple] = None):
+        """
+        Изменение admins и запись audit_log одной транзакцией.
+
+        Args:
+            query: INSERT/UPDATE/DELETE по admins
+            params: Параметры запроса
+            audit: Параметры AuditRepository.audit_params или None.
+                Запись добавляется, только если запрос изменил строку
+
+        Returns:
+            Курсор изменяющего запроса (rowcount)
+        """
+        db = await DB.get()
+        async with DB.write_lock:
+            await db.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = await db.execute(query, params)
+                if audit is not None and cursor.rowcount > 0:
+                    await db.execute(INSERT_AUDIT_SQL, audit)
+                await db.execute("COMMIT")
+            except Exception:
+                await db.execute("ROLLBACK")
+                raise
+        return cursor
+
+    @staticmethod
+    def invalidate_cache():
+        """
+        Сбросить кэш ролей и списка админов: следующий запрос перечитает БД.
+
+        Нужен после DB.reset() (другая БД) — data_version нового
+        подключения со старым не сравнима.
+        """
+        AdminRepository._roles = None
+        AdminRepository._data_version = None
+        AdminRepository._checked_at = 0.0
+        AdminRepository.get_all_admins.invalidate()
+
+    @staticmethod
+    def _roles_changed(user_id: int, role: Optional[str]):
+        """
+        Учесть собственное изменение admins в кэше ролей без перечитывания.
+
+        Свои записи не меняют PRAGMA data_version, поэтому кэш правится
+        на месте: количество админов (get_admin_count) остаётся len() словаря.
+
+        Args:
+            user_id: Telegram user ID
+            role: Новая роль или None, если админ удалён
+        """
+        if AdminRepository._roles is not None:
+            if role is None:
+                AdminRepository._roles.pop(user_id, None)
+            else:
+                AdminRepository._roles[user_id] = role
+        AdminRepository.get_all_admins.invalidate()
+
+    @staticmethod
+    @async_ttl_cache(ADMINS_CACHE_TTL, refresh_ahead=ADMINS_REFRESH_AHEAD)
+    @db_call(default=[])
     async def get_all_admins() -> List[Tuple[int, str, str, str, str]]:
         """
         Получить всех администраторов.
@@ -21,20 +131,26 @@ class AdminRepository(BaseRepository):
         Returns:
             List[Tuple[user_id, username, added_by, added_at, role]]  # ✅ role added
         """
+        # ✅ Добавлен role
+        return (
+            await AdminRepository._execute_fetchall(
+                "SELECT user_id, username, added_by, added_at, role "
+                "FROM admins ORDER BY added_at"
+            )
+            or []
+        )
+
+    @staticmethod
+    async def preload():
+        """Загрузить кэш ролей (при старте бота, после init_db)"""
         try:
-            async with aiosqlite.connect(DATABASE_PATH) as db:
-                # ✅ Добавлен role
-                async with db.execute(
-                    "SELECT user_id, username, added_by, added_at, "
-                    "COALESCE(role, 'moderator') as role "
-                    "FROM admins ORDER BY added_at"
-                ) as cursor:
-                    return await cursor.fetchall() or []
+            roles = await AdminRepository._get_roles()
+            logging.info("Admin roles preloaded: %s admins", len(roles))
         except Exception as e:
-            logging.error(f"Error getting all admins: {e}")
-            return []
+            logging.error("Error preloading admin roles: %s", e)
 
     @staticmethod
+    @db_call(default=False)
     async def is_admin(user_id: int) -> bool:
         """
         Проверить, является ли пользователь администратором.
@@ -45,14 +161,16 @@ class AdminRepository(BaseRepository):
         Returns:
             True если админ, False если нет
         """
-        return await AdminRepository._exists("admins", "user_id=?", (user_id,))
+        return user_id in await AdminRepository._get_roles()
 
     @staticmethod
+    @db_call(default=False)
     async def add_admin(
         user_id: int,
         username: Optional[str] = None,
         added_by: Optional[int] = None,
-        role: str = ROLE_MODERATOR,  # ✅ NEW: роль по умолчанию
+        role: Optional[str] = ROLE_MODERATOR,  # ✅ NEW: роль по умолчанию
+        audit_details: Optional[str] = None,
     ) -> bool:
         """
         Добавить администратора.
@@ -61,53 +179,66 @@ class AdminRepository(BaseRepository):
             user_id: Telegram user ID
             username: Username пользователя
             added_by: ID админа, который добавил
-            role: Роль (super_admin, moderator)
+            role: Роль (super_admin, moderator); None — ROLE_MODERATOR
+            audit_details: Если задано (и задан added_by), в той же
+                транзакции пишется audit_log "add_admin"
 
         Returns:
             True если успешно, False если ошибка
         """
-        try:
-            async with aiosqlite.connect(DATABASE_PATH) as db:
-                await db.execute(
-                    "INSERT OR IGNORE INTO admins (user_id, username, added_by, added_at, role) "
-                    "VALUES (?, ?, ?, ?, ?)",
-                    (user_id, username, added_by, now_local().isoformat(), role),
-                )
-                await db.commit()
-                logging.info(f"Admin added: user_id={user_id}, role={role}, by={added_by}")
-                return True
-        except Exception as e:
-            logging.error(f"Error adding admin {user_id}: {e}")
-            return False
+        # admins.role NOT NULL: INSERT OR IGNORE с NULL молча не вставил бы строку
+        role = role or ROLE_MODERATOR
+
+        audit = None
+        if audit_details is not None and added_by is not None:
+            audit = AuditRepository.audit_params(added_by, "add_admin", user_id, audit_details)
+
+        cursor = await AdminRepository._write_with_audit(
+            "INSERT OR IGNORE INTO admins (user_id, username, added_by, added_at, role) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (user_id, username, added_by, now_local().isoformat(timespec="seconds"), role),
+            audit,
+        )
+        if cursor.rowcount > 0:
+            AdminRepository._roles_changed(user_id, role)
+        logging.info("Admin added: user_id=%s, role=%s, by=%s", user_id, role, added_by)
+        return True
 
     @staticmethod
-    async def remove_admin(user_id: int) -> bool:
+    @db_call(default=False)
+    async def remove_admin(user_id: int, removed_by: Optional[int] = None) -> bool:
         """
         Удалить администратора.
 
         Args:
             user_id: Telegram user ID
+            removed_by: ID админа, который удалил; если задан, в той же
+                транзакции пишется audit_log "remove_admin"
 
         Returns:
             True если успешно, False если ошибка
         """
-        try:
-            async with aiosqlite.connect(DATABASE_PATH) as db:
-                cursor = await db.execute("DELETE FROM admins WHERE user_id=?", (user_id,))
-                await db.commit()
-                deleted = cursor.rowcount > 0
+        audit = None
+        if removed_by is not None:
+            audit = AuditRepository.audit_params(
+                removed_by, "remove_admin", user_id, "removed from system"
+            )
 
-                if deleted:
-                    logging.info(f"Admin removed: user_id={user_id}")
-                else:
-                    logging.warning(f"Admin not found: user_id={user_id}")
+        cursor = await AdminRepository._write_with_audit(
+            "DELETE FROM admins WHERE user_id=?", (user_id,), audit
+        )
+        deleted = cursor.rowcount > 0
 
-                return deleted
-        except Exception as e:
-            logging.error(f"Error removing admin {user_id}: {e}")
-            return False
+        if deleted:
+            AdminRepository._roles_changed(user_id, None)
+            logging.info("Admin removed: user_id=%s", user_id)
+        else:
+            logging.warning("Admin not found: user_id=%s", user_id)
+
+        return deleted
 
     @staticmethod
+    @db_call(default=0)
     async def get_admin_count() -> int:
         """
         Получить количество администраторов.
@@ -115,16 +246,10 @@ class AdminRepository(BaseRepository):
         Returns:
             Количество админов
         """
-        try:
-            async with aiosqlite.connect(DATABASE_PATH) as db:
-                async with db.execute("SELECT COUNT(*) FROM admins") as cursor:
-                    result = await cursor.fetchone()
-                    return result[0] if result else 0
-        except Exception as e:
-            logging.error(f"Error getting admin count: {e}")
-            return 0
+        return len(await AdminRepository._get_roles())
 
     @staticmethod
+    @db_call()
     async def get_admin_info(user_id: int) -> Optional[Tuple[str, int, str, str]]:
         """
         Получить информацию об админе.
@@ -135,19 +260,14 @@ class AdminRepository(BaseRepository):
         Returns:
             Tuple[username, added_by, added_at, role] или None
         """
-        try:
-            async with aiosqlite.connect(DATABASE_PATH) as db:
-                async with db.execute(
-                    "SELECT username, added_by, added_at, COALESCE(role, 'moderator') as role "
-                    "FROM admins WHERE user_id=?",
-                    (user_id,),
-                ) as cursor:
-                    return await cursor.fetchone()
-        except Exception as e:
-            logging.error(f"Error getting admin info for {user_id}: {e}")
-            return None
+        # Берём из кэшированного списка: админов единицы, запрос к БД не нужен
+        for admin_id, *info in await AdminRepository.get_all_admins():
+            if admin_id == user_id:
+                return tuple(info)
+        return None
 
     @staticmethod
+    @db_call()
     async def get_admin_role(user_id: int) -> Optional[str]:
         """
         ✅ NEW: Получить роль админа.
@@ -158,36 +278,46 @@ class AdminRepository(BaseRepository):
         Returns:
             Роль (super_admin, moderator) или None
         """
-        try:
-            async with aiosqlite.connect(DATABASE_PATH) as db:
-                async with db.execute(
-                    "SELECT COALESCE(role, 'moderator') FROM admins WHERE user_id=?",
-                    (user_id,),
-                ) as cursor:
-                    result = await cursor.fetchone()
-                    return result[0] if result else None
-        except Exception as e:
-            logging.error(f"Error getting admin role for {user_id}: {e}")
-            return None
+        return (await AdminRepository._get_roles()).get(user_id)
 
     @staticmethod
-    async def update_admin_role(user_id: int, role: str) -> bool:
+    @db_call(default=False)
+    async def update_admin_role(
+        user_id: int,
+        role: str,
+        changed_by: Optional[int] = None,
+        audit_details: Optional[str] = None,
+    ) -> bool:
         """
         ✅ NEW: Обновить роль админа.
 
         Args:
             user_id: Telegram user ID
             role: Новая роль
+            changed_by: ID админа, который изменил; если задан, в той же
+                транзакции пишется audit_log "change_admin_role"
+            audit_details: Детали для audit_log
 
         Returns:
-            True если успешно
+            True если роль обновлена, False если админ не найден или ошибка
         """
-        try:
-            async with aiosqlite.connect(DATABASE_PATH) as db:
-                await db.execute("UPDATE admins SET role=? WHERE user_id=?", (role, user_id))
-                await db.commit()
-                logging.info(f"Admin role updated: user_id={user_id}, role={role}")
-                return True
-        except Exception as e:
-            logging.error(f"Error updating admin role for {user_id}: {e}")
-            return False
+        audit = None
+        if changed_by is not None:
+            audit = AuditRepository.audit_params(
+                changed_by, "change_admin_role", user_id, audit_details
+            )
+
+        cursor = await AdminRepository._write_with_audit(
+            "UPDATE admins SET role=? WHERE user_id=?", (role, user_id), audit
+        )
+        # rowcount приходит вместе с результатом UPDATE: проверочный
+        # SELECT (или RETURNING) не нужен
+        updated = cursor.rowcount > 0
+
+        if updated:
+            AdminRepository._roles_changed(user_id, role)
+            logging.info("Admin role updated: user_id=%s, role=%s", user_id, role)
+        else:
+            logging.warning("Admin not found: user_id=%s", user_id)
+
+        return updated
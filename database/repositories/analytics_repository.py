@@ -7,6 +7,7 @@ from typing import List, Optional, Tuple
 import aiosqlite
 
 from config import DATABASE_PATH
+from database.analytics_queue import INSERT_EVENT_SQL, AnalyticsQueue
 from database.base_repository import BaseRepository
 from utils.helpers import now_local
 
@@ -26,13 +27,17 @@ class AnalyticsRepository(BaseRepository):
 
     @staticmethod
     async def log_event(user_id: int, event: str, data: str = ""):
-        """Логирование события"""
+        """Логирование события
+
+        При запущенной AnalyticsQueue событие пишется фоном пакетом,
+        иначе (или при переполнении очереди) — сразу.
+        """
+        row = (user_id, event, data, now_local().isoformat(timespec="seconds"))
+        if AnalyticsQueue.put(row):
+            return
+
         try:
-            await AnalyticsRepository._execute_query(
-                "INSERT INTO analytics (user_id, event, data, timestamp) VALUES (?, ?, ?, ?)",
-                (user_id, event, data, now_local().isoformat()),
-                commit=True,
-            )
+            await AnalyticsRepository._execute_commit(INSERT_EVENT_SQL, row)
         except Exception as e:
             # Не падаем, только логируем
             logging.error(f"Failed to log event {event} for user {user_id}: {e}")
@@ -52,19 +57,17 @@ class AnalyticsRepository(BaseRepository):
             )
 
             # Средний рейтинг
-            avg_result = await AnalyticsRepository._execute_query(
+            avg_result = await AnalyticsRepository._execute_fetchone(
                 "SELECT AVG(rating) FROM feedback WHERE user_id=?",
                 (user_id,),
-                fetch_one=True,
             )
             avg_rating = avg_result[0] if avg_result and avg_result[0] else 0.0
 
             # Последняя запись
-            last_result = await AnalyticsRepository._execute_query(
+            last_result = await AnalyticsRepository._execute_fetchone(
                 "SELECT data FROM analytics WHERE user_id=? AND event='booking_created' "
                 "ORDER BY timestamp DESC LIMIT 1",
                 (user_id,),
-                fetch_one=True,
             )
             last_booking = last_result[0] if last_result else None
 
@@ -104,12 +107,11 @@ class AnalyticsRepository(BaseRepository):
         """Топ клиентов по количеству записей"""
         try:
             return (
-                await AnalyticsRepository._execute_query(
+                await AnalyticsRepository._execute_fetchall(
                     """SELECT user_id, COUNT(*) as total FROM analytics
                     WHERE event='booking_created'
                     GROUP BY user_id ORDER BY total DESC LIMIT ?""",
                     (limit,),
-                    fetch_all=True,
                 )
                 or []
             )
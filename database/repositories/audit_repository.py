@@ -1,17 +1,58 @@
 """Repository for audit logging"""
 
+import asyncio
+import csv
 import logging
+from datetime import datetime
 from typing import List, Optional, Tuple
 
-import aiosqlite
-
-from config import DATABASE_PATH
+from config import TIMEZONE
+from database.audit_queue import INSERT_AUDIT_SQL, AuditQueue
 from database.base_repository import BaseRepository
-from utils.helpers import now_local
+from utils.cache import async_ttl_cache
+from utils.helpers import unix_now
+
+# Счётчик записей для пагинации (секунды): страница audit log не
+# пересчитывает всю таблицу при каждом листании
+LOGS_COUNT_CACHE_TTL = 10
+
+# Экспорт в CSV: страницы по EXPORT_CHUNK_SIZE строк (keyset по
+# (timestamp, id)), всего не больше EXPORT_MAX_ROWS последних записей
+EXPORT_CHUNK_SIZE = 1024
+EXPORT_MAX_ROWS = 100000
+EXPORT_COLUMNS = "id, admin_id, action, target_id, details, timestamp"
+EXPORT_FIRST_PAGE_SQL = (
+    f"SELECT {EXPORT_COLUMNS} FROM audit_log ORDER BY timestamp DESC, id DESC LIMIT ?"
+)
+EXPORT_NEXT_PAGE_SQL = (
+    f"SELECT {EXPORT_COLUMNS} FROM audit_log WHERE (timestamp, id) < (?, ?) "
+    "ORDER BY timestamp DESC, id DESC LIMIT ?"
+)
+
+# Ключ keyset-пагинации get_logs: (timestamp, id)
+PageKey = Tuple[int, int]
 
 
 class AuditRepository(BaseRepository):
-    """Репозиторий для audit log"""
+    """Репозиторий для audit log
+
+    timestamp хранится INTEGER (unix time, секунды); наружу get_logs
+    отдаёт ISO-строку в TIMEZONE, как раньше.
+    """
+
+    @staticmethod
+    def audit_params(
+        admin_id: int,
+        action: str,
+        target_id: Optional[str] = None,
+        details: Optional[str] = None,
+    ) -> tuple:
+        """Параметры INSERT_AUDIT_SQL (для записи в чужой транзакции)
+
+        target_id передаётся как есть: колонка TEXT, и SQLite сам приводит
+        числа к тексту при записи (0 сохраняется как '0', а не NULL).
+        """
+        return (admin_id, action, target_id, details, unix_now())
 
     @staticmethod
     async def log_action(
@@ -29,44 +70,75 @@ class AuditRepository(BaseRepository):
             target_id: ID цели (например, user_id или booking_id)
             details: Дополнительные детали
 
+        При запущенной AuditQueue запись пишется фоном пакетом (ответ
+        администратору её не ждёт), иначе (или при переполнении) — сразу.
+
         Returns:
-            True если успешно
+            True если запись поставлена в очередь или записана
         """
+        row = AuditRepository.audit_params(admin_id, action, target_id, details)
+        if AuditQueue.put(row):
+            logging.info("Audit: admin=%s action=%s target=%s", admin_id, action, target_id)
+            return True
+
         try:
-            async with aiosqlite.connect(DATABASE_PATH) as db:
-                await db.execute(
-                    "INSERT INTO audit_log (admin_id, action, target_id, details, timestamp) "
-                    "VALUES (?, ?, ?, ?, ?)",
-                    (
-                        admin_id,
-                        action,
-                        str(target_id) if target_id else None,
-                        details,
-                        now_local().isoformat(),
-                    ),
-                )
-                await db.commit()
-                logging.info(f"Audit: admin={admin_id} action={action} target={target_id}")
-                return True
+            await AuditRepository._execute_commit(INSERT_AUDIT_SQL, row)
+            logging.info("Audit: admin=%s action=%s target=%s", admin_id, action, target_id)
+            return True
         except Exception as e:
-            logging.error(f"Error logging audit action: {e}")
+            logging.error("Error logging audit action: %s", e)
             return False
 
+    @staticmethod
+    async def get_admin_additions_since(admin_id: int, since: int) -> Tuple[int, Optional[int]]:
+        """
+        Сколько админов добавил admin_id после since (для rate limit).
+
+        Запрос читает только частичный индекс idx_audit_add_admin_rate.
+
+        Args:
+            admin_id: ID администратора
+            since: Граница (unix time, секунды)
+
+        Returns:
+            Tuple[количество, самый ранний timestamp (unix time) или None]
+
+        Raises:
+            Ошибки БД пробрасываются вызывающему коду
+        """
+        row = await AuditRepository._execute_fetchone(
+            "SELECT COUNT(*), MIN(timestamp) FROM audit_log "
+            "WHERE action = 'add_admin' AND admin_id = ? AND timestamp > ?",
+            (admin_id, since),
+        )
+        return row[0], row[1]
+
+    @staticmethod
+    def page_key(row: Tuple[int, int, str, str, str, str]) -> PageKey:
+        """Ключ keyset-пагинации (timestamp, id) строки из get_logs"""
+        return int(datetime.fromisoformat(row[5]).timestamp()), row[0]
+
     @staticmethod
     async def get_logs(
         admin_id: Optional[int] = None,
         action: Optional[str] = None,
         limit: int = 100,
-        offset: int = 0,
+        before: Optional[PageKey] = None,
+        after: Optional[PageKey] = None,
     ) -> List[Tuple[int, int, str, str, str, str]]:
         """
-        Получить записи audit log.
+        Получить записи audit log, новые первыми.
+
+        Пагинация по ключу (keyset), а не OFFSET: следующая страница —
+        строки до ключа последней строки текущей, поэтому любая страница
+        читается по индексу за O(limit), а не с пропуском offset строк.
 
         Args:
             admin_id: Фильтр по admin_id
             action: Фильтр по action
             limit: Максимум записей
-            offset: Смещение для пагинации
+            before: Ключ page_key(): строки старше него (следующая страница)
+            after: Ключ page_key(): строки новее него (предыдущая страница)
 
         Returns:
             List[Tuple[id, admin_id, action, target_id, details, timestamp]]
@@ -84,23 +156,37 @@ class AuditRepository(BaseRepository):
                 conditions.append("action=?")
                 params.append(action)
 
+            if before is not None:
+                conditions.append("(timestamp, id) < (?, ?)")
+                params.extend(before)
+            elif after is not None:
+                conditions.append("(timestamp, id) > (?, ?)")
+                params.extend(after)
+
             if conditions:
                 query += " WHERE " + " AND ".join(conditions)
 
-            query += " ORDER BY timestamp DESC LIMIT ? OFFSET ?"
-            params.extend([limit, offset])
+            # Для предыдущей страницы идём от ключа вверх и разворачиваем
+            order = "ASC" if before is None and after is not None else "DESC"
+            query += f" ORDER BY timestamp {order}, id {order} LIMIT ?"
+            params.append(limit)
+
+            rows = await AuditRepository._execute_fetchall(query, tuple(params))
+            if order == "ASC":
+                rows.reverse()
 
-            async with aiosqlite.connect(DATABASE_PATH) as db:
-                async with db.execute(query, params) as cursor:
-                    return await cursor.fetchall() or []
+            return [
+                (*row[:5], datetime.fromtimestamp(row[5], TIMEZONE).isoformat()) for row in rows
+            ]
         except Exception as e:
-            logging.error(f"Error getting audit logs: {e}")
+            logging.error("Error getting audit logs: %s", e)
             return []
 
     @staticmethod
+    @async_ttl_cache(LOGS_COUNT_CACHE_TTL)
     async def get_logs_count(admin_id: Optional[int] = None, action: Optional[str] = None) -> int:
         """
-        Подсчитать количество записей.
+        Подсчитать количество записей (кэшируется на LOGS_COUNT_CACHE_TTL).
 
         Args:
             admin_id: Фильтр по admin_id
@@ -125,12 +211,10 @@ class AuditRepository(BaseRepository):
             if conditions:
                 query += " WHERE " + " AND ".join(conditions)
 
-            async with aiosqlite.connect(DATABASE_PATH) as db:
-                async with db.execute(query, params) as cursor:
-                    result = await cursor.fetchone()
-                    return result[0] if result else 0
+            result = await AuditRepository._execute_fetchone(query, tuple(params))
+            return result[0] if result else 0
         except Exception as e:
-            logging.error(f"Error counting audit logs: {e}")
+            logging.error("Error counting audit logs: %s", e)
             return 0
 
     @staticmethod
@@ -138,6 +222,11 @@ class AuditRepository(BaseRepository):
         """
         Экспортировать audit log в CSV.
 
+        Журнал читается короткими запросами по EXPORT_CHUNK_SIZE строк
+        (keyset-страницы), а не одним курсором: общее подключение не занято
+        на всё время экспорта. Выгружаются EXPORT_MAX_ROWS последних
+        записей; запись в файл идёт в потоке, не блокируя цикл событий.
+
         Args:
             filepath: Путь к CSV файлу
 
@@ -145,17 +234,42 @@ class AuditRepository(BaseRepository):
             True если успешно
         """
         try:
-            import csv
+            f = await asyncio.to_thread(
+                open, filepath, "w", newline="", encoding="utf-8", buffering=1 << 20
+            )
+            try:
+                writer = csv.writer(f)
+                await asyncio.to_thread(
+                    writer.writerow,
+                    ["ID", "Admin ID", "Action", "Target ID", "Details", "Timestamp"],
+                )
 
-            logs = await AuditRepository.get_logs(limit=100000)
+                exported = 0
+                rows = await AuditRepository._execute_fetchall(
+                    EXPORT_FIRST_PAGE_SQL, (min(EXPORT_CHUNK_SIZE, EXPORT_MAX_ROWS),)
+                )
+                while rows:
+                    await asyncio.to_thread(
+                        writer.writerows,
+                        [
+                            (*row[:5], datetime.fromtimestamp(row[5], TIMEZONE).isoformat())
+                            for row in rows
+                        ],
+                    )
+                    exported += len(rows)
 
-            with open(filepath, "w", newline="", encoding="utf-8") as f:
-                writer = csv.writer(f)
-                writer.writerow(["ID", "Admin ID", "Action", "Target ID", "Details", "Timestamp"])
-                writer.writerows(logs)
+                    limit = min(EXPORT_CHUNK_SIZE, EXPORT_MAX_ROWS - exported)
+                    if len(rows) < EXPORT_CHUNK_SIZE or limit <= 0:
+                        break
+                    last = rows[-1]
+                    rows = await AuditRepository._execute_fetchall(
+                        EXPORT_NEXT_PAGE_SQL, (last[5], last[0], limit)
+                    )
+            finally:
+                await asyncio.to_thread(f.close)
 
-            logging.info(f"Audit log exported to {filepath}")
+            logging.info("Audit log exported to %s: %s rows", filepath, exported)
             return True
         except Exception as e:
-            logging.error(f"Error exporting audit log: {e}")
+            logging.error("Error exporting audit log: %s", e)
             return False
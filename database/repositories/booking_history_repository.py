@@ -8,18 +8,91 @@ Priority: P0 (High)
 - Очистка старых записей
 """
 
+import itertools
 import logging
+from collections import namedtuple
 from datetime import datetime
 from typing import List, Optional
 
 import aiosqlite
 
-from config import DATABASE_PATH
 from database.base_repository import BaseRepository
+from database.history_queue import INSERT_HISTORY_SQL, BookingHistoryQueue
+from utils.cache import async_ttl_cache
+from utils.helpers import unix_now
+
+# Статистику запрашивают панели админов; минутная задержка допустима
+STATISTICS_CACHE_TTL = 60
+
+# Ошибки record_* идут сериями (например, БД заблокирована): полный
+# traceback пишется для одной ошибки из TRACEBACK_SAMPLE_RATE, остальные —
+# только текст исключения
+TRACEBACK_SAMPLE_RATE = 64
+_traceback_sample = itertools.cycle((True,) + (False,) * (TRACEBACK_SAMPLE_RATE - 1))
+
+# Поля строк get_booking_history / get_user_history — в порядке SELECT
+BOOKING_HISTORY_COLUMNS = (
+    "id",
+    "action",
+    "changed_by",
+    "changed_by_type",
+    "old_date",
+    "old_time",
+    "new_date",
+    "new_time",
+    "old_service_id",
+    "new_service_id",
+    "reason",
+    "changed_at",
+)
+USER_HISTORY_COLUMNS = (
+    "id",
+    "booking_id",
+    "action",
+    "changed_by_type",
+    "old_date",
+    "old_time",
+    "new_date",
+    "new_time",
+    "reason",
+    "changed_at",
+)
+
+# Строка — кортеж с именованными полями (row.action), а не dict на каждую
+# запись; словарь при необходимости — row._asdict()
+BookingHistoryRow = namedtuple("BookingHistoryRow", BOOKING_HISTORY_COLUMNS)
+UserHistoryRow = namedtuple("UserHistoryRow", USER_HISTORY_COLUMNS)
 
 
 class BookingHistoryRepository(BaseRepository):
-    """Репозиторий для управления историей бронирований"""
+    """Репозиторий для управления историей бронирований
+
+    Методы record_* принимают необязательное подключение db: если оно
+    передано, строка истории вставляется в уже открытую транзакцию
+    изменения записи и фиксируется одним COMMIT вместе с ней. Без db
+    строка уходит в BookingHistoryQueue (или пишется сразу, если очередь
+    не запущена).
+
+    changed_at хранится как unix time (INTEGER); методы чтения отдают его
+    ISO-строкой локального времени, как и раньше (переводит сам SQLite).
+    """
+
+    @staticmethod
+    async def _insert(row: tuple, db: Optional[aiosqlite.Connection]) -> None:
+        """Вставить строку истории в транзакцию вызывающего кода или отдельно
+
+        Args:
+            row: Значения всех колонок INSERT_HISTORY_SQL
+            db: Подключение с открытой транзакцией или None
+        """
+        if db is not None:
+            await db.execute(INSERT_HISTORY_SQL, row)
+            return
+
+        if BookingHistoryQueue.put(row):
+            return
+
+        await BookingHistoryRepository._execute_commit(INSERT_HISTORY_SQL, row)
 
     @staticmethod
     async def record_create(
@@ -28,6 +101,7 @@ class BookingHistoryRepository(BaseRepository):
         date: str,
         time: str,
         service_id: int,
+        db: Optional[aiosqlite.Connection] = None,
     ) -> bool:
         """Записать создание бронирования
 
@@ -37,40 +111,43 @@ class BookingHistoryRepository(BaseRepository):
             date: Дата записи
             time: Время записи
             service_id: ID услуги
+            db: Подключение с открытой транзакцией (commit делает вызывающий)
 
         Returns:
             True если запись успешна
         """
         try:
-            async with aiosqlite.connect(DATABASE_PATH) as db:
-                await db.execute(
-                    """
-                    INSERT INTO booking_history (
-                        booking_id, action, changed_by, changed_by_type,
-                        new_date, new_time, new_service_id, changed_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        booking_id,
-                        "create",
-                        user_id,
-                        "user",
-                        date,
-                        time,
-                        service_id,
-                        datetime.now().isoformat(),
-                    ),
-                )
-                await db.commit()
+            await BookingHistoryRepository._insert(
+                (
+                    booking_id,
+                    "create",
+                    user_id,
+                    "user",
+                    None,
+                    None,
+                    date,
+                    time,
+                    None,
+                    service_id,
+                    None,
+                    unix_now(),
+                ),
+                db,
+            )
 
             logging.info(
-                f"📝 Recorded booking create: booking_id={booking_id}, "
-                f"user={user_id}, date={date}, time={time}"
+                "📝 Recorded booking create: booking_id=%s, user=%s, date=%s, time=%s",
+                booking_id,
+                user_id,
+                date,
+                time,
             )
             return True
 
         except Exception as e:
-            logging.error(f"❌ Failed to record booking create: {e}", exc_info=True)
+            logging.error(
+                "❌ Failed to record booking create: %s", e, exc_info=next(_traceback_sample)
+            )
             return False
 
     @staticmethod
@@ -82,6 +159,7 @@ class BookingHistoryRepository(BaseRepository):
         time: str,
         service_id: int,
         reason: Optional[str] = None,
+        db: Optional[aiosqlite.Connection] = None,
     ) -> bool:
         """Записать отмену бронирования
 
@@ -93,41 +171,42 @@ class BookingHistoryRepository(BaseRepository):
             time: Время записи
             service_id: ID услуги
             reason: Причина отмены
+            db: Подключение с открытой транзакцией (commit делает вызывающий)
 
         Returns:
             True если запись успешна
         """
         try:
-            async with aiosqlite.connect(DATABASE_PATH) as db:
-                await db.execute(
-                    """
-                    INSERT INTO booking_history (
-                        booking_id, action, changed_by, changed_by_type,
-                        old_date, old_time, old_service_id, reason, changed_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        booking_id,
-                        "cancel",
-                        user_id,
-                        changed_by_type,
-                        date,
-                        time,
-                        service_id,
-                        reason,
-                        datetime.now().isoformat(),
-                    ),
-                )
-                await db.commit()
+            await BookingHistoryRepository._insert(
+                (
+                    booking_id,
+                    "cancel",
+                    user_id,
+                    changed_by_type,
+                    date,
+                    time,
+                    None,
+                    None,
+                    service_id,
+                    None,
+                    reason,
+                    unix_now(),
+                ),
+                db,
+            )
 
             logging.info(
-                f"📝 Recorded booking cancel: booking_id={booking_id}, "
-                f"by={changed_by_type}, reason={reason}"
+                "📝 Recorded booking cancel: booking_id=%s, by=%s, reason=%s",
+                booking_id,
+                changed_by_type,
+                reason,
             )
             return True
 
         except Exception as e:
-            logging.error(f"❌ Failed to record booking cancel: {e}", exc_info=True)
+            logging.error(
+                "❌ Failed to record booking cancel: %s", e, exc_info=next(_traceback_sample)
+            )
             return False
 
     @staticmethod
@@ -142,6 +221,7 @@ class BookingHistoryRepository(BaseRepository):
         old_service_id: Optional[int] = None,
         new_service_id: Optional[int] = None,
         reason: Optional[str] = None,
+        db: Optional[aiosqlite.Connection] = None,
     ) -> bool:
         """Записать перенос бронирования
 
@@ -156,49 +236,48 @@ class BookingHistoryRepository(BaseRepository):
             old_service_id: Старая услуга (опционально)
             new_service_id: Новая услуга (опционально)
             reason: Причина переноса
+            db: Подключение с открытой транзакцией (commit делает вызывающий)
 
         Returns:
             True если запись успешна
         """
         try:
-            async with aiosqlite.connect(DATABASE_PATH) as db:
-                await db.execute(
-                    """
-                    INSERT INTO booking_history (
-                        booking_id, action, changed_by, changed_by_type,
-                        old_date, old_time, new_date, new_time,
-                        old_service_id, new_service_id, reason, changed_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        booking_id,
-                        "reschedule",
-                        user_id,
-                        changed_by_type,
-                        old_date,
-                        old_time,
-                        new_date,
-                        new_time,
-                        old_service_id,
-                        new_service_id,
-                        reason,
-                        datetime.now().isoformat(),
-                    ),
-                )
-                await db.commit()
+            await BookingHistoryRepository._insert(
+                (
+                    booking_id,
+                    "reschedule",
+                    user_id,
+                    changed_by_type,
+                    old_date,
+                    old_time,
+                    new_date,
+                    new_time,
+                    old_service_id,
+                    new_service_id,
+                    reason,
+                    unix_now(),
+                ),
+                db,
+            )
 
             logging.info(
-                f"📝 Recorded booking reschedule: booking_id={booking_id}, "
-                f"from {old_date} {old_time} to {new_date} {new_time}"
+                "📝 Recorded booking reschedule: booking_id=%s, from %s %s to %s %s",
+                booking_id,
+                old_date,
+                old_time,
+                new_date,
+                new_time,
             )
             return True
 
         except Exception as e:
-            logging.error(f"❌ Failed to record booking reschedule: {e}", exc_info=True)
+            logging.error(
+                "❌ Failed to record booking reschedule: %s", e, exc_info=next(_traceback_sample)
+            )
             return False
 
     @staticmethod
-    async def get_booking_history(booking_id: int) -> List[dict]:
+    async def get_booking_history(booking_id: int) -> List[BookingHistoryRow]:
         """Получить всю историю конкретного бронирования
 
         Args:
@@ -208,50 +287,28 @@ class BookingHistoryRepository(BaseRepository):
             Список записей истории
         """
         try:
-            rows = await BookingHistoryRepository._execute_query(
+            rows = await BookingHistoryRepository._execute_fetchall(
                 """
                 SELECT
                     id, action, changed_by, changed_by_type,
                     old_date, old_time, new_date, new_time,
-                    old_service_id, new_service_id, reason, changed_at
+                    old_service_id, new_service_id, reason,
+                    strftime('%Y-%m-%dT%H:%M:%S', changed_at, 'unixepoch', 'localtime')
                 FROM booking_history
                 WHERE booking_id = ?
                 ORDER BY changed_at DESC
                 """,
                 (booking_id,),
-                fetch_all=True,
             )
 
-            if not rows:
-                return []
-
-            history = []
-            for row in rows:
-                history.append(
-                    {
-                        "id": row[0],
-                        "action": row[1],
-                        "changed_by": row[2],
-                        "changed_by_type": row[3],
-                        "old_date": row[4],
-                        "old_time": row[5],
-                        "new_date": row[6],
-                        "new_time": row[7],
-                        "old_service_id": row[8],
-                        "new_service_id": row[9],
-                        "reason": row[10],
-                        "changed_at": row[11],
-                    }
-                )
-
-            return history
+            return list(map(BookingHistoryRow._make, rows))
 
         except Exception as e:
-            logging.error(f"❌ Failed to get booking history: {e}", exc_info=True)
+            logging.error("❌ Failed to get booking history: %s", e, exc_info=True)
             return []
 
     @staticmethod
-    async def get_user_history(user_id: int, limit: int = 50) -> List[dict]:
+    async def get_user_history(user_id: int, limit: int = 50) -> List[UserHistoryRow]:
         """Получить историю изменений бронирований пользователя
 
         Args:
@@ -262,45 +319,25 @@ class BookingHistoryRepository(BaseRepository):
             Список записей истории
         """
         try:
-            rows = await BookingHistoryRepository._execute_query(
+            rows = await BookingHistoryRepository._execute_fetchall(
                 """
                 SELECT
                     h.id, h.booking_id, h.action, h.changed_by_type,
                     h.old_date, h.old_time, h.new_date, h.new_time,
-                    h.reason, h.changed_at
+                    h.reason,
+                    strftime('%Y-%m-%dT%H:%M:%S', h.changed_at, 'unixepoch', 'localtime')
                 FROM booking_history h
                 WHERE h.changed_by = ?
                 ORDER BY h.changed_at DESC
                 LIMIT ?
                 """,
                 (user_id, limit),
-                fetch_all=True,
             )
 
-            if not rows:
-                return []
-
-            history = []
-            for row in rows:
-                history.append(
-                    {
-                        "id": row[0],
-                        "booking_id": row[1],
-                        "action": row[2],
-                        "changed_by_type": row[3],
-                        "old_date": row[4],
-                        "old_time": row[5],
-                        "new_date": row[6],
-                        "new_time": row[7],
-                        "reason": row[8],
-                        "changed_at": row[9],
-                    }
-                )
-
-            return history
+            return list(map(UserHistoryRow._make, rows))
 
         except Exception as e:
-            logging.error(f"❌ Failed to get user history: {e}", exc_info=True)
+            logging.error("❌ Failed to get user history: %s", e, exc_info=True)
             return []
 
     @staticmethod
@@ -314,59 +351,62 @@ class BookingHistoryRepository(BaseRepository):
             Количество удаленных записей
         """
         try:
-            async with aiosqlite.connect(DATABASE_PATH) as db:
-                cursor = await db.execute(
-                    "DELETE FROM booking_history WHERE changed_at < ?",
-                    (before_date,),
-                )
-                await db.commit()
-                deleted_count = cursor.rowcount
-
-            logging.info(f"🗑️ Cleaned up {deleted_count} old history records")
+            cursor = await BookingHistoryRepository._execute_commit(
+                "DELETE FROM booking_history WHERE changed_at < ?",
+                (int(datetime.fromisoformat(before_date).timestamp()),),
+            )
+            deleted_count = cursor.rowcount
+
+            logging.info("🗑️ Cleaned up %s old history records", deleted_count)
             return deleted_count
 
         except Exception as e:
-            logging.error(f"❌ Failed to cleanup old history: {e}", exc_info=True)
+            logging.error("❌ Failed to cleanup old history: %s", e, exc_info=True)
             return 0
 
+    @staticmethod
+    @async_ttl_cache(STATISTICS_CACHE_TTL)
+    async def _statistics_rows(days: int) -> tuple:
+        """Строки (action, count, unique_users) за период, кэш по days
+
+        Кэшируется неизменяемый кортеж: get_statistics собирает из него
+        новый словарь на каждый вызов. Ошибка запроса не кэшируется.
+        """
+        since = unix_now() - days * 86400
+        rows = await BookingHistoryRepository._execute_fetchall(
+            """
+            SELECT
+                action,
+                COUNT(*) as count,
+                COUNT(DISTINCT changed_by) as unique_users
+            FROM booking_history
+            WHERE changed_at >= ?
+            GROUP BY action
+            """,
+            (since,),
+        )
+        return tuple(tuple(row) for row in rows or ())
+
     @staticmethod
     async def get_statistics(days: int = 30) -> dict:
         """Получить статистику по действиям за период
 
+        Строки кэшируются на STATISTICS_CACHE_TTL по days. Запрос читает
+        только покрывающий индекс idx_booking_history_changed_at_action.
+
         Args:
             days: Количество дней для анализа
 
         Returns:
-            Словарь со статистикой
+            Словарь со статистикой (новый на каждый вызов)
         """
+        stats = {"create": 0, "cancel": 0, "reschedule": 0}
         try:
-            from datetime import timedelta
-
-            since = (datetime.now() - timedelta(days=days)).isoformat()
-
-            rows = await BookingHistoryRepository._execute_query(
-                """
-                SELECT
-                    action,
-                    COUNT(*) as count,
-                    COUNT(DISTINCT changed_by) as unique_users
-                FROM booking_history
-                WHERE changed_at >= ?
-                GROUP BY action
-                """,
-                (since,),
-                fetch_all=True,
-            )
-
-            if not rows:
-                return {"create": 0, "cancel": 0, "reschedule": 0}
-
-            stats = {"create": 0, "cancel": 0, "reschedule": 0}
-            for action, count, unique_users in rows:
-                stats[action] = {"count": count, "unique_users": unique_users}
-
+            rows = await BookingHistoryRepository._statistics_rows(days)
+        except Exception as e:
+            logging.error("❌ Failed to get statistics: %s", e, exc_info=True)
             return stats
 
-        except Exception as e:
-            logging.error(f"❌ Failed to get statistics: {e}", exc_info=True)
-            return {"create": 0, "cancel": 0, "reschedule": 0}
+        for action, count, unique_users in rows:
+            stats[action] = {"count": count, "unique_users": unique_users}
+        return stats
@@ -3,42 +3,83 @@
 import calendar
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import aiosqlite
 
 from config import (
     CANCELLATION_HOURS,
-    DATABASE_PATH,
     MAX_BOOKINGS_PER_USER,
     TIMEZONE,
     WORK_HOURS_END,
     WORK_HOURS_START,
 )
 from database.base_repository import BaseRepository
-from utils.helpers import now_local
+from database.connection import DB, SQLITE_HAS_RETURNING
+from utils.helpers import now_local, unix_now
+
+# Слотов в рабочем дне: день с таким числом занятых — 🔴
+SLOTS_PER_DAY = WORK_HOURS_END - WORK_HOURS_START
+
+# Занятые слоты дня (time, duration_minutes) одним запросом:
+# записи с длительностью услуги + блокировки (60 мин по умолчанию)
+OCCUPIED_SLOTS_SQL = """
+SELECT b.time, COALESCE(s.duration_minutes, 60)
+FROM bookings b
+LEFT JOIN services s ON b.service_id = s.id
+WHERE b.date = ?
+UNION ALL
+SELECT time, 60 FROM blocked_slots WHERE date = ?
+"""
 
 
 class BookingRepository(BaseRepository):
-    """Репозиторий для управления бронированиями"""
+    """Репозиторий для управления бронированиями
+
+    get_month_statuses кэширует статусы дней по (year, month): календарь
+    листают по одним и тем же месяцам. Кэш сбрасывается записями через
+    этот репозиторий (_month_statuses_changed) и при смене PRAGMA
+    data_version — коммитах с других подключений (BookingService).
+    """
+
+    _month_statuses: Dict[Tuple[int, int], Dict[str, str]] = {}
+    _data_version: Optional[int] = None
+    # Растёт при сбросе: результат, посчитанный до сброса, не сохраняется
+    _month_statuses_generation: int = 0
+
+    @staticmethod
+    def _month_statuses_changed():
+        """Сбросить кэш статусов месяца после своей записи в bookings/blocked_slots
+
+        Свои записи не меняют PRAGMA data_version, поэтому сброс явный.
+        """
+        BookingRepository._month_statuses.clear()
+        BookingRepository._month_statuses_generation += 1
+
+    @staticmethod
+    async def get_slot_state(date_str: str, time_str: str) -> Dict[str, bool]:
+        """Состояние слота одним запросом
+
+        Returns:
+            {"free": bool, "booked": bool, "blocked": bool}
+
+        Raises:
+            Ошибки БД пробрасываются (см. is_slot_free)
+        """
+        booked, blocked = await BookingRepository._execute_fetchone(
+            """SELECT
+                EXISTS(SELECT 1 FROM bookings WHERE date=? AND time=?),
+                EXISTS(SELECT 1 FROM blocked_slots WHERE date=? AND time=?)""",
+            (date_str, time_str, date_str, time_str),
+        )
+        return {"free": not (booked or blocked), "booked": bool(booked), "blocked": bool(blocked)}
 
     @staticmethod
     async def is_slot_free(date_str: str, time_str: str) -> bool:
         """Проверить свободен ли слот (включая блокировки)"""
         try:
-            async with aiosqlite.connect(DATABASE_PATH) as db:
-                # Проверяем бронирование
-                booking_exists = await BookingRepository._exists(
-                    "bookings", "date=? AND time=?", (date_str, time_str)
-                )
-                # Проверяем блокировку
-                async with db.execute(
-                    "SELECT 1 FROM blocked_slots WHERE date=? AND time=?",
-                    (date_str, time_str),
-                ) as cursor:
-                    blocked_exists = await cursor.fetchone() is not None
-
-                return not booking_exists and not blocked_exists
+            state = await BookingRepository.get_slot_state(date_str, time_str)
+            return state["free"]
         except Exception as e:
             logging.error(f"Error checking slot {date_str} {time_str}: {e}")
             return False
@@ -51,78 +92,89 @@ class BookingRepository(BaseRepository):
             List[Tuple[time_str, duration_minutes]]
             Например: [('10:00', 60), ('14:00', 90), ('16:00', 120)]
         """
-        occupied = []
         try:
-            # ✅ КРИТИЧНО: Получаем time + duration из JOIN с services
-            async with aiosqlite.connect(DATABASE_PATH) as db:
-                # Забронированные с duration из services
-                async with db.execute(
-                    """SELECT b.time, COALESCE(s.duration_minutes, 60) as duration
-                    FROM bookings b
-                    LEFT JOIN services s ON b.service_id = s.id
-                    WHERE b.date = ?""",
-                    (date_str,),
-                ) as cursor:
-                    bookings = await cursor.fetchall()
-                    if bookings:
-                        occupied.extend((time, duration) for time, duration in bookings)
-
-                # Заблокированные (длительность 60 мин по умолчанию)
-                async with db.execute(
-                    "SELECT time FROM blocked_slots WHERE date = ?", (date_str,)
-                ) as cursor:
-                    blocked = await cursor.fetchall()
-                    if blocked:
-                        occupied.extend((time, 60) for (time,) in blocked)
-
+            return list(
+                await BookingRepository._execute_fetchall(OCCUPIED_SLOTS_SQL, (date_str, date_str))
+            )
         except Exception as e:
             logging.error(f"Error getting occupied slots for {date_str}: {e}")
+            return []
 
-        return occupied
+    @staticmethod
+    async def count_occupied_slots_for_day(date_str: str) -> int:
+        """Число занятых слотов за день (записи + блокировки) одним COUNT"""
+        try:
+            row = await BookingRepository._execute_fetchone(
+                """SELECT (SELECT COUNT(*) FROM bookings WHERE date = ?)
+                        + (SELECT COUNT(*) FROM blocked_slots WHERE date = ?)""",
+                (date_str, date_str),
+            )
+            return row[0] if row else 0
+        except Exception as e:
+            logging.error(f"Error counting occupied slots for {date_str}: {e}")
+            return 0
+
+    @staticmethod
+    async def get_day_status(date_str: str) -> str:
+        """Статус загрузки дня (🟢🟡🔴) одним COUNT по записям и блокировкам"""
+        total_occupied = await BookingRepository.count_occupied_slots_for_day(date_str)
+        if total_occupied == 0:
+            return "🟢"
+        elif total_occupied < SLOTS_PER_DAY:
+            return "🟡"
+        else:
+            return "🔴"
+
+    @staticmethod
+    async def get_month_occupancy_counts(year: int, month: int) -> Dict[str, int]:
+        """Число занятых слотов (записи + блокировки) по дням месяца
+
+        Один запрос на месяц; дни без занятых слотов в результат не попадают.
+        """
+        first_day = datetime(year, month, 1).date().isoformat()
+        last_day_num = calendar.monthrange(year, month)[1]
+        last_day = datetime(year, month, last_day_num).date().isoformat()
+
+        # Объединенный запрос UNION ALL по диапазону дат (covering-индексы по date)
+        rows = await BookingRepository._execute_fetchall(
+            """SELECT date, COUNT(*) FROM (
+                SELECT date FROM bookings WHERE date BETWEEN ? AND ?
+                UNION ALL
+                SELECT date FROM blocked_slots WHERE date BETWEEN ? AND ?
+            ) GROUP BY date""",
+            (first_day, last_day, first_day, last_day),
+        )
+        return dict(rows)
 
     @staticmethod
     async def get_month_statuses(year: int, month: int) -> Dict[str, str]:
-        """Получить статусы всех дней месяца"""
+        """Получить статусы всех дней месяца (кэшируются, см. класс)"""
+        key = (year, month)
         try:
-            first_day = datetime(year, month, 1).date()
-            last_day_num = calendar.monthrange(year, month)[1]
-            last_day = datetime(year, month, last_day_num).date()
-
-            statuses = {}
-            total_slots = WORK_HOURS_END - WORK_HOURS_START
-
-            # Объединенный запрос UNION ALL
-            rows = await BookingRepository._execute_query(
-                """SELECT date, SUM(cnt) as total_count FROM (
-                    SELECT date, COUNT(*) as cnt FROM bookings
-                    WHERE date >= ? AND date <= ? GROUP BY date
-                    UNION ALL
-                    SELECT date, COUNT(*) as cnt FROM blocked_slots
-                    WHERE date >= ? AND date <= ? GROUP BY date
-                ) GROUP BY date""",
-                (
-                    first_day.isoformat(),
-                    last_day.isoformat(),
-                    first_day.isoformat(),
-                    last_day.isoformat(),
-                ),
-                fetch_all=True,
-            )
+            row = await BookingRepository._execute_fetchone("PRAGMA data_version")
+            if row[0] != BookingRepository._data_version:
+                BookingRepository._month_statuses_changed()
+                BookingRepository._data_version = row[0]
 
-            if rows:
-                for date_str, total_count in rows:
-                    if total_count == 0:
-                        statuses[date_str] = "🟢"
-                    elif total_count < total_slots:
-                        statuses[date_str] = "🟡"
-                    else:
-                        statuses[date_str] = "🔴"
+            statuses = BookingRepository._month_statuses.get(key)
+            if statuses is not None:
+                return statuses
 
-            return statuses
+            generation = BookingRepository._month_statuses_generation
+            counts = await BookingRepository.get_month_occupancy_counts(year, month)
         except Exception as e:
             logging.error(f"Error getting month statuses for {year}-{month}: {e}")
             return {}
 
+        # Дней без занятых слотов (🟢) в counts нет — две ветки вместо трёх
+        statuses = {
+            date_str: "🟡" if total_count < SLOTS_PER_DAY else "🔴"
+            for date_str, total_count in counts.items()
+        }
+        if generation == BookingRepository._month_statuses_generation:
+            BookingRepository._month_statuses[key] = statuses
+        return statuses
+
     @staticmethod
     async def get_bookings_for_date(date_str: str) -> List[Dict]:
         """Получить все записи на конкретную дату (для напоминаний)
@@ -141,7 +193,7 @@ class BookingRepository(BaseRepository):
                 - created_at: str
         """
         try:
-            rows = await BookingRepository._execute_query(
+            rows = await BookingRepository._execute_fetchall(
                 """SELECT
                     b.user_id,
                     b.username,
@@ -155,7 +207,6 @@ class BookingRepository(BaseRepository):
                 WHERE b.date = ?
                 ORDER BY b.time""",
                 (date_str,),
-                fetch_all=True,
             )
 
             if not rows:
@@ -200,10 +251,12 @@ class BookingRepository(BaseRepository):
             ]]
         """
         try:
+            # Будущие записи отбираются в SQL по индексу (user_id, date, time).
+            # Время со секундами: запись "10:00" в 10:00:30 уже прошла
             now = now_local()
 
             # ✅ P2: ДОБАВЛЕН JOIN с services для получения полной информации
-            bookings = await BookingRepository._execute_query(
+            return await BookingRepository._execute_fetchall(
                 """SELECT
                     b.id,
                     b.date,
@@ -216,27 +269,10 @@ class BookingRepository(BaseRepository):
                     COALESCE(s.price, '—') as price
                 FROM bookings b
                 LEFT JOIN services s ON b.service_id = s.id
-                WHERE b.user_id = ?
+                WHERE b.user_id = ? AND (b.date, b.time) >= (?, ?)
                 ORDER BY b.date, b.time""",
-                (user_id,),
-                fetch_all=True,
+                (user_id, now.strftime("%Y-%m-%d"), now.strftime("%H:%M:%S")),
             )
-
-            if not bookings:
-                return []
-
-            # Фильтруем только будущие
-            future_bookings = []
-            for booking in bookings:
-                booking_id, date_str, time_str = booking[0], booking[1], booking[2]
-
-                booking_dt_naive = datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M")
-                booking_dt = TIMEZONE.localize(booking_dt_naive)
-
-                if booking_dt >= now:
-                    future_bookings.append(booking)
-
-            return future_bookings
         except Exception as e:
             logging.error(f"Error getting bookings for user {user_id}: {e}")
             return []
@@ -245,8 +281,13 @@ class BookingRepository(BaseRepository):
     async def can_user_book(user_id: int) -> Tuple[bool, int]:
         """Проверить лимит записей пользователя"""
         try:
-            bookings = await BookingRepository.get_user_bookings(user_id)
-            count = len(bookings)
+            # Тот же отбор будущих записей, что в get_user_bookings, но только COUNT
+            now = now_local()
+            count = await BookingRepository._count(
+                "bookings",
+                "user_id = ? AND (date, time) >= (?, ?)",
+                (user_id, now.strftime("%Y-%m-%d"), now.strftime("%H:%M:%S")),
+            )
             return count < MAX_BOOKINGS_PER_USER, count
         except Exception as e:
             logging.error(f"Error checking booking limit for user {user_id}: {e}")
@@ -256,10 +297,10 @@ class BookingRepository(BaseRepository):
     async def can_cancel_booking(date_str: str, time_str: str) -> Tuple[bool, float]:
         """Проверить возможность отмены (>24ч)"""
         try:
-            booking_dt_naive = datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M")
-            booking_dt = TIMEZONE.localize(booking_dt_naive)
-            now = now_local()
-            hours_until = (booking_dt - now).total_seconds() / 3600
+            # fromisoformat (C) вместо strptime; разница — в unix time
+            booking_dt = datetime.fromisoformat(f"{date_str}T{time_str}")
+            booking_ts = booking_dt.replace(tzinfo=TIMEZONE).timestamp()
+            hours_until = (booking_ts - unix_now()) / 3600
             return hours_until >= CANCELLATION_HOURS, hours_until
         except Exception as e:
             logging.error(f"Error checking cancel possibility: {e}")
@@ -268,44 +309,70 @@ class BookingRepository(BaseRepository):
     @staticmethod
     async def get_booking_by_id(booking_id: int, user_id: int) -> Optional[Tuple[str, str, str]]:
         """Получить запись по ID"""
-        return await BookingRepository._execute_query(
-            "SELECT date, time, username FROM bookings WHERE id=? AND user_id=?",
-            (booking_id, user_id),
-            fetch_one=True,
-        )
+        try:
+            return await BookingRepository._execute_fetchone(
+                "SELECT date, time, username FROM bookings WHERE id=? AND user_id=?",
+                (booking_id, user_id),
+            )
+        except Exception as e:
+            logging.error(f"Error getting booking {booking_id}: {e}")
+            return None
+
+    @staticmethod
+    async def get_booking_service_id(booking_id: int) -> Optional[int]:
+        """Получить service_id из бронирования
+
+        Args:
+            booking_id: ID бронирования
+
+        Returns:
+            service_id или None если не найдено
+        """
+        try:
+            result = await BookingRepository._execute_fetchone(
+                "SELECT service_id FROM bookings WHERE id=?", (booking_id,)
+            )
+            return result[0] if result else None
+        except Exception as e:
+            logging.error(f"Error getting booking service_id: {e}")
+            return None
 
     @staticmethod
     async def delete_booking(booking_id: int, user_id: int) -> bool:
         """Удалить запись"""
         try:
-            async with aiosqlite.connect(DATABASE_PATH) as db:
-                cursor = await db.execute(
-                    "DELETE FROM bookings WHERE id=? AND user_id=?",
-                    (booking_id, user_id),
-                )
-                await db.commit()
-                deleted = cursor.rowcount > 0
+            cursor = await BookingRepository._execute_commit(
+                "DELETE FROM bookings WHERE id=? AND user_id=?",
+                (booking_id, user_id),
+            )
+            deleted = cursor.rowcount > 0
 
-                if deleted:
-                    logging.info(f"Booking {booking_id} deleted by user {user_id}")
-                else:
-                    logging.warning(f"Booking {booking_id} not found for user {user_id}")
+            if deleted:
+                BookingRepository._month_statuses_changed()
+                logging.info(f"Booking {booking_id} deleted by user {user_id}")
+            else:
+                logging.warning(f"Booking {booking_id} not found for user {user_id}")
 
-                return deleted
+            return deleted
         except Exception as e:
             logging.error(f"Error deleting booking {booking_id}: {e}")
             return False
 
     @staticmethod
     async def cleanup_old_bookings(before_date: str) -> int:
-        """Удалить старые записи"""
+        """Удалить старые записи
+
+        Один DELETE по диапазону — одна транзакция и один COMMIT
+        на все строки, а не на каждую запись.
+        """
         try:
-            async with aiosqlite.connect(DATABASE_PATH) as db:
-                cursor = await db.execute("DELETE FROM bookings WHERE date < ?", (before_date,))
-                await db.commit()
-                deleted_count = cursor.rowcount
-                logging.info(f"Cleaned up {deleted_count} old bookings")
-                return deleted_count
+            cursor = await BookingRepository._execute_commit(
+                "DELETE FROM bookings WHERE date < ?", (before_date,)
+            )
+            deleted_count = cursor.rowcount
+            BookingRepository._month_statuses_changed()
+            logging.info(f"Cleaned up {deleted_count} old bookings")
+            return deleted_count
         except Exception as e:
             logging.error(f"Error cleaning up old bookings: {e}")
             return 0
@@ -324,7 +391,7 @@ class BookingRepository(BaseRepository):
 
             # ✅ P2: ДОБАВЛЕНА длительность и цена
             return (
-                await BookingRepository._execute_query(
+                await BookingRepository._execute_fetchall(
                     """SELECT
                     b.date,
                     b.time,
@@ -337,7 +404,6 @@ class BookingRepository(BaseRepository):
                 WHERE b.date >= ? AND b.date <= ?
                 ORDER BY b.date, b.time""",
                     (start_date, end_date),
-                    fetch_all=True,
                 )
                 or []
             )
@@ -349,15 +415,14 @@ class BookingRepository(BaseRepository):
     async def block_slot(date_str: str, time_str: str, admin_id: int, reason: str = None) -> bool:
         """Заблокировать слот"""
         try:
-            async with aiosqlite.connect(DATABASE_PATH) as db:
-                await db.execute(
-                    "INSERT INTO blocked_slots (date, time, reason, blocked_by, blocked_at) "
-                    "VALUES (?, ?, ?, ?, ?)",
-                    (date_str, time_str, reason, admin_id, now_local().isoformat()),
-                )
-                await db.commit()
-                logging.info(f"Slot {date_str} {time_str} blocked by admin {admin_id}")
-                return True
+            await BookingRepository._execute_commit(
+                "INSERT INTO blocked_slots (date, time, reason, blocked_by, blocked_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (date_str, time_str, reason, admin_id, now_local().isoformat()),
+            )
+            BookingRepository._month_statuses_changed()
+            logging.info(f"Slot {date_str} {time_str} blocked by admin {admin_id}")
+            return True
         except aiosqlite.IntegrityError:
             logging.warning(f"Slot {date_str} {time_str} already blocked or booked")
             return False
@@ -391,51 +456,63 @@ class BookingRepository(BaseRepository):
             }]
         """
         try:
-            async with aiosqlite.connect(DATABASE_PATH) as db:
-                # Проверяем существующие записи
-                async with db.execute(
-                    "SELECT user_id, username FROM bookings WHERE date=? AND time=?",
-                    (date_str, time_str),
-                ) as cursor:
-                    existing_bookings = await cursor.fetchall()
-
-                cancelled_users = []
-
-                # Если есть записи - удаляем их
-                if existing_bookings:
-                    for user_id, username in existing_bookings:
-                        cancelled_users.append(
-                            {
-                                "user_id": user_id,
-                                "username": username or f"ID{user_id}",
-                                "date": date_str,
-                                "time": time_str,
-                                "reason": reason,
-                            }
+            db = await DB.get()
+            # Удаление брони и блокировка — одна транзакция: слот не
+            # останется без брони и без блокировки при ошибке
+            async with DB.write_lock:
+                await db.execute("BEGIN IMMEDIATE")
+                try:
+                    # Удаляем бронь и сразу получаем, кого уведомить
+                    if SQLITE_HAS_RETURNING:
+                        cancelled = await db.execute_fetchall(
+                            "DELETE FROM bookings WHERE date=? AND time=? "
+                            "RETURNING user_id, username",
+                            (date_str, time_str),
                         )
+                    else:
+                        cancelled = await db.execute_fetchall(
+                            "SELECT user_id, username FROM bookings WHERE date=? AND time=?",
+                            (date_str, time_str),
+                        )
+                        if cancelled:
+                            await db.execute(
+                                "DELETE FROM bookings WHERE date=? AND time=?",
+                                (date_str, time_str),
+                            )
 
-                    # Удаляем бронь
+                    # Блокируем слот
                     await db.execute(
-                        "DELETE FROM bookings WHERE date=? AND time=?", (date_str, time_str)
-                    )
-                    logging.info(
-                        f"Cancelled {len(cancelled_users)} booking(s) for slot {date_str} {time_str}"
+                        "INSERT INTO blocked_slots (date, time, reason, blocked_by, blocked_at) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (date_str, time_str, reason, admin_id, now_local().isoformat()),
                     )
-
-                # Блокируем слот
-                await db.execute(
-                    "INSERT INTO blocked_slots (date, time, reason, blocked_by, blocked_at) "
-                    "VALUES (?, ?, ?, ?, ?)",
-                    (date_str, time_str, reason, admin_id, now_local().isoformat()),
-                )
-                await db.commit()
-
+                    await db.execute("COMMIT")
+                except Exception:
+                    await db.execute("ROLLBACK")
+                    raise
+
+            cancelled_users = [
+                {
+                    "user_id": user_id,
+                    "username": username or f"ID{user_id}",
+                    "date": date_str,
+                    "time": time_str,
+                    "reason": reason,
+                }
+                for user_id, username in cancelled
+            ]
+
+            BookingRepository._month_statuses_changed()
+            if cancelled_users:
                 logging.info(
-                    f"Slot {date_str} {time_str} blocked by admin {admin_id} "
-                    f"with {len(cancelled_users)} cancellations"
+                    f"Cancelled {len(cancelled_users)} booking(s) for slot {date_str} {time_str}"
                 )
+            logging.info(
+                f"Slot {date_str} {time_str} blocked by admin {admin_id} "
+                f"with {len(cancelled_users)} cancellations"
+            )
 
-                return True, cancelled_users
+            return True, cancelled_users
 
         except aiosqlite.IntegrityError:
             logging.warning(f"Slot {date_str} {time_str} already blocked")
@@ -448,16 +525,15 @@ class BookingRepository(BaseRepository):
     async def unblock_slot(date_str: str, time_str: str) -> bool:
         """Разблокировать слот"""
         try:
-            async with aiosqlite.connect(DATABASE_PATH) as db:
-                cursor = await db.execute(
-                    "DELETE FROM blocked_slots WHERE date = ? AND time = ?",
-                    (date_str, time_str),
-                )
-                await db.commit()
-                deleted = cursor.rowcount > 0
-                if deleted:
-                    logging.info(f"Slot {date_str} {time_str} unblocked")
-                return deleted
+            cursor = await BookingRepository._execute_commit(
+                "DELETE FROM blocked_slots WHERE date = ? AND time = ?",
+                (date_str, time_str),
+            )
+            deleted = cursor.rowcount > 0
+            if deleted:
+                BookingRepository._month_statuses_changed()
+                logging.info(f"Slot {date_str} {time_str} unblocked")
+            return deleted
         except Exception as e:
             logging.error(f"Error unblocking slot {date_str} {time_str}: {e}")
             return False
@@ -472,4 +548,8 @@ class BookingRepository(BaseRepository):
             query = "SELECT date, time, reason FROM blocked_slots ORDER BY date, time"
             params = ()
 
-        return await BookingRepository._execute_query(query, params, fetch_all=True) or []
+        try:
+            return await BookingRepository._execute_fetchall(query, params)
+        except Exception as e:
+            logging.error(f"Error getting blocked slots: {e}")
+            return []
@@ -283,7 +283,7 @@ class BookingRepositoryV2(BaseRepository):
                         booking_dt_naive = datetime.strptime(
                             f"{date_str} {time_str}", "%Y-%m-%d %H:%M"
                         )
-                        booking_dt = TIMEZONE.localize(booking_dt_naive)
+                        booking_dt = booking_dt_naive.replace(tzinfo=TIMEZONE)
                         hours_until = (booking_dt - now_local()).total_seconds() / 3600
 
                         if hours_until < CANCELLATION_HOURS:
@@ -460,7 +460,7 @@ class BookingRepositoryV2(BaseRepository):
         try:
             now = now_local()
 
-            bookings = await BookingRepositoryV2._execute_query(
+            bookings = await BookingRepositoryV2._execute_fetchall(
                 """SELECT
                     b.id, b.date, b.time, b.username, b.created_at,
                     b.service_id,
@@ -472,7 +472,6 @@ class BookingRepositoryV2(BaseRepository):
                 WHERE b.user_id = ?
                 ORDER BY b.date, b.time""",
                 (user_id,),
-                fetch_all=True,
             )
 
             if not bookings:
@@ -482,7 +481,7 @@ class BookingRepositoryV2(BaseRepository):
             for booking in bookings:
                 booking_id, date_str, time_str = booking[0], booking[1], booking[2]
                 booking_dt_naive = datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M")
-                booking_dt = TIMEZONE.localize(booking_dt_naive)
+                booking_dt = booking_dt_naive.replace(tzinfo=TIMEZONE)
                 if booking_dt >= now:
                     future_bookings.append(booking)
 
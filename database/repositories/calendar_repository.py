@@ -125,7 +125,7 @@ class CalendarRepository:
                 await db.commit()
                 return True
         except Exception as e:
-            logging.error(f"Error setting weekday schedule: {e}")
+            logging.error("Error setting weekday schedule: %s", e)
             return False
 
     @staticmethod
@@ -166,7 +166,7 @@ class CalendarRepository:
                 await db.commit()
                 return cursor.lastrowid
         except Exception as e:
-            logging.error(f"Error blocking date range: {e}")
+            logging.error("Error blocking date range: %s", e)
             return 0
 
     @staticmethod
@@ -178,7 +178,7 @@ class CalendarRepository:
                 await db.commit()
                 return True
         except Exception as e:
-            logging.error(f"Error unblocking date range: {e}")
+            logging.error("Error unblocking date range: %s", e)
             return False
 
     @staticmethod
@@ -216,7 +216,7 @@ class CalendarRepository:
                 async with db.execute(query, params) as cursor:
                     return await cursor.fetchall()
         except Exception as e:
-            logging.error(f"Error getting blocked ranges: {e}")
+            logging.error("Error getting blocked ranges: %s", e)
             return []
 
     @staticmethod
@@ -267,7 +267,7 @@ class CalendarRepository:
 
                 return False, None
         except Exception as e:
-            logging.error(f"Error checking if date blocked: {e}")
+            logging.error("Error checking if date blocked: %s", e)
             return False, None
 
     @staticmethod
@@ -306,5 +306,5 @@ class CalendarRepository:
                         "shift2_end": row[4],
                     }
         except Exception as e:
-            logging.error(f"Error getting working hours for date: {e}")
+            logging.error("Error getting working hours for date: %s", e)
             return None
@@ -30,12 +30,13 @@ class SettingsRepository:
 
             # Проверяем есть ли настройки рабочих часов
             cursor = await db.execute(
-                "SELECT COUNT(*) FROM settings WHERE key IN ('work_hours_start', 'work_hours_end')"
+                "SELECT 1 FROM settings "
+                "WHERE key IN ('work_hours_start', 'work_hours_end') LIMIT 1"
             )
-            count = (await cursor.fetchone())[0]
+            exists = await cursor.fetchone() is not None
 
             # Если нет - создаем дефолтные из config.py
-            if count == 0:
+            if not exists:
                 await db.execute(
                     """
                     INSERT INTO settings (key, value) VALUES
@@ -46,7 +47,9 @@ class SettingsRepository:
                 )
                 await db.commit()
                 logging.info(
-                    f"Settings table initialized with default work hours: {WORK_HOURS_START}-{WORK_HOURS_END}"
+                    "Settings table initialized with default work hours: %s-%s",
+                    WORK_HOURS_START,
+                    WORK_HOURS_END,
                 )
 
     @classmethod
@@ -85,7 +88,7 @@ class SettingsRepository:
                 return cls._work_hours_cache
 
         except Exception as e:
-            logging.error(f"Error getting work hours from DB: {e}")
+            logging.error("Error getting work hours from DB: %s", e)
             # Fallback к config.py
             return (WORK_HOURS_START, WORK_HOURS_END)
 
@@ -103,15 +106,15 @@ class SettingsRepository:
         """
         # Валидация
         if not (0 <= start_hour <= 23):
-            logging.error(f"Invalid start_hour: {start_hour}")
+            logging.error("Invalid start_hour: %s", start_hour)
             return False
 
         if not (1 <= end_hour <= 24):
-            logging.error(f"Invalid end_hour: {end_hour}")
+            logging.error("Invalid end_hour: %s", end_hour)
             return False
 
         if start_hour >= end_hour:
-            logging.error(f"start_hour ({start_hour}) >= end_hour ({end_hour})")
+            logging.error("start_hour (%s) >= end_hour (%s)", start_hour, end_hour)
             return False
 
         try:
@@ -137,11 +140,11 @@ class SettingsRepository:
             # Обновляем кэш
             cls._work_hours_cache = (start_hour, end_hour)
 
-            logging.info(f"Work hours updated: {start_hour}:00 - {end_hour}:00")
+            logging.info("Work hours updated: %s:00 - %s:00", start_hour, end_hour)
             return True
 
         except Exception as e:
-            logging.error(f"Error updating work hours: {e}")
+            logging.error("Error updating work hours: %s", e)
             return False
 
     @classmethod
@@ -18,10 +18,9 @@ class UserRepository(BaseRepository):
 
             if not exists:
                 # Добавляем нового пользователя
-                await UserRepository._execute_query(
+                await UserRepository._execute_commit(
                     "INSERT INTO users (user_id, first_seen) VALUES (?, ?)",
                     (user_id, now_local().isoformat()),
-                    commit=True,
                 )
                 return True
             return False
@@ -33,7 +32,7 @@ class UserRepository(BaseRepository):
     async def get_all_users() -> List[int]:
         """Получить список всех user_id"""
         try:
-            users = await UserRepository._execute_query("SELECT user_id FROM users", fetch_all=True)
+            users = await UserRepository._execute_fetchall("SELECT user_id FROM users")
             return [user_id for (user_id,) in users] if users else []
         except Exception as e:
             logging.error(f"Error getting all users: {e}")
@@ -42,28 +41,30 @@ class UserRepository(BaseRepository):
     @staticmethod
     async def get_total_users_count() -> int:
         """Получить общее количество пользователей"""
-        return await UserRepository._count("users")
+        try:
+            return await UserRepository._count("users")
+        except Exception as e:
+            logging.error(f"Error counting users: {e}")
+            return 0
 
     @staticmethod
     async def get_favorite_slots(user_id: int) -> Tuple[Optional[str], Optional[int]]:
         """Анализ предпочтений пользователя"""
         try:
             # Любимое время
-            fav_time_result = await UserRepository._execute_query(
+            fav_time_result = await UserRepository._execute_fetchone(
                 "SELECT time, COUNT(*) as cnt FROM bookings WHERE user_id=? "
                 "GROUP BY time ORDER BY cnt DESC LIMIT 1",
                 (user_id,),
-                fetch_one=True,
             )
             fav_time = fav_time_result[0] if fav_time_result else None
 
             # Любимый день недели
-            fav_dow_result = await UserRepository._execute_query(
+            fav_dow_result = await UserRepository._execute_fetchone(
                 """SELECT CAST(strftime('%w', date) AS INTEGER) as dow, COUNT(*) as cnt
                 FROM bookings WHERE user_id=?
                 GROUP BY dow ORDER BY cnt DESC LIMIT 1""",
                 (user_id,),
-                fetch_one=True,
             )
             fav_dow = int(fav_dow_result[0]) if fav_dow_result else None
 
@@ -18,8 +18,9 @@ from aiogram.types import (
     Message,
 )
 
-from config import BROADCAST_DELAY, DAY_NAMES
+from config import BROADCAST_DELAY
 from database.queries import Database
+from i18n.ru import DAY_NAMES
 from keyboards.admin_keyboards import ADMIN_MENU
 from keyboards.user_keyboards import MAIN_MENU
 from services.analytics_service import AnalyticsService
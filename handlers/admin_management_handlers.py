@@ -6,12 +6,11 @@ from aiogram import F, Router
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup, Message
 
-from config import ADMIN_IDS, ROLE_MODERATOR, ROLE_SUPER_ADMIN
+from config import ADMIN_IDS, ADMIN_IDS_ORDERED, ROLE_MODERATOR, ROLE_SUPER_ADMIN
 from database.queries import Database
-from database.repositories.audit_repository import AuditRepository
 from keyboards.admin_keyboards import ADMIN_MENU
 from utils.helpers import is_admin
-from utils.permissions import get_admin_role_display, has_permission
+from utils.permissions import get_admin_role, get_admin_role_display, role_has_permission
 from utils.rate_limiter import AdminRateLimiter
 from utils.states import AdminStates
 
@@ -21,7 +20,7 @@ router = Router()
 @router.message(F.text == "👥 Администраторы")
 async def admin_management_menu(message: Message):
     """Меню управления администраторами"""
-    if not is_admin(message.from_user.id):
+    if not await is_admin(message.from_user.id):
         await message.answer("❌ Нет доступа")
         return
 
@@ -51,7 +50,7 @@ async def admin_management_menu(message: Message):
 @router.callback_query(F.data == "list_admins")
 async def list_admins(callback: CallbackQuery):
     """Список всех администраторов"""
-    if not is_admin(callback.from_user.id):
+    if not await is_admin(callback.from_user.id):
         await callback.answer("❌ Нет доступа", show_alert=True)
         return
 
@@ -59,7 +58,7 @@ async def list_admins(callback: CallbackQuery):
 
     # Статические админы из .env
     text += "🔑 Статические (.env):\n"
-    for admin_id in ADMIN_IDS:
+    for admin_id in ADMIN_IDS_ORDERED:
         user_link = f"<a href='tg://user?id={admin_id}'>{admin_id}</a>"
         role_badge = await get_admin_role_display(admin_id)
         text += f"  • {user_link} {role_badge}\n"
@@ -95,12 +94,13 @@ async def list_admins(callback: CallbackQuery):
 @router.callback_query(F.data == "add_admin_start")
 async def add_admin_start(callback: CallbackQuery, state: FSMContext):
     """Начало добавления админа"""
-    if not is_admin(callback.from_user.id):
+    admin_role = await get_admin_role(callback.from_user.id)
+    if admin_role is None:
         await callback.answer("❌ Нет доступа", show_alert=True)
         return
 
     # ✅ Проверка разрешения
-    if not await has_permission(callback.from_user.id, "manage_admins"):
+    if not role_has_permission(admin_role, "manage_admins"):
         await callback.answer("❌ Недостаточно прав\n\nТолько для Super Admin", show_alert=True)
         return
 
@@ -135,7 +135,7 @@ async def add_admin_start(callback: CallbackQuery, state: FSMContext):
 @router.message(AdminStates.awaiting_new_admin_id)
 async def add_admin_process(message: Message, state: FSMContext):
     """Обработка добавления админа"""
-    if not is_admin(message.from_user.id):
+    if not await is_admin(message.from_user.id):
         await state.clear()
         return
 
@@ -202,7 +202,7 @@ async def add_admin_process(message: Message, state: FSMContext):
 @router.message(AdminStates.awaiting_admin_username)
 async def add_admin_username(message: Message, state: FSMContext):
     """Обработка ручного ввода username"""
-    if not is_admin(message.from_user.id):
+    if not await is_admin(message.from_user.id):
         await state.clear()
         return
 
@@ -254,22 +254,13 @@ async def _finalize_admin_addition(
         username=username,
         added_by=message.from_user.id,
         role=ROLE_MODERATOR,  # Дефолт
+        # ✅ Audit log — в той же транзакции
+        audit_details=f"role={ROLE_MODERATOR}, username={username or 'none'}",
     )
 
     await state.clear()
 
     if success:
-        # ✅ Записываем в rate limiter
-        AdminRateLimiter.record_addition(message.from_user.id)
-
-        # ✅ Audit log
-        await AuditRepository.log_action(
-            admin_id=message.from_user.id,
-            action="add_admin",
-            target_id=str(new_admin_id),
-            details=f"role={ROLE_MODERATOR}, username={username or 'none'}",
-        )
-
         username_display = f"@{username}" if username else "нет username"
         await message.answer(
             f"✅ Администратор добавлен!\n\n"
@@ -302,12 +293,13 @@ async def _finalize_admin_addition(
 @router.callback_query(F.data == "change_role_start")
 async def change_role_start(callback: CallbackQuery):
     """Начало изменения роли"""
-    if not is_admin(callback.from_user.id):
+    admin_role = await get_admin_role(callback.from_user.id)
+    if admin_role is None:
         await callback.answer("❌ Нет доступа", show_alert=True)
         return
 
     # Проверка разрешения
-    if not await has_permission(callback.from_user.id, "manage_admins"):
+    if not role_has_permission(admin_role, "manage_admins"):
         await callback.answer("❌ Недостаточно прав\n\nТолько для Super Admin", show_alert=True)
         return
 
@@ -350,11 +342,12 @@ async def change_role_start(callback: CallbackQuery):
 @router.callback_query(F.data.startswith("select_admin_role:"))
 async def select_admin_role(callback: CallbackQuery):
     """Выбор новой роли для админа"""
-    if not is_admin(callback.from_user.id):
+    admin_role = await get_admin_role(callback.from_user.id)
+    if admin_role is None:
         await callback.answer("❌ Нет доступа", show_alert=True)
         return
 
-    if not await has_permission(callback.from_user.id, "manage_admins"):
+    if not role_has_permission(admin_role, "manage_admins"):
         await callback.answer("❌ Недостаточно прав", show_alert=True)
         return
 
@@ -404,11 +397,12 @@ async def select_admin_role(callback: CallbackQuery):
 @router.callback_query(F.data.startswith("confirm_role:"))
 async def confirm_role_change(callback: CallbackQuery):
     """Подтверждение изменения роли"""
-    if not is_admin(callback.from_user.id):
+    admin_role = await get_admin_role(callback.from_user.id)
+    if admin_role is None:
         await callback.answer("❌ Нет доступа", show_alert=True)
         return
 
-    if not await has_permission(callback.from_user.id, "manage_admins"):
+    if not role_has_permission(admin_role, "manage_admins"):
         await callback.answer("❌ Недостаточно прав", show_alert=True)
         return
 
@@ -443,18 +437,15 @@ async def confirm_role_change(callback: CallbackQuery):
             await callback.answer("❌ Нельзя понизить последнего Super Admin", show_alert=True)
             return
 
-    # Обновляем роль
-    success = await Database.update_admin_role(target_admin_id, new_role)
+    # Обновляем роль (✅ audit log — в той же транзакции)
+    success = await Database.update_admin_role(
+        target_admin_id,
+        new_role,
+        changed_by=callback.from_user.id,
+        audit_details=f"from={current_role} to={new_role}",
+    )
 
     if success:
-        # ✅ Audit log
-        await AuditRepository.log_action(
-            admin_id=callback.from_user.id,
-            action="change_admin_role",
-            target_id=str(target_admin_id),
-            details=f"from={current_role} to={new_role}",
-        )
-
         role_display = "👑 Super Admin" if new_role == ROLE_SUPER_ADMIN else "🛡️ Moderator"
 
         await callback.answer(f"✅ Роль изменена на {role_display}")
@@ -477,12 +468,13 @@ async def confirm_role_change(callback: CallbackQuery):
 @router.callback_query(F.data == "remove_admin_start")
 async def remove_admin_menu(callback: CallbackQuery):
     """Меню удаления админа"""
-    if not is_admin(callback.from_user.id):
+    admin_role = await get_admin_role(callback.from_user.id)
+    if admin_role is None:
         await callback.answer("❌ Нет доступа", show_alert=True)
         return
 
     # ✅ Проверка разрешения
-    if not await has_permission(callback.from_user.id, "manage_admins"):
+    if not role_has_permission(admin_role, "manage_admins"):
         await callback.answer("❌ Недостаточно прав\n\nТолько для Super Admin", show_alert=True)
         return
 
@@ -519,11 +511,12 @@ async def remove_admin_menu(callback: CallbackQuery):
 @router.callback_query(F.data.startswith("remove_admin:"))
 async def remove_admin_confirm(callback: CallbackQuery):
     """Подтверждение удаления админа"""
-    if not is_admin(callback.from_user.id):
+    admin_role = await get_admin_role(callback.from_user.id)
+    if admin_role is None:
         await callback.answer("❌ Нет доступа", show_alert=True)
         return
 
-    if not await has_permission(callback.from_user.id, "manage_admins"):
+    if not role_has_permission(admin_role, "manage_admins"):
         await callback.answer("❌ Недостаточно прав", show_alert=True)
         return
 
@@ -544,18 +537,10 @@ async def remove_admin_confirm(callback: CallbackQuery):
         await callback.answer("❌ Нельзя удалить последнего админа", show_alert=True)
         return
 
-    # Удаляем
-    success = await Database.remove_admin(admin_to_remove)
+    # Удаляем (✅ audit log — в той же транзакции)
+    success = await Database.remove_admin(admin_to_remove, removed_by=callback.from_user.id)
 
     if success:
-        # ✅ Audit log
-        await AuditRepository.log_action(
-            admin_id=callback.from_user.id,
-            action="remove_admin",
-            target_id=str(admin_to_remove),
-            details="removed from system",
-        )
-
         await callback.answer(f"✅ Админ {admin_to_remove} удалён")
 
         # Уведомляем удалённого админа
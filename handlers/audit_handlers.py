@@ -2,13 +2,13 @@
 
 import logging
 from datetime import datetime
+from typing import Optional
 
 from aiogram import F, Router
 from aiogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup, Message
 
-from database.repositories.audit_repository import AuditRepository
-from utils.helpers import is_admin
-from utils.permissions import has_permission
+from database.repositories.audit_repository import AuditRepository, PageKey
+from utils.permissions import get_admin_role, role_has_permission
 
 router = Router()
 
@@ -18,22 +18,31 @@ PAGE_SIZE = 10
 @router.message(F.text == "/audit")
 async def audit_log_menu(message: Message):
     """Просмотр audit log (super_admin only)"""
-    if not is_admin(message.from_user.id):
+    admin_role = await get_admin_role(message.from_user.id)
+    if admin_role is None:
         await message.answer("❌ Нет доступа")
         return
 
     # Проверка разрешения
-    if not await has_permission(message.from_user.id, "view_audit_log"):
+    if not role_has_permission(admin_role, "view_audit_log"):
         await message.answer("❌ Недостаточно прав\n\n" "Только для Super Admin")
         return
 
     await show_audit_page(message, page=0)
 
 
-async def show_audit_page(message: Message, page: int = 0):
-    """Показать страницу audit log"""
-    offset = page * PAGE_SIZE
-    logs = await AuditRepository.get_logs(limit=PAGE_SIZE, offset=offset)
+async def show_audit_page(
+    message: Message,
+    page: int = 0,
+    before: Optional[PageKey] = None,
+    after: Optional[PageKey] = None,
+):
+    """Показать страницу audit log
+
+    Страницы листаются по ключу соседней строки (before/after), номер
+    page нужен только для подписи и кнопок.
+    """
+    logs = await AuditRepository.get_logs(limit=PAGE_SIZE, before=before, after=after)
     total = await AuditRepository.get_logs_count()
 
     if not logs:
@@ -65,12 +74,18 @@ async def show_audit_page(message: Message, page: int = 0):
     # Кнопки навигации
     nav_buttons = []
     if page > 0:
+        ts, log_id = AuditRepository.page_key(logs[0])
         nav_buttons.append(
-            InlineKeyboardButton(text="⬅️ Prev", callback_data=f"audit_page:{page - 1}")
+            InlineKeyboardButton(
+                text="⬅️ Prev", callback_data=f"audit_page:{page - 1}:p:{ts}:{log_id}"
+            )
         )
     if (page + 1) < total_pages:
+        ts, log_id = AuditRepository.page_key(logs[-1])
         nav_buttons.append(
-            InlineKeyboardButton(text="Next ➡️", callback_data=f"audit_page:{page + 1}")
+            InlineKeyboardButton(
+                text="Next ➡️", callback_data=f"audit_page:{page + 1}:n:{ts}:{log_id}"
+            )
         )
 
     if nav_buttons:
@@ -90,32 +105,42 @@ async def show_audit_page(message: Message, page: int = 0):
 @router.callback_query(F.data.startswith("audit_page:"))
 async def audit_page_callback(callback: CallbackQuery):
     """Навигация по страницам"""
-    if not is_admin(callback.from_user.id):
+    admin_role = await get_admin_role(callback.from_user.id)
+    if admin_role is None:
         await callback.answer("❌ Нет доступа", show_alert=True)
         return
 
-    if not await has_permission(callback.from_user.id, "view_audit_log"):
+    if not role_has_permission(admin_role, "view_audit_log"):
         await callback.answer("❌ Недостаточно прав", show_alert=True)
         return
 
+    # audit_page:{page}:{n|p}:{timestamp}:{id}
     try:
-        page = int(callback.data.split(":")[1])
-    except (IndexError, ValueError):
+        _, page, direction, ts, log_id = callback.data.split(":")
+        page = int(page)
+        key = (int(ts), int(log_id))
+    except ValueError:
         await callback.answer("❌ Ошибка", show_alert=True)
         return
 
-    await show_audit_page(callback.message, page)
+    if page <= 0:
+        await show_audit_page(callback.message, 0)
+    elif direction == "n":
+        await show_audit_page(callback.message, page, before=key)
+    else:
+        await show_audit_page(callback.message, page, after=key)
     await callback.answer()
 
 
 @router.callback_query(F.data == "audit_export")
 async def audit_export_callback(callback: CallbackQuery):
     """Экспорт audit log в CSV"""
-    if not is_admin(callback.from_user.id):
+    admin_role = await get_admin_role(callback.from_user.id)
+    if admin_role is None:
         await callback.answer("❌ Нет доступа", show_alert=True)
         return
 
-    if not await has_permission(callback.from_user.id, "export_data"):
+    if not role_has_permission(admin_role, "export_data"):
         await callback.answer("❌ Недостаточно прав", show_alert=True)
         return
 
@@ -9,7 +9,6 @@ from aiogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMar
 
 from config import (
     CANCELLATION_HOURS,
-    DAY_NAMES,
     ERROR_LIMIT_EXCEEDED,
     ERROR_NO_SERVICES,
     ERROR_SERVICE_UNAVAILABLE,
@@ -20,8 +19,10 @@ from config import (
     WORK_HOURS_START,
 )
 from database.queries import Database
+from database.repositories.analytics_repository import AnalyticsRepository
 from database.repositories.booking_repository import BookingRepository  # ✅ P2
 from database.repositories.service_repository import ServiceRepository
+from i18n.ru import DAY_NAMES
 from keyboards.user_keyboards import (
     MAIN_MENU,
     create_cancel_confirmation_keyboard,
@@ -48,7 +49,7 @@ router = Router()
 async def booking_start(message: Message, state: FSMContext):
     """Начало процесса записи - выбор услуги"""
     await state.clear()
-    await Database.log_event(message.from_user.id, "booking_started")
+    await AnalyticsRepository.log_event(message.from_user.id, "booking_started")
 
     can_book, current_count = await Database.can_user_book(message.from_user.id)
 
@@ -195,11 +196,11 @@ async def select_day(callback: CallbackQuery, state: FSMContext):
         return
 
     # ✅ ИСПРАВЛЕНО: Проверяем есть ли свободные слоты с учетом длительности
-    occupied = await Database.get_occupied_slots_for_day(date_str)
+    occupied_count = await BookingRepository.count_occupied_slots_for_day(date_str)
     duration_hours = (service.duration_minutes + 59) // 60  # Округление вверх
     total_slots = WORK_HOURS_END - WORK_HOURS_START - duration_hours + 1
 
-    if total_slots <= 0 or len(occupied) >= total_slots:
+    if total_slots <= 0 or occupied_count >= total_slots:
         await callback.answer(
             "❌ Все слоты на эту дату заняты\n\nВыберите другую дату", show_alert=True
         )
@@ -623,7 +624,7 @@ async def save_feedback(callback: CallbackQuery):
     success = await Database.save_feedback(user_id, booking_id, rating_val)
 
     if success:
-        await Database.log_event(user_id, "feedback_given", str(rating_val))
+        await AnalyticsRepository.log_event(user_id, "feedback_given", str(rating_val))
         await callback.message.edit_text(
             "💚 Спасибо за отзыв!\n\n"
             f"Ваша оценка: {'⭐' * rating_val}\n\n"
@@ -64,19 +64,18 @@ async def process_reschedule_date(
         await state.update_data(reschedule_date=date_str)
 
         # Получаем доступные слоты
-        occupied = await BookingRepository.get_occupied_slots_for_day(date_str)
-        blocked = await BookingRepository.get_blocked_slots(date_str)
+        # Занятые слоты уже включают заблокированные
+        occupied_times = {
+            time_str for time_str, _ in await BookingRepository.get_occupied_slots_for_day(date_str)
+        }
 
         # Генерируем слоты (пока простая логика 9-19)
         from config import WORK_HOURS_END, WORK_HOURS_START
 
-        occupied_times = {slot[0] for slot in occupied}
-        blocked_times = {slot[1] for slot in blocked}
-
         available_slots = []
         for hour in range(WORK_HOURS_START, WORK_HOURS_END):
             time_str = f"{hour:02d}:00"
-            if time_str not in occupied_times and time_str not in blocked_times:
+            if time_str not in occupied_times:
                 available_slots.append(time_str)
 
         if not available_slots:
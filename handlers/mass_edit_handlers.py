@@ -9,6 +9,7 @@ from aiogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMar
 
 from config import WORK_HOURS_END, WORK_HOURS_START
 from database.queries import Database
+from database.repositories.booking_repository import BookingRepository
 from keyboards.admin_keyboards import ADMIN_MENU
 from utils.helpers import is_admin, now_local
 from utils.states import MassEditStates
@@ -168,7 +169,7 @@ async def mass_edit_time_shift(message: Message, state: FSMContext):
                 continue
 
             # Проверка что новое время свободно
-            is_free = await Database.is_slot_free(date_str, new_time)
+            is_free = await BookingRepository.is_slot_free(date_str, new_time)
             if not is_free and new_time != old_time:
                 errors.append(f"{old_time} → {new_time} (занято)")
                 fail_count += 1
@@ -4,6 +4,7 @@ Priority 4 (Низкий): Универсальный редактор поле
 """
 
 import logging
+from functools import lru_cache
 from typing import Dict, List, Optional
 
 import aiosqlite
@@ -67,6 +68,26 @@ EDITABLE_FIELDS_CONFIG = {
 }
 
 
+# SQL собирается из статичной конфигурации, поэтому строится один раз
+# на тип/поле и дальше берётся из кэша
+@lru_cache(maxsize=None)
+def _select_sql(field_type: str, by_id: bool = False) -> str:
+    """SELECT всех редактируемых полей (списком или одной записи по id)"""
+    config = EDITABLE_FIELDS_CONFIG[field_type]
+    all_fields = [config["id_field"]] + list(config["fields"].keys())
+    query = f"SELECT {', '.join(all_fields)} FROM {config['table']}"
+    if by_id:
+        return f"{query} WHERE {config['id_field']} = ?"
+    return f"{query} LIMIT 50"
+
+
+@lru_cache(maxsize=None)
+def _update_sql(field_type: str, field_name: str) -> str:
+    """UPDATE одного поля записи"""
+    config = EDITABLE_FIELDS_CONFIG[field_type]
+    return f"UPDATE {config['table']} SET {field_name} = ? WHERE {config['id_field']} = ?"
+
+
 @router.message(F.text == "✏️ Редактор полей")
 async def field_editor_menu(message: Message, state: FSMContext):
     """Главное меню универсального редактора"""
@@ -118,10 +139,7 @@ async def select_field_type(callback: CallbackQuery, state: FSMContext):
     try:
         async with aiosqlite.connect(DATABASE_PATH) as db:
             # Получаем все поля для отображения
-            all_fields = [config["id_field"]] + list(config["fields"].keys())
-            query = f"SELECT {', '.join(all_fields)} FROM {config['table']} LIMIT 50"
-
-            async with db.execute(query) as cursor:
+            async with db.execute(_select_sql(field_type)) as cursor:
                 records = await cursor.fetchall()
                 column_names = [desc[0] for desc in cursor.description]
     except Exception as e:
@@ -189,10 +207,7 @@ async def select_record(callback: CallbackQuery, state: FSMContext):
     # Получаем текущие значения
     try:
         async with aiosqlite.connect(DATABASE_PATH) as db:
-            all_fields = [config["id_field"]] + list(config["fields"].keys())
-            query = f"SELECT {', '.join(all_fields)} FROM {config['table']} WHERE {config['id_field']} = ?"
-
-            async with db.execute(query, (record_id,)) as cursor:
+            async with db.execute(_select_sql(field_type, by_id=True), (record_id,)) as cursor:
                 record = await cursor.fetchone()
                 column_names = [desc[0] for desc in cursor.description]
     except Exception as e:
@@ -354,8 +369,7 @@ async def apply_field_edit(message: Message, state: FSMContext):
     # Применяем изменение
     try:
         async with aiosqlite.connect(DATABASE_PATH) as db:
-            query = f"UPDATE {config['table']} SET {field_name} = ? WHERE {config['id_field']} = ?"
-            await db.execute(query, (new_value, record_id))
+            await db.execute(_update_sql(field_type, field_name), (new_value, record_id))
             await db.commit()
 
         await state.clear()
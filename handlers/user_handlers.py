@@ -14,6 +14,7 @@ from config import (
     ONBOARDING_DELAY_SHORT,
 )
 from database.queries import Database
+from database.repositories.analytics_repository import AnalyticsRepository
 from database.repositories.service_repository import ServiceRepository
 from keyboards.user_keyboards import MAIN_MENU, create_onboarding_keyboard
 
@@ -28,7 +29,7 @@ async def start_cmd(message: Message, state: FSMContext):
     is_new = await Database.is_new_user(user_id)
 
     if is_new:
-        await Database.log_event(user_id, "user_registered")
+        await AnalyticsRepository.log_event(user_id, "user_registered")
 
         # Приветствие
         await message.answer(
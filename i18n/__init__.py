@@ -0,0 +1 @@
+"""I18n module"""
@@ -0,0 +1,28 @@
+"""Русские названия дней недели и месяцев для календаря и сообщений"""
+
+DAY_NAMES = (
+    "Пн",
+    "Вт",
+    "Ср",
+    "Чт",
+    "Пт",
+    "Сб",
+    "Вс",
+)
+
+DAY_NAMES_SHORT = DAY_NAMES
+
+MONTH_NAMES = (
+    "Январь",
+    "Февраль",
+    "Март",
+    "Апрель",
+    "Май",
+    "Июнь",
+    "Июль",
+    "Август",
+    "Сентябрь",
+    "Октябрь",
+    "Ноябрь",
+    "Декабрь",
+)
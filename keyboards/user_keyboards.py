@@ -11,17 +11,11 @@ from aiogram.types import (
     ReplyKeyboardMarkup,
 )
 
-from config import (
-    CALENDAR_MAX_MONTHS_AHEAD,
-    DAY_NAMES,
-    DAY_NAMES_SHORT,
-    MONTH_NAMES,
-    TIMEZONE,
-    WORK_HOURS_END,
-    WORK_HOURS_START,
-)
+from config import CALENDAR_MAX_MONTHS_AHEAD, TIMEZONE, WORK_HOURS_END, WORK_HOURS_START
 from database.queries import Database
+from database.repositories.booking_repository import BookingRepository
 from database.repositories.service_repository import ServiceRepository
+from i18n.ru import DAY_NAMES, DAY_NAMES_SHORT, MONTH_NAMES
 from utils.helpers import now_local
 
 # Главное меню
@@ -192,7 +186,7 @@ async def create_time_slots(
     duration_minutes = service.duration_minutes if service else 60
 
     # ✅ КРИТИЧНО: Получаем занятые слоты С ДЛИТЕЛЬНОСТЬЮ
-    occupied_slots = await Database.get_occupied_slots_for_day(date_str)
+    occupied_slots = await BookingRepository.get_occupied_slots_for_day(date_str)
 
     free_count = 0
     total_slots = WORK_HOURS_END - WORK_HOURS_START
@@ -205,7 +199,7 @@ async def create_time_slots(
         slot_datetime_naive = datetime.combine(
             date_obj.date(), datetime.strptime(time_str, "%H:%M").time()
         )
-        slot_datetime = TIMEZONE.localize(slot_datetime_naive)
+        slot_datetime = slot_datetime_naive.replace(tzinfo=TIMEZONE)
 
         # ✅ Пропускаем прошедшие слоты сегодня
         if is_today and slot_datetime <= now:
@@ -225,7 +219,7 @@ async def create_time_slots(
             occupied_datetime_naive = datetime.combine(
                 date_obj.date(), datetime.strptime(occupied_time, "%H:%M").time()
             )
-            occupied_datetime = TIMEZONE.localize(occupied_datetime_naive)
+            occupied_datetime = occupied_datetime_naive.replace(tzinfo=TIMEZONE)
 
             # ✅ КРИТИЧНО: Используем РЕАЛЬНУЮ duration из БД!
             occupied_end = occupied_datetime + timedelta(minutes=occupied_duration)
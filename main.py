@@ -32,10 +32,35 @@ from config import (
     SENTRY_ENVIRONMENT,
     SENTRY_TRACES_SAMPLE_RATE,
 )
+from database.analytics_queue import AnalyticsQueue
+from database.audit_queue import AuditQueue
+from database.connection import DB
+from database.history_queue import BookingHistoryQueue
 from database.migrations.migration_manager import MigrationManager
 from database.migrations.versions.v004_add_services import AddServicesBackwardCompatible
 from database.migrations.versions.v006_add_booking_history import AddBookingHistory
 from database.migrations.versions.v007_fix_booking_history_constraints import FixBookingHistoryConstraints
+from database.migrations.versions.v008_drop_duplicate_booking_date_index import (
+    DropDuplicateBookingDateIndex,
+)
+from database.migrations.versions.v009_drop_booking_user_index import DropBookingUserIndex
+from database.migrations.versions.v010_booking_history_recent_indexes import (
+    BookingHistoryRecentIndexes,
+)
+from database.migrations.versions.v011_analytics_covering_index import AnalyticsCoveringIndex
+from database.migrations.versions.v012_booking_history_epoch_changed_at import (
+    BookingHistoryEpochChangedAt,
+)
+from database.migrations.versions.v013_drop_unique_duplicate_indexes import (
+    DropUniqueDuplicateIndexes,
+)
+from database.migrations.versions.v014_audit_log_epoch_timestamp import AuditLogEpochTimestamp
+from database.migrations.versions.v015_audit_admin_action_index import AuditAdminActionIndex
+from database.migrations.versions.v016_audit_timestamp_composite_indexes import (
+    AuditTimestampCompositeIndexes,
+)
+from database.migrations.versions.v017_booking_history_stats_index import BookingHistoryStatsIndex
+from database.migrations.versions.v018_admins_role_not_null import AdminsRoleNotNull
 from database.queries import Database
 from handlers import (
     admin_handlers,
@@ -163,6 +188,17 @@ async def init_database():
     manager.register(AddServicesBackwardCompatible)
     manager.register(AddBookingHistory)  # P0: История изменений записей
     manager.register(FixBookingHistoryConstraints)  # P0: Исправление CHECK constraint
+    manager.register(DropDuplicateBookingDateIndex)
+    manager.register(DropBookingUserIndex)
+    manager.register(BookingHistoryRecentIndexes)
+    manager.register(AnalyticsCoveringIndex)
+    manager.register(BookingHistoryEpochChangedAt)
+    manager.register(DropUniqueDuplicateIndexes)
+    manager.register(AuditLogEpochTimestamp)
+    manager.register(AuditAdminActionIndex)
+    manager.register(AuditTimestampCompositeIndexes)
+    manager.register(BookingHistoryStatsIndex)
+    manager.register(AdminsRoleNotNull)
     await manager.migrate()
 
     logger.info("Database initialized with migrations")
@@ -246,6 +282,26 @@ def setup_reminder_jobs(scheduler: AsyncIOScheduler, bot: Bot):
     logger.info("  - 1h reminders: every hour")
 
 
+def setup_maintenance_jobs(scheduler: AsyncIOScheduler):
+    """Периодическое обслуживание БД на долгоживущем подключении"""
+
+    async def optimize_job():
+        """Обновление статистики планировщика SQLite"""
+        try:
+            await DB.optimize()
+        except Exception as e:
+            logger.error(f"PRAGMA optimize job failed: {e}")
+
+    scheduler.add_job(
+        optimize_job,
+        "interval",
+        hours=1,
+        id="db_optimize",
+        replace_existing=True,
+        max_instances=1,
+    )
+
+
 async def get_storage():
     """Создает FSM storage: Redis если доступен, иначе MemoryStorage"""
     if REDIS_ENABLED:
@@ -297,6 +353,9 @@ async def start_bot():
     )
 
     await init_database()
+    AnalyticsQueue.start()
+    AuditQueue.start()
+    BookingHistoryQueue.start()
 
     if BACKUP_ENABLED:
         backup_service = BackupService(
@@ -314,6 +373,7 @@ async def start_bot():
     
     # P0: Настройка автоматических напоминаний
     setup_reminder_jobs(scheduler, bot)
+    setup_maintenance_jobs(scheduler)
 
     # Middlewares (порядок важен!)
     dp.callback_query.middleware(MessageCleanupMiddleware(ttl_hours=48))
@@ -372,6 +432,10 @@ async def start_bot():
         
         await bot.session.close()
         scheduler.shutdown(wait=False)
+        await AnalyticsQueue.stop()
+        await AuditQueue.stop()
+        await BookingHistoryQueue.stop()
+        await DB.close()
         logger.info("Bot stopped")
 
 
@@ -17,7 +17,8 @@ from config import (
     REMINDER_HOURS_BEFORE_24H,
     TIMEZONE,
 )
-from database.queries import Database
+from database.connection import SQLITE_HAS_RETURNING
+from database.repositories.analytics_repository import AnalyticsRepository
 from database.repositories.booking_history_repository import BookingHistoryRepository
 from utils.helpers import now_local
 
@@ -144,20 +145,21 @@ class BookingService:
                 )
                 booking_id = cursor.lastrowid
 
-                await db.commit()
-
-                # ✅ P0: Записываем в историю
+                # ✅ P0: Записываем в историю (в той же транзакции)
                 await BookingHistoryRepository.record_create(
                     booking_id=booking_id,
                     user_id=user_id,
                     date=date_str,
                     time=time_str,
                     service_id=service_id,
+                    db=db,
                 )
 
+                await db.commit()
+
                 # Планируем напоминание (вне транзакции)
                 await self._schedule_reminder(booking_id, date_str, time_str, user_id)
-                await Database.log_event(
+                await AnalyticsRepository.log_event(
                     user_id, "booking_created", f"{date_str} {time_str} service_id={service_id}"
                 )
 
@@ -287,9 +289,7 @@ class BookingService:
                     (new_date_str, new_time_str, now_local().isoformat(), booking_id),
                 )
 
-                await db.commit()
-
-                # ✅ P0: Записываем в историю
+                # ✅ P0: Записываем в историю (в той же транзакции)
                 await BookingHistoryRepository.record_reschedule(
                     booking_id=booking_id,
                     user_id=user_id,
@@ -300,15 +300,18 @@ class BookingService:
                     new_time=new_time_str,
                     old_service_id=old_service_id,
                     new_service_id=old_service_id,  # Услуга не меняется при переносе
+                    db=db,
                 )
 
+                await db.commit()
+
                 # 4. Перепланируем напоминания (вне транзакции)
                 self._remove_job_safe(f"reminder_{booking_id}")
                 self._remove_job_safe(f"feedback_{booking_id}")
 
                 await self._schedule_reminder(booking_id, new_date_str, new_time_str, user_id)
 
-                await Database.log_event(
+                await AnalyticsRepository.log_event(
                     user_id,
                     "booking_rescheduled",
                     f"{old_date_str} {old_time_str} -> {new_date_str} {new_time_str}",
@@ -346,7 +349,7 @@ class BookingService:
         """
         try:
             booking_datetime = datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M")
-            booking_datetime = TIMEZONE.localize(booking_datetime)
+            booking_datetime = booking_datetime.replace(tzinfo=TIMEZONE)
             now = now_local()
             time_until_booking = booking_datetime - now
 
@@ -411,38 +414,54 @@ class BookingService:
         """
         try:
             async with aiosqlite.connect(DATABASE_PATH) as db:
-                async with db.execute(
-                    "SELECT id, service_id FROM bookings WHERE date=? AND time=? AND user_id=?",
-                    (date_str, time_str, user_id),
-                ) as cursor:
-                    result = await cursor.fetchone()
-                    if not result:
+                if SQLITE_HAS_RETURNING:
+                    # Удаление и чтение удалённой строки — один запрос
+                    rows = await db.execute_fetchall(
+                        "DELETE FROM bookings WHERE date=? AND time=? AND user_id=? "
+                        "RETURNING id, service_id",
+                        (date_str, time_str, user_id),
+                    )
+                    if not rows:
                         return False, 0
 
-                    booking_id, service_id = result
+                    booking_id, service_id = list(rows)[0]
+                else:
+                    async with db.execute(
+                        "SELECT id, service_id FROM bookings WHERE date=? AND time=? AND user_id=?",
+                        (date_str, time_str, user_id),
+                    ) as cursor:
+                        result = await cursor.fetchone()
+                        if not result:
+                            return False, 0
 
-                await db.execute("DELETE FROM bookings WHERE id=?", (booking_id,))
-                await db.commit()
+                        booking_id, service_id = result
 
-            # ✅ P0: Записываем в историю
-            changed_by = admin_id if admin_id else user_id
-            changed_by_type = "admin" if admin_id else "user"
-
-            await BookingHistoryRepository.record_cancel(
-                booking_id=booking_id,
-                user_id=changed_by,
-                changed_by_type=changed_by_type,
-                date=date_str,
-                time=time_str,
-                service_id=service_id,
-                reason="Cancelled by user" if not admin_id else "Cancelled by admin",
-            )
+                    await db.execute("DELETE FROM bookings WHERE id=?", (booking_id,))
+
+                changed_by = admin_id if admin_id else user_id
+                changed_by_type = "admin" if admin_id else "user"
+
+                # ✅ P0: Записываем в историю (в той же транзакции, что и DELETE)
+                await BookingHistoryRepository.record_cancel(
+                    booking_id=booking_id,
+                    user_id=changed_by,
+                    changed_by_type=changed_by_type,
+                    date=date_str,
+                    time=time_str,
+                    service_id=service_id,
+                    reason="Cancelled by user" if not admin_id else "Cancelled by admin",
+                    db=db,
+                )
+
+                await db.commit()
 
             # Удаляем напоминания
             self._remove_job_safe(f"reminder_{booking_id}")
             self._remove_job_safe(f"feedback_{booking_id}")
 
-            await Database.log_event(user_id, "booking_cancelled", f"{date_str} {time_str}")
+            await AnalyticsRepository.log_event(
+                user_id, "booking_cancelled", f"{date_str} {time_str}"
+            )
             logging.info(
                 f"Booking {booking_id} cancelled by {changed_by_type} (id={changed_by})"
             )
@@ -480,7 +499,7 @@ class BookingService:
                         booking_datetime = datetime.strptime(
                             f"{date_str} {time_str}", "%Y-%m-%d %H:%M"
                         )
-                        booking_datetime = TIMEZONE.localize(booking_datetime)
+                        booking_datetime = booking_datetime.replace(tzinfo=TIMEZONE)
 
                         # Восстановить напоминание (используем константы)
                         reminder_time = booking_datetime - timedelta(
@@ -538,7 +557,8 @@ class BookingService:
             time_str: Время записи
         """
         try:
-            from config import DAY_NAMES, SERVICE_LOCATION
+            from config import SERVICE_LOCATION
+            from i18n.ru import DAY_NAMES
 
             date_obj = datetime.strptime(date_str, "%Y-%m-%d")
 
@@ -551,7 +571,7 @@ class BookingService:
                 f"📍 {SERVICE_LOCATION}\n\n"
                 "Если нужно отменить → '📋 Мои записи'",
             )
-            await Database.log_event(user_id, "reminder_sent", f"{date_str} {time_str}")
+            await AnalyticsRepository.log_event(user_id, "reminder_sent", f"{date_str} {time_str}")
         except Exception as e:
             logging.error(f"Error sending reminder: {e}", exc_info=True)
 
@@ -590,6 +610,8 @@ class BookingService:
                 "💬 Как прошла встреча?\n\nОцените качество услуги:",
                 reply_markup=feedback_kb,
             )
-            await Database.log_event(user_id, "feedback_request_sent", f"{date_str} {time_str}")
+            await AnalyticsRepository.log_event(
+                user_id, "feedback_request_sent", f"{date_str} {time_str}"
+            )
         except Exception as e:
             logging.error(f"Error sending feedback request: {e}", exc_info=True)
@@ -5,7 +5,7 @@ from datetime import datetime
 
 from aiogram import Bot
 
-from config import ADMIN_IDS  # ИСПРАВЛЕНО: множественное число
+from config import ADMIN_IDS_ORDERED  # ИСПРАВЛЕНО: множественное число
 
 
 class NotificationService:
@@ -25,7 +25,7 @@ class NotificationService:
             )
 
             # Отправляем всем админам
-            for admin_id in ADMIN_IDS:
+            for admin_id in ADMIN_IDS_ORDERED:
                 try:
                     await self.bot.send_message(admin_id, message_text)
                 except Exception as e:
@@ -42,7 +42,7 @@ class NotificationService:
             )
 
             # Отправляем всем админам
-            for admin_id in ADMIN_IDS:
+            for admin_id in ADMIN_IDS_ORDERED:
                 try:
                     await self.bot.send_message(admin_id, message_text)
                 except Exception as e:
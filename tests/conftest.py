@@ -0,0 +1,37 @@
+"""Общие фикстуры тестов"""
+
+import os
+import tempfile
+
+import pytest
+
+from database.connection import DB
+from database.queries import INDEXES_SQL, SCHEMA_SQL
+from database.repositories.admin_repository import AdminRepository
+
+
+@pytest.fixture
+async def temp_db():
+    """Общее подключение DB на временном файле БД (значение — путь к файлу)"""
+    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".db")
+    db_path = temp_file.name
+    temp_file.close()
+
+    await DB.reset(db_path)
+    AdminRepository.invalidate_cache()
+
+    yield db_path
+
+    await DB.reset()
+    AdminRepository.invalidate_cache()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.unlink(db_path + suffix)
+
+
+@pytest.fixture
+async def schema_db(temp_db):
+    """temp_db со схемой и индексами init_db"""
+    db = await DB.get()
+    await db.executescript(SCHEMA_SQL + INDEXES_SQL)
+    return db
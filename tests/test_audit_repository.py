@@ -0,0 +1,85 @@
+"""Тесты AuditRepository: keyset-пагинация get_logs"""
+
+import pytest
+
+from database.repositories.audit_repository import AuditRepository
+
+PAGE = 3
+
+# (admin_id, timestamp): одинаковые timestamp различает только id
+ROWS = [
+    (1, 1000),
+    (2, 3000),
+    (1, 2000),
+    (1, 2000),
+    (2, 2000),
+    (1, 3000),
+    (1, 1000),
+    (2, 2000),
+]
+
+
+class TestAuditLogPagination:
+    """Страницы next -> prev возвращают те же строки, в том числе при равных timestamp"""
+
+    @pytest.fixture
+    async def audit_db(self, schema_db):
+        """audit_log с ROWS (id растут в порядке вставки)"""
+        await schema_db.executemany(
+            "INSERT INTO audit_log (admin_id, action, target_id, details, timestamp) "
+            "VALUES (?, 'test', '', '', ?)",
+            ROWS,
+        )
+        return schema_db
+
+    @staticmethod
+    async def _walk_forward(**filters):
+        """Все страницы по before=page_key(последней строки)"""
+        pages = [await AuditRepository.get_logs(limit=PAGE, **filters)]
+        while len(pages[-1]) == PAGE:
+            page = await AuditRepository.get_logs(
+                limit=PAGE, before=AuditRepository.page_key(pages[-1][-1]), **filters
+            )
+            if not page:
+                break
+            pages.append(page)
+        return pages
+
+    @pytest.mark.asyncio
+    async def test_forward_pages_cover_all_rows_in_order(self, audit_db):
+        """Тест: страницы вперёд — все строки по (timestamp, id) DESC без повторов"""
+        pages = await self._walk_forward()
+        rows = [row for page in pages for row in page]
+
+        expected = sorted(
+            ((i, ts) for i, (_, ts) in enumerate(ROWS, start=1)),
+            key=lambda r: (r[1], r[0]),
+            reverse=True,
+        )
+        assert [AuditRepository.page_key(row) for row in rows] == [(ts, i) for i, ts in expected]
+        assert [len(page) for page in pages] == [3, 3, 2]
+
+    @pytest.mark.asyncio
+    async def test_prev_returns_same_rows_as_next(self, audit_db):
+        """Тест: after=page_key(первой строки) возвращает предыдущую страницу целиком"""
+        pages = await self._walk_forward()
+
+        for previous, current in zip(pages, pages[1:]):
+            back = await AuditRepository.get_logs(
+                limit=PAGE, after=AuditRepository.page_key(current[0])
+            )
+            assert back == previous
+
+    @pytest.mark.asyncio
+    async def test_pagination_with_admin_filter(self, audit_db):
+        """Тест: фильтр admin_id сохраняется при листании в обе стороны"""
+        pages = await self._walk_forward(admin_id=1)
+        rows = [row for page in pages for row in page]
+
+        assert len(rows) == sum(1 for admin_id, _ in ROWS if admin_id == 1)
+        assert all(row[1] == 1 for row in rows)
+
+        back = await AuditRepository.get_logs(
+            limit=PAGE, admin_id=1, after=AuditRepository.page_key(pages[1][0])
+        )
+        assert back == pages[0]
@@ -0,0 +1,122 @@
+"""Тесты BatchWriteQueue (фоновая пакетная запись)"""
+
+import asyncio
+
+import pytest
+
+from database.base_repository import BaseRepository
+from database.batch_queue import BatchWriteQueue
+from database.connection import DB
+
+
+def make_queue(**options):
+    """Новый подкласс очереди (у каждого своё состояние) для таблицы items"""
+    attrs = {
+        "INSERT_SQL": "INSERT INTO items (name) VALUES (?)",
+        "NAME": "Items",
+        "BATCH_SIZE": 4,
+        # По умолчанию пакет сбрасывается только по размеру или при stop()
+        "FLUSH_INTERVAL": 60.0,
+    }
+    attrs.update(options)
+    return type("ItemsQueue", (BatchWriteQueue,), attrs)
+
+
+async def item_names():
+    """Имена записанных строк в порядке вставки"""
+    db = await DB.get()
+    return [row[0] for row in await db.execute_fetchall("SELECT name FROM items ORDER BY id")]
+
+
+class TestBatchWriteQueue:
+    """Сброс по размеру и интервалу, stop() дописывает строки, put() без писателя"""
+
+    @pytest.fixture
+    async def items_db(self, temp_db):
+        """Временная БД с таблицей items"""
+        db = await DB.get()
+        await db.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT UNIQUE)")
+        return db
+
+    @pytest.mark.asyncio
+    async def test_stop_writes_all_pending_rows(self, items_db):
+        """Тест: stop() дописывает всё, что успели положить в очередь"""
+        queue = make_queue()
+        queue.start()
+
+        names = [f"row-{i}" for i in range(10)]
+        assert all(queue.put((name,)) for name in names)
+
+        await queue.stop()
+
+        assert await item_names() == names
+        assert not queue.is_running()
+
+    @pytest.mark.asyncio
+    async def test_put_returns_false_when_not_running(self, items_db):
+        """Тест: до start() и после stop() вызывающий пишет строку сам"""
+        queue = make_queue()
+        assert not queue.put(("before",))
+
+        queue.start()
+        await queue.stop()
+        assert not queue.put(("after",))
+
+        assert await item_names() == []
+
+    @pytest.mark.asyncio
+    async def test_put_returns_false_when_full(self, items_db):
+        """Тест: переполненная очередь не теряет строку, а отказывает"""
+        queue = make_queue(QUEUE_MAX_SIZE=2)
+        queue.start()
+
+        assert queue.put(("a",))
+        assert queue.put(("b",))
+        assert not queue.put(("c",))
+
+        await queue.stop()
+        assert await item_names() == ["a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_flush_on_batch_size(self, items_db):
+        """Тест: полный пакет пишется, не дожидаясь FLUSH_INTERVAL"""
+        queue = make_queue()
+        queue.start()
+        try:
+            for i in range(queue.BATCH_SIZE):
+                queue.put((f"row-{i}",))
+            for _ in range(50):
+                if await BaseRepository._count("items"):
+                    break
+                await asyncio.sleep(0.01)
+
+            assert await BaseRepository._count("items") == queue.BATCH_SIZE
+        finally:
+            await queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_flush_on_interval(self, items_db):
+        """Тест: неполный пакет пишется через FLUSH_INTERVAL"""
+        queue = make_queue(FLUSH_INTERVAL=0.05)
+        queue.start()
+        try:
+            queue.put(("single",))
+            await asyncio.sleep(0.2)
+
+            assert await item_names() == ["single"]
+        finally:
+            await queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_does_not_stop_writer(self, items_db):
+        """Тест: ошибка записи пакета не останавливает писателя"""
+        queue = make_queue(BATCH_SIZE=2)
+        queue.start()
+
+        # Пакет с нарушением UNIQUE откатывается целиком
+        queue.put(("dup",))
+        queue.put(("dup",))
+        queue.put(("next",))
+        await queue.stop()
+
+        assert await item_names() == ["next"]
@@ -0,0 +1,107 @@
+"""Тесты TTL-кэша асинхронных функций (utils.cache.async_ttl_cache)"""
+
+import asyncio
+
+import pytest
+
+from utils.cache import async_ttl_cache
+
+
+def _closure_var(wrapper, name):
+    """Внутреннее состояние декоратора (locks, entries) из замыкания обёртки"""
+    cells = dict(zip(wrapper.__code__.co_freevars, wrapper.__closure__))
+    return cells[name].cell_contents
+
+
+class TestAsyncTtlCache:
+    """Истечение, один запрос на промах, invalidate и обновление в фоне"""
+
+    @staticmethod
+    def _counting(ttl, refresh_ahead=0, gate=None):
+        """Кэшированная корутина, которая считает свои вызовы"""
+        calls = []
+
+        @async_ttl_cache(ttl, refresh_ahead=refresh_ahead)
+        async def load(key):
+            calls.append(key)
+            if gate is not None:
+                await gate.wait()
+            return f"{key}-{len(calls)}"
+
+        return load, calls
+
+    @pytest.mark.asyncio
+    async def test_value_cached_until_ttl(self):
+        """Тест: до истечения ttl — значение из кэша, после — новый запрос"""
+        load, calls = self._counting(ttl=0.05)
+
+        assert await load("a") == "a-1"
+        assert await load("a") == "a-1"
+        assert await load("b") == "b-2"
+        assert calls == ["a", "b"]
+
+        await asyncio.sleep(0.06)
+        assert await load("a") == "a-3"
+
+    @pytest.mark.asyncio
+    async def test_concurrent_miss_loads_once(self):
+        """Тест: одновременные промахи по одному ключу ждут один запрос"""
+        gate = asyncio.Event()
+        load, calls = self._counting(ttl=60, gate=gate)
+
+        tasks = [asyncio.create_task(load("a")) for _ in range(5)]
+        await asyncio.sleep(0)
+        gate.set()
+
+        assert await asyncio.gather(*tasks) == ["a-1"] * 5
+        assert calls == ["a"]
+
+    @pytest.mark.asyncio
+    async def test_invalidate_discards_in_flight_load(self):
+        """Тест: загрузка, начатая до invalidate(), не попадает в кэш"""
+        gate = asyncio.Event()
+        load, calls = self._counting(ttl=60, gate=gate)
+
+        task = asyncio.create_task(load("a"))
+        await asyncio.sleep(0)
+        load.invalidate()
+        gate.set()
+
+        # Вызвавший получает своё значение, но кэш его не сохранил
+        assert await task == "a-1"
+        assert await load("a") == "a-2"
+        assert await load("a") == "a-2"
+
+    @pytest.mark.asyncio
+    async def test_invalidate_clears_cached_values(self):
+        """Тест: после invalidate() значение загружается заново"""
+        load, calls = self._counting(ttl=60)
+
+        assert await load("a") == "a-1"
+        load.invalidate()
+        assert await load("a") == "a-2"
+
+    @pytest.mark.asyncio
+    async def test_refresh_ahead_returns_cached_and_reloads(self):
+        """Тест: близко к истечению — старое значение сразу, новое загружается в фоне"""
+        load, calls = self._counting(ttl=0.2, refresh_ahead=0.15)
+
+        assert await load("a") == "a-1"
+        await asyncio.sleep(0.1)
+
+        assert await load("a") == "a-1"
+        for _ in range(5):
+            await asyncio.sleep(0)
+        assert calls == ["a", "a"]
+        assert await load("a") == "a-2"
+
+    @pytest.mark.asyncio
+    async def test_locks_released_after_load(self):
+        """Тест: блокировки промахов не копятся по числу разных аргументов"""
+        load, _ = self._counting(ttl=60)
+
+        await asyncio.gather(*(load(n) for n in range(20)))
+        await asyncio.gather(*(load("same") for _ in range(5)))
+
+        assert _closure_var(load, "locks") == {}
+        assert len(_closure_var(load, "entries")) == 21
@@ -0,0 +1,92 @@
+"""Тесты общего подключения к БД (database.connection.DB)"""
+
+import asyncio
+import os
+import sqlite3
+
+import pytest
+
+from database.base_repository import BaseRepository
+from database.connection import DB
+from database.repositories.admin_repository import AdminRepository
+
+
+class TestSharedConnection:
+    """Путь, блокировка записи и транзакции общего подключения"""
+
+    @pytest.fixture
+    async def shared_db(self, temp_db):
+        """Общее подключение на временной БД с таблицей items"""
+        db = await DB.get()
+        await db.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT UNIQUE)")
+        return temp_db
+
+    @pytest.mark.asyncio
+    async def test_reset_opens_on_given_path(self, shared_db):
+        """Тест: после reset(path) подключение открыто на этом файле"""
+        db = await DB.get()
+        assert await DB.get() is db
+
+        rows = await db.execute_fetchall("PRAGMA database_list")
+        assert os.path.realpath(rows[0][2]) == os.path.realpath(shared_db)
+
+        await DB.reset(shared_db)
+        assert await DB.get() is not db
+
+    @pytest.mark.asyncio
+    async def test_execute_commit_waits_for_write_lock(self, shared_db):
+        """Тест: запись ждёт, пока write_lock занят"""
+        async with DB.write_lock:
+            task = asyncio.create_task(
+                BaseRepository._execute_commit("INSERT INTO items (name) VALUES (?)", ("a",))
+            )
+            await asyncio.sleep(0.05)
+            assert not task.done()
+            assert await BaseRepository._count("items") == 0
+
+        await task
+        assert await BaseRepository._count("items") == 1
+
+    @pytest.mark.asyncio
+    async def test_execute_many_is_atomic(self, shared_db):
+        """Тест: ошибка в пакете откатывает весь пакет"""
+        with pytest.raises(sqlite3.IntegrityError):
+            await BaseRepository._execute_many(
+                "INSERT INTO items (name) VALUES (?)", [("a",), ("b",), ("a",)]
+            )
+
+        db = await DB.get()
+        assert not db.in_transaction
+        assert await BaseRepository._count("items") == 0
+
+        await BaseRepository._execute_many("INSERT INTO items (name) VALUES (?)", [("a",), ("b",)])
+        assert await BaseRepository._count("items") == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_batches_do_not_interleave(self, shared_db):
+        """Тест: параллельные пакеты не попадают в чужую транзакцию"""
+        batches = [[(f"{n}-{i}",) for i in range(50)] for n in range(5)]
+        await asyncio.gather(
+            *(
+                BaseRepository._execute_many("INSERT INTO items (name) VALUES (?)", batch)
+                for batch in batches
+            )
+        )
+        assert await BaseRepository._count("items") == 250
+
+    @pytest.mark.asyncio
+    async def test_write_with_audit_rolls_back_together(self, shared_db):
+        """Тест: ошибка записи audit откатывает изменение admins"""
+        db = await DB.get()
+        await db.execute(
+            """CREATE TABLE admins
+            (user_id INTEGER PRIMARY KEY, username TEXT, added_by INTEGER,
+            added_at TEXT NOT NULL, role TEXT NOT NULL DEFAULT 'moderator')"""
+        )
+        AdminRepository.invalidate_cache()
+
+        # Таблицы audit_log нет: INSERT аудита падает внутри транзакции
+        assert not await AdminRepository.add_admin(1, "user", 99, audit_details="role=moderator")
+
+        assert not db.in_transaction
+        assert await BaseRepository._count("admins") == 0
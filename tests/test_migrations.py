@@ -0,0 +1,220 @@
+"""Тесты миграций, переводящих время в unix time"""
+
+import os
+import time
+from datetime import datetime, timezone
+
+import aiosqlite
+import pytest
+
+from database.migrations.versions.v012_booking_history_epoch_changed_at import (
+    BookingHistoryEpochChangedAt,
+)
+from database.migrations.versions.v014_audit_log_epoch_timestamp import AuditLogEpochTimestamp
+
+# 2024-03-01 09:30:00 UTC = 12:30 по Москве (UTC+3, без перехода на летнее время)
+EPOCH = int(datetime(2024, 3, 1, 9, 30, tzinfo=timezone.utc).timestamp())
+
+
+@pytest.fixture
+def moscow_tz():
+    """Локальное время процесса (и SQLite-модификатора 'utc') — Europe/Moscow"""
+    old_tz = os.environ.get("TZ")
+    os.environ["TZ"] = "Europe/Moscow"
+    time.tzset()
+    yield
+    if old_tz is None:
+        del os.environ["TZ"]
+    else:
+        os.environ["TZ"] = old_tz
+    time.tzset()
+
+
+@pytest.fixture
+async def legacy_db(tmp_path):
+    """Отдельное подключение, как у MigrationManager"""
+    async with aiosqlite.connect(tmp_path / "legacy.db") as db:
+        yield db
+
+
+async def column_type(db, table, column):
+    """Объявленный тип колонки"""
+    async with db.execute(f"PRAGMA table_info({table})") as cursor:
+        return {col[1]: col[2].upper() for col in await cursor.fetchall()}[column]
+
+
+async def index_names(db, table):
+    """Имена явно созданных индексов таблицы"""
+    async with db.execute(
+        "SELECT name FROM sqlite_master WHERE type='index' AND tbl_name=? AND sql IS NOT NULL",
+        (table,),
+    ) as cursor:
+        return {row[0] for row in await cursor.fetchall()}
+
+
+class TestBookingHistoryEpochChangedAt:
+    """v012: changed_at TIMESTAMP (ISO-строки локального времени) -> INTEGER"""
+
+    @pytest.fixture
+    async def history_db(self, legacy_db):
+        """booking_history в том виде, в каком её оставляет v007"""
+        await legacy_db.execute(
+            """
+            CREATE TABLE booking_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                booking_id INTEGER NOT NULL,
+                action TEXT NOT NULL,
+                changed_by INTEGER NOT NULL,
+                changed_by_type TEXT NOT NULL,
+                old_date TEXT,
+                old_time TEXT,
+                new_date TEXT,
+                new_time TEXT,
+                old_service_id INTEGER,
+                new_service_id INTEGER,
+                reason TEXT,
+                changed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+        )
+        await legacy_db.execute(
+            "CREATE INDEX idx_booking_history_booking_recent "
+            "ON booking_history(booking_id, changed_at DESC)"
+        )
+        return legacy_db
+
+    @staticmethod
+    async def _seed(db, *values):
+        """Строки истории с заданными changed_at"""
+        await db.executemany(
+            "INSERT INTO booking_history "
+            "(booking_id, action, changed_by, changed_by_type, changed_at) "
+            "VALUES (1, 'create', 1, 'user', ?)",
+            [(value,) for value in values],
+        )
+
+    @pytest.mark.asyncio
+    async def test_converts_legacy_values(self, moscow_tz, history_db):
+        """Тест: ISO без смещения — локальное время сервера, со смещением — как указано"""
+        await self._seed(
+            history_db,
+            # datetime.now().isoformat(): локальное время, с микросекундами
+            "2024-03-01T12:30:00.123456",
+            "2024-03-01T12:30:00",
+            "2024-03-01T09:30:00+00:00",
+            "2024-03-01T12:30:00+03:00",
+            EPOCH,
+        )
+
+        await BookingHistoryEpochChangedAt().upgrade(history_db)
+
+        async with history_db.execute(
+            "SELECT changed_at, typeof(changed_at) FROM booking_history ORDER BY id"
+        ) as cursor:
+            rows = await cursor.fetchall()
+        assert rows == [(EPOCH, "integer")] * 5
+
+    @pytest.mark.asyncio
+    async def test_rebuilds_table_and_keeps_indexes(self, moscow_tz, history_db):
+        """Тест: changed_at INTEGER, индексы старой таблицы восстановлены"""
+        await self._seed(history_db, "not a date")
+
+        before = int(time.time())
+        await BookingHistoryEpochChangedAt().upgrade(history_db)
+
+        assert await column_type(history_db, "booking_history", "changed_at") == "INTEGER"
+        assert await index_names(history_db, "booking_history") == {
+            "idx_booking_history_booking_recent"
+        }
+        # Нераспознанное значение заменяется временем миграции
+        async with history_db.execute("SELECT changed_at FROM booking_history") as cursor:
+            (changed_at,) = await cursor.fetchone()
+        assert before <= changed_at <= int(time.time())
+
+
+class TestAuditLogEpochTimestamp:
+    """v014: audit_log.timestamp TEXT (ISO-строки со смещением) -> INTEGER"""
+
+    @pytest.fixture
+    async def audit_db(self, legacy_db):
+        """audit_log со старой схемой init_db (timestamp TEXT)"""
+        await legacy_db.execute(
+            """
+            CREATE TABLE audit_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                admin_id INTEGER NOT NULL,
+                action TEXT NOT NULL,
+                target_id TEXT,
+                details TEXT,
+                timestamp TEXT NOT NULL
+            )
+            """
+        )
+        await legacy_db.execute("CREATE INDEX idx_audit_timestamp ON audit_log(timestamp)")
+        await legacy_db.execute(
+            "CREATE INDEX idx_audit_add_admin_rate ON audit_log(admin_id, timestamp) "
+            "WHERE action = 'add_admin'"
+        )
+        return legacy_db
+
+    @staticmethod
+    async def _seed(db, *values):
+        """Записи аудита с заданными timestamp"""
+        await db.executemany(
+            "INSERT INTO audit_log (admin_id, action, target_id, details, timestamp) "
+            "VALUES (1, 'add_admin', '2', '', ?)",
+            [(value,) for value in values],
+        )
+
+    @pytest.mark.asyncio
+    async def test_converts_legacy_values(self, moscow_tz, audit_db):
+        """Тест: ISO со смещением — как указано, без смещения — как UTC"""
+        await self._seed(
+            audit_db,
+            # now_local().isoformat(): TIMEZONE со смещением, с микросекундами
+            "2024-03-01T12:30:00.123456+03:00",
+            "2024-03-01T12:30:00+03:00",
+            "2024-03-01T09:30:00+00:00",
+            # Строка без смещения не зависит от часового пояса сервера
+            "2024-03-01T09:30:00",
+            EPOCH,
+        )
+
+        await AuditLogEpochTimestamp().upgrade(audit_db)
+
+        async with audit_db.execute(
+            "SELECT timestamp, typeof(timestamp) FROM audit_log ORDER BY id"
+        ) as cursor:
+            rows = await cursor.fetchall()
+        assert rows == [(EPOCH, "integer")] * 5
+
+    @pytest.mark.asyncio
+    async def test_rebuilds_table_and_keeps_indexes(self, audit_db):
+        """Тест: timestamp INTEGER, индексы (включая частичный) восстановлены"""
+        await self._seed(audit_db, "2024-03-01T12:30:00+03:00")
+
+        await AuditLogEpochTimestamp().upgrade(audit_db)
+
+        assert await column_type(audit_db, "audit_log", "timestamp") == "INTEGER"
+        assert await index_names(audit_db, "audit_log") == {
+            "idx_audit_timestamp",
+            "idx_audit_add_admin_rate",
+        }
+
+    @pytest.mark.asyncio
+    async def test_skips_integer_column(self, audit_db):
+        """Тест: таблица уже с timestamp INTEGER (свежая БД) не пересоздаётся"""
+        await audit_db.execute("DROP TABLE audit_log")
+        await audit_db.execute(
+            "CREATE TABLE audit_log (id INTEGER PRIMARY KEY, admin_id INTEGER NOT NULL, "
+            "action TEXT NOT NULL, target_id TEXT, details TEXT, timestamp INTEGER NOT NULL)"
+        )
+        await self._seed(audit_db, EPOCH)
+
+        await AuditLogEpochTimestamp().upgrade(audit_db)
+
+        async with audit_db.execute(
+            "SELECT sql FROM sqlite_master WHERE name='audit_log'"
+        ) as cursor:
+            (sql,) = await cursor.fetchone()
+        assert "AUTOINCREMENT" not in sql
@@ -0,0 +1,120 @@
+"""Тесты AdminRateLimiter (лимит добавлений админов по audit_log)"""
+
+import pytest
+
+from config import MAX_ADMIN_ADDITIONS_PER_HOUR, ROLE_MODERATOR, ROLE_SUPER_ADMIN
+from database.repositories.audit_repository import AuditRepository
+from utils import rate_limiter
+from utils.rate_limiter import WINDOW_SECONDS, AdminRateLimiter
+
+NOW = 1_700_000_000
+ADMIN_ID = 42
+
+
+class TestAdminRateLimiter:
+    """Окно лимита, minutes_left и поведение при ошибке БД"""
+
+    @pytest.fixture(autouse=True)
+    def fixed_now(self, monkeypatch):
+        """Фиксирует текущее время лимитера"""
+        monkeypatch.setattr(rate_limiter, "unix_now", lambda: NOW)
+
+    @staticmethod
+    async def _add_admin_rows(db, *ages, admin_id=ADMIN_ID, action="add_admin"):
+        """Записи audit_log, сделанные ages секунд назад"""
+        await db.executemany(
+            "INSERT INTO audit_log (admin_id, action, target_id, details, timestamp) "
+            "VALUES (?, ?, '1', '', ?)",
+            [(admin_id, action, NOW - age) for age in ages],
+        )
+
+    @staticmethod
+    async def _set_role(db, role, admin_id=ADMIN_ID):
+        await db.execute(
+            "INSERT INTO admins (user_id, added_at, role) VALUES (?, '2024-01-01T00:00:00', ?)",
+            (admin_id, role),
+        )
+
+    @pytest.mark.asyncio
+    async def test_under_limit(self, schema_db):
+        """Тест: добавлений меньше лимита — можно добавлять"""
+        await self._set_role(schema_db, ROLE_MODERATOR)
+        await self._add_admin_rows(schema_db, *[60] * (MAX_ADMIN_ADDITIONS_PER_HOUR - 1))
+
+        assert await AdminRateLimiter.can_add_admin(ADMIN_ID) == (
+            True,
+            MAX_ADMIN_ADDITIONS_PER_HOUR - 1,
+            0,
+        )
+
+    @pytest.mark.asyncio
+    async def test_window_boundary(self, schema_db):
+        """Тест: запись ровно WINDOW_SECONDS назад уже вне окна"""
+        await self._set_role(schema_db, ROLE_MODERATOR)
+        await self._add_admin_rows(schema_db, *[WINDOW_SECONDS] * MAX_ADMIN_ADDITIONS_PER_HOUR)
+        assert await AdminRateLimiter.can_add_admin(ADMIN_ID) == (True, 0, 0)
+
+        await self._add_admin_rows(schema_db, *[WINDOW_SECONDS - 1] * MAX_ADMIN_ADDITIONS_PER_HOUR)
+        allowed, count, _ = await AdminRateLimiter.can_add_admin(ADMIN_ID)
+        assert not allowed
+        assert count == MAX_ADMIN_ADDITIONS_PER_HOUR
+
+    @pytest.mark.asyncio
+    async def test_counts_only_own_add_admin_rows(self, schema_db):
+        """Тест: чужие добавления и другие действия не считаются"""
+        await self._set_role(schema_db, ROLE_MODERATOR)
+        await self._add_admin_rows(schema_db, *[60] * MAX_ADMIN_ADDITIONS_PER_HOUR, admin_id=7)
+        await self._add_admin_rows(
+            schema_db, *[60] * MAX_ADMIN_ADDITIONS_PER_HOUR, action="remove_admin"
+        )
+
+        assert await AdminRateLimiter.can_add_admin(ADMIN_ID) == (True, 0, 0)
+
+    @pytest.mark.asyncio
+    async def test_minutes_left_from_oldest_addition(self, schema_db):
+        """Тест: лимит сбрасывается, когда из окна выходит самое раннее добавление"""
+        await self._set_role(schema_db, ROLE_MODERATOR)
+        # Самое раннее — 50 минут назад: до сброса 10 минут
+        ages = [50 * 60] + [60] * (MAX_ADMIN_ADDITIONS_PER_HOUR - 1)
+        await self._add_admin_rows(schema_db, *ages)
+
+        assert await AdminRateLimiter.can_add_admin(ADMIN_ID) == (
+            False,
+            MAX_ADMIN_ADDITIONS_PER_HOUR,
+            10,
+        )
+
+    @pytest.mark.asyncio
+    async def test_minutes_left_at_least_one(self, schema_db):
+        """Тест: меньше минуты до сброса — показываем 1 минуту, а не 0"""
+        await self._set_role(schema_db, ROLE_MODERATOR)
+        await self._add_admin_rows(schema_db, *[WINDOW_SECONDS - 30] * MAX_ADMIN_ADDITIONS_PER_HOUR)
+
+        assert await AdminRateLimiter.can_add_admin(ADMIN_ID) == (
+            False,
+            MAX_ADMIN_ADDITIONS_PER_HOUR,
+            1,
+        )
+
+    @pytest.mark.asyncio
+    async def test_super_admin_not_limited(self, schema_db):
+        """Тест: super_admin не ограничен"""
+        await self._set_role(schema_db, ROLE_SUPER_ADMIN)
+        await self._add_admin_rows(schema_db, *[60] * (MAX_ADMIN_ADDITIONS_PER_HOUR + 1))
+
+        assert await AdminRateLimiter.can_add_admin(ADMIN_ID) == (True, 0, 0)
+
+    @pytest.mark.asyncio
+    async def test_fails_closed_on_db_error(self, schema_db):
+        """Тест: ошибка подсчёта — добавление запрещено"""
+        await self._set_role(schema_db, ROLE_MODERATOR)
+        await schema_db.execute("DROP TABLE audit_log")
+
+        with pytest.raises(Exception):
+            await AuditRepository.get_admin_additions_since(ADMIN_ID, NOW - WINDOW_SECONDS)
+
+        assert await AdminRateLimiter.can_add_admin(ADMIN_ID) == (
+            False,
+            MAX_ADMIN_ADDITIONS_PER_HOUR,
+            1,
+        )
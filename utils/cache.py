@@ -0,0 +1,84 @@
+"""TTL-кэш для асинхронных функций"""
+
+import asyncio
+import logging
+import time
+from functools import wraps
+from typing import Callable
+
+
+def async_ttl_cache(ttl: float, refresh_ahead: float = 0):
+    """Декоратор: кэшировать результат корутины на ttl секунд
+
+    Ключ кэша — аргументы вызова (позиционные и именованные). Одновременные промахи по
+    одному ключу ждут один запрос к БД (блокировка на ключ), а не
+    выполняют его параллельно.
+
+    Если задан refresh_ahead, то вызов, пришедший меньше чем за
+    refresh_ahead секунд до истечения значения, получает кэш сразу, а
+    значение обновляется в фоне — горячий путь не ждёт запроса.
+
+    У обёртки есть метод invalidate() для сброса кэша после изменений.
+
+    Args:
+        ttl: Время жизни значения (секунды)
+        refresh_ahead: За сколько секунд до истечения обновлять в фоне
+    """
+
+    def decorator(func: Callable):
+        entries = {}  # key -> (expires_at, value)
+        locks = {}
+        refreshing = {}  # key -> фоновая задача обновления
+        generation = 0  # растёт при invalidate(): загрузки "до" не сохраняются
+
+        async def load(key, args, kwargs):
+            started = generation
+            value = await func(*args, **kwargs)
+            if started == generation:
+                entries[key] = (time.monotonic() + ttl, value)
+            return value
+
+        async def refresh(key, args, kwargs):
+            try:
+                await load(key, args, kwargs)
+            except Exception as e:
+                logging.warning("Background refresh of %s failed: %s", func.__name__, e)
+            finally:
+                refreshing.pop(key, None)
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items()))) if kwargs else args
+            entry = entries.get(key)
+            if entry is not None:
+                remaining = entry[0] - time.monotonic()
+                if remaining > 0:
+                    if remaining < refresh_ahead and key not in refreshing:
+                        refreshing[key] = asyncio.create_task(refresh(key, args, kwargs))
+                    return entry[1]
+
+            lock = locks.setdefault(key, asyncio.Lock())
+            try:
+                async with lock:
+                    # Пока ждали блокировку, значение мог загрузить другой вызов
+                    entry = entries.get(key)
+                    if entry is not None and entry[0] > time.monotonic():
+                        return entry[1]
+
+                    return await load(key, args, kwargs)
+            finally:
+                # Блокировка нужна только на время промаха: иначе locks рос
+                # бы с каждым новым набором аргументов. Ждущие её вызовы
+                # держат ссылку на объект и найдут уже загруженное значение
+                if not lock.locked() and locks.get(key) is lock:
+                    del locks[key]
+
+        def invalidate():
+            nonlocal generation
+            generation += 1
+            entries.clear()
+
+        wrapper.invalidate = invalidate
+        return wrapper
+
+    return decorator
@@ -10,6 +10,7 @@ from aiogram.types import CallbackQuery
 
 from config import CALLBACK_MESSAGE_TTL_HOURS, CALLBACK_VERSION, TIMEZONE
 from database.queries import Database
+from database.repositories.booking_repository import BookingRepository
 from database.repositories.service_repository import ServiceRepository
 
 
@@ -126,7 +127,7 @@ class CallbackValidator:
         from utils.helpers import now_local
 
         booking_datetime = datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M")
-        booking_datetime = TIMEZONE.localize(booking_datetime)
+        booking_datetime = booking_datetime.replace(tzinfo=TIMEZONE)
 
         if booking_datetime < now_local():
             return ValidationResult(
@@ -214,7 +215,7 @@ class CallbackValidator:
         from utils.helpers import now_local
 
         slot_datetime = datetime.combine(date_obj.date(), time_obj.time())
-        slot_datetime = TIMEZONE.localize(slot_datetime)
+        slot_datetime = slot_datetime.replace(tzinfo=TIMEZONE)
 
         if slot_datetime < now_local():
             return ValidationResult(
@@ -224,7 +225,7 @@ class CallbackValidator:
             )
 
         # Проверка что слот свободен
-        is_free = await Database.is_slot_free(date_str, time_str)
+        is_free = await BookingRepository.is_slot_free(date_str, time_str)
 
         if not is_free:
             return ValidationResult(
@@ -1,8 +1,10 @@
 """Вспомогательные функции"""
 
+import time
 from datetime import datetime
 
-from config import DAY_NAMES, TIMEZONE
+from config import TIMEZONE
+from i18n.ru import DAY_NAMES
 
 
 def now_local() -> datetime:
@@ -10,6 +12,11 @@ def now_local() -> datetime:
     return datetime.now(TIMEZONE)
 
 
+def unix_now() -> int:
+    """Текущее время в unix time (секунды) — не зависит от таймзоны"""
+    return int(time.time())
+
+
 def format_date(date_obj: datetime) -> str:
     """Форматирование даты для отображения"""
     day_name = DAY_NAMES[date_obj.weekday()]
@@ -7,28 +7,51 @@ from config import ADMIN_IDS, ROLE_PERMISSIONS, ROLE_SUPER_ADMIN
 from database.repositories.admin_repository import AdminRepository
 
 
-async def has_permission(user_id: int, permission: str) -> bool:
+async def get_admin_role(user_id: int) -> Optional[str]:
     """
-    Проверить есть ли у админа разрешение.
+    Получить роль пользователя одной проверкой.
+
+    Роль уже означает права админа, поэтому отдельный is_admin перед
+    проверкой разрешений не нужен.
 
     Args:
         user_id: Telegram user ID
+
+    Returns:
+        Роль (статические админы .env = super_admin) или None, если не админ
+    """
+    if user_id in ADMIN_IDS:
+        return ROLE_SUPER_ADMIN
+
+    return await AdminRepository.get_admin_role(user_id)
+
+
+def role_has_permission(role: Optional[str], permission: str) -> bool:
+    """
+    Есть ли у роли разрешение.
+
+    Args:
+        role: Роль из get_admin_role (None — не админ)
         permission: Название разрешения (manage_admins, view_audit_log, etc.)
 
     Returns:
         True если есть разрешение
     """
-    # Статические админы (.env) = super_admin
-    if user_id in ADMIN_IDS:
-        return ROLE_PERMISSIONS[ROLE_SUPER_ADMIN].get(permission, False)
+    return role is not None and permission in ROLE_PERMISSIONS.get(role, frozenset())
 
-    # Получаем роль из БД
-    role = await AdminRepository.get_admin_role(user_id)
 
-    if not role:
-        return False
+async def has_permission(user_id: int, permission: str) -> bool:
+    """
+    Проверить есть ли у админа разрешение.
 
-    return ROLE_PERMISSIONS.get(role, {}).get(permission, False)
+    Args:
+        user_id: Telegram user ID
+        permission: Название разрешения (manage_admins, view_audit_log, etc.)
+
+    Returns:
+        True если есть разрешение
+    """
+    return role_has_permission(await get_admin_role(user_id), permission)
 
 
 async def get_admin_role_display(user_id: int) -> str:
@@ -41,10 +64,7 @@ async def get_admin_role_display(user_id: int) -> str:
     Returns:
         Бейдж роли (👑 или 🛡️)
     """
-    if user_id in ADMIN_IDS:
-        return "👑 Super"
-
-    role = await AdminRepository.get_admin_role(user_id)
+    role = await get_admin_role(user_id)
 
     if role == ROLE_SUPER_ADMIN:
         return "👑 Super"
@@ -10,6 +10,12 @@ from typing import Optional
 
 from pydantic import BaseModel, Field, field_validator, model_validator
 
+# Patterns are compiled once at import and shared by all validators
+_USERNAME_RE = re.compile(r"^[a-zA-Z0-9_-]{3,32}$")
+_PRICE_RE = re.compile(r"^[\d\s\-₽руб.a-zA-Zа-яА-Я]+$")
+_WHITESPACE_RE = re.compile(r"\s+")
+_CONTROL_CHARS_RE = re.compile(r"[\x00-\x1f\x7f-\x9f]")
+
 
 class TimeSlotInput(BaseModel):
     """Validation for time slot (date + time)"""
@@ -56,7 +62,7 @@ class BookingCreateInput(BaseModel):
             # Remove @ if present
             v = v.lstrip("@")
             # Only alphanumeric, underscore, dash
-            if not re.match(r"^[a-zA-Z0-9_-]{3,32}$", v):
+            if not _USERNAME_RE.match(v):
                 raise ValueError("Invalid username format")
         return v
 
@@ -119,7 +125,7 @@ class SlotBlockInput(BaseModel):
         if v:
             v = v.strip()
             # Remove excessive whitespace
-            v = re.sub(r"\s+", " ", v)
+            v = _WHITESPACE_RE.sub(" ", v)
         return v
 
 
@@ -142,7 +148,7 @@ class ServiceInput(BaseModel):
         if not v:
             raise ValueError("Service name cannot be empty")
         # Remove excessive whitespace
-        v = re.sub(r"\s+", " ", v)
+        v = _WHITESPACE_RE.sub(" ", v)
         return v
 
     @field_validator("price")
@@ -152,7 +158,7 @@ class ServiceInput(BaseModel):
         if v:
             v = v.strip()
             # Allow formats: "1000", "1000 руб", "от 1000", "1000-2000"
-            if not re.match(r"^[\d\s\-₽руб.a-zA-Zа-яА-Я]+$", v):
+            if not _PRICE_RE.match(v):
                 raise ValueError("Invalid price format")
         return v
 
@@ -180,7 +186,7 @@ class AdminInput(BaseModel):
         """Sanitize username"""
         if v:
             v = v.lstrip("@").strip()
-            if v and not re.match(r"^[a-zA-Z0-9_-]{3,32}$", v):
+            if v and not _USERNAME_RE.match(v):
                 raise ValueError("Invalid username format")
         return v
 
@@ -200,8 +206,8 @@ class UserInput(BaseModel):
         if v:
             v = v.strip()
             # Remove control characters
-            v = re.sub(r"[\x00-\x1f\x7f-\x9f]", "", v)
-            v = re.sub(r"\s+", " ", v)
+            v = _CONTROL_CHARS_RE.sub("", v)
+            v = _WHITESPACE_RE.sub(" ", v)
         return v if v else None
 
 
@@ -280,9 +286,9 @@ def sanitize_input(text: str, max_length: int = 500) -> str:
         return ""
 
     # Remove control characters
-    text = re.sub(r"[\x00-\x1f\x7f-\x9f]", "", text)
+    text = _CONTROL_CHARS_RE.sub("", text)
     # Normalize whitespace
-    text = re.sub(r"\s+", " ", text).strip()
+    text = _WHITESPACE_RE.sub(" ", text).strip()
 
     if len(text) > max_length:
         raise ValueError(f"Text too long (max {max_length} characters)")